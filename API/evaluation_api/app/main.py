@@ -1,15 +1,36 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+import logging
+import asyncio
+import time
+import uuid
 import sys
 import os
 
 # Add parent directory to Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from config import WARMUP_MODELS, LOG_LEVEL, LOG_FORMAT
+from core.utils.telemetry import configure_logging, render_metrics, request_id_var, REQUEST_SECONDS
+from core.registry.model_registry import model_registry
+from core.utils.executors import shutdown_executors
 from routers.evaluation_router import router_evaluation
 from routers.classifier_router import router_classification
+from routers.health_router import router_health
 
-app = FastAPI(title="Pronunciation Evaluation API", version="1.0.0")
+configure_logging(LOG_LEVEL, LOG_FORMAT)
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load models once per worker before serving requests
+    await asyncio.to_thread(model_registry.warm_up, WARMUP_MODELS)
+    yield
+    await model_registry.shutdown()
+    shutdown_executors()
+
+app = FastAPI(title="Pronunciation Evaluation API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,13 +40,46 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    # Reuse the id given by the client or proxy so logs can be matched across services
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers["X-Request-ID"] = request_id
+        return response
+    finally:
+        # Streamed responses are timed until their first byte
+        elapsed = time.perf_counter() - start
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else "unmatched"
+        REQUEST_SECONDS.labels(request.method, route_path, status).observe(elapsed)
+        logger.info("Request finished", extra={
+            "method": request.method,
+            "path": request.url.path,
+            "status": status,
+            "duration_ms": round(elapsed * 1000, 2)
+        })
+        request_id_var.reset(token)
+
 app.include_router(router_evaluation)
 app.include_router(router_classification)
+app.include_router(router_health)
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Pronunciation Evaluation API!"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    # Prometheus scrape endpoint, values are kept per worker process
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
+
 if __name__ == "__main__":
     # If below doesn't work, run in terminal: uvicorn app.main:app --reload
     import uvicorn
@@ -37,4 +91,4 @@ if __name__ == "__main__":
         reload_delay=0.1
     )
     
-    
\ No newline at end of file
+    
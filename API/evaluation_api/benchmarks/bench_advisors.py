@@ -0,0 +1,41 @@
+"""Feedback from the phrase bank, the ARLI model through the local stub and
+the local model, when it is available."""
+import pytest
+
+from core.registry.model_registry import model_registry
+from core.feedback.advisor import SpeechAdvisor
+from core.feedback.arli_client import ArliClient
+from corpus import REFERENCE_ANALYSIS, USER_ANALYSIS
+from core.evaluation.evaluator import SpeechEvaluator
+
+@pytest.fixture(scope="module")
+def difference_analysis():
+    return SpeechEvaluator().get_difference_analysis(REFERENCE_ANALYSIS, USER_ANALYSIS)
+
+def bench_template_advisor(benchmark, difference_analysis):
+    advisor = model_registry.template_advisor
+    feedback = benchmark(advisor.get_feedback, difference_analysis, 0.1)
+    assert feedback
+
+def bench_arli_advisor(benchmark, difference_analysis, arli_stub_url, event_loop_runner):
+    advisor = SpeechAdvisor(client=ArliClient(arli_stub_url, "benchmark", hedge_percentile=0))
+
+    def get_feedback():
+        return event_loop_runner.run_until_complete(advisor.get_feedback(difference_analysis, 0.1))
+
+    feedback = benchmark.pedantic(get_feedback, rounds=20, iterations=1)
+    assert feedback
+    event_loop_runner.run_until_complete(advisor.client.aclose())
+
+def bench_local_advisor(benchmark, difference_analysis):
+    try:
+        advisor = model_registry.local_advisor
+    except Exception as e:
+        pytest.skip(f"Local model could not be loaded: {e}")
+    if advisor.worker is None:
+        pytest.skip("Local model file not found and no LOCAL_LLM_SERVER_URL set.")
+
+    benchmark.pedantic(advisor.get_feedback, args=(difference_analysis, 0.1), rounds=3, iterations=1)
+    metrics = advisor.worker.metrics()
+    benchmark.extra_info["tokens_per_second"] = metrics["tokens_per_second"]
+    benchmark.extra_info["average_ttft_ms"] = metrics["average_ttft_ms"]
@@ -0,0 +1,37 @@
+"""Praat analysis of a clip with both engines, without the memoized results of SpeechAnalyzer."""
+from core.analysis.analyzer import (
+    run_praat_on_buffer,
+    run_word_praat_on_buffer,
+    run_numpy_on_buffer,
+    run_word_numpy_on_buffer
+)
+from core.utils import audio_tools as atools
+
+def bench_praat(benchmark, clip, audio_buffers):
+    audio = audio_buffers[clip]
+    result = benchmark.pedantic(run_praat_on_buffer, args=(audio,), rounds=3, iterations=1)
+    assert result is not None
+    benchmark.extra_info["audio_seconds"] = round(audio.duration, 2)
+    benchmark.extra_info["syllables"] = result.number_of_syllables
+
+def bench_word_praat(benchmark, clip, audio_buffers):
+    # Word mode analyzes the clip at 16000 Hz with the reduced script
+    audio = atools.resample_audio(audio_buffers[clip], 16000)
+    result = benchmark.pedantic(run_word_praat_on_buffer, args=(audio,), rounds=3, iterations=1)
+    assert result is not None
+    benchmark.extra_info["audio_seconds"] = round(audio.duration, 2)
+    benchmark.extra_info["syllables"] = result.number_of_syllables
+
+def bench_numpy(benchmark, clip, audio_buffers):
+    audio = audio_buffers[clip]
+    result = benchmark.pedantic(run_numpy_on_buffer, args=(audio,), rounds=3, iterations=1)
+    assert result is not None
+    benchmark.extra_info["audio_seconds"] = round(audio.duration, 2)
+    benchmark.extra_info["syllables"] = result.number_of_syllables
+
+def bench_word_numpy(benchmark, clip, audio_buffers):
+    audio = atools.resample_audio(audio_buffers[clip], 16000)
+    result = benchmark.pedantic(run_word_numpy_on_buffer, args=(audio,), rounds=3, iterations=1)
+    assert result is not None
+    benchmark.extra_info["audio_seconds"] = round(audio.duration, 2)
+    benchmark.extra_info["syllables"] = result.number_of_syllables
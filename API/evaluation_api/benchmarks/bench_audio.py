@@ -0,0 +1,18 @@
+"""Decoding, normalization and silence detection of uploaded audio, before Praat and Whisper."""
+from core.utils import audio_tools as atools
+
+def bench_decode(benchmark, clip, audio_contents):
+    content = audio_contents[clip]
+    audio = benchmark(atools.decode_audio, content, "wav")
+    benchmark.extra_info["audio_seconds"] = round(audio.duration, 2)
+
+def bench_normalize(benchmark, clip, audio_contents):
+    audio = atools.decode_audio(audio_contents[clip], "wav")
+    benchmark(atools.resample_audio, audio, 44100)
+    benchmark.extra_info["audio_seconds"] = round(audio.duration, 2)
+
+def bench_detect_speech(benchmark, clip, audio_buffers):
+    audio = audio_buffers[clip]
+    spans = benchmark(atools.detect_speech, audio)
+    benchmark.extra_info["audio_seconds"] = round(audio.duration, 2)
+    benchmark.extra_info["speech_seconds"] = round(atools.join_speech(audio, spans).duration, 2)
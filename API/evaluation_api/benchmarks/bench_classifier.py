@@ -0,0 +1,23 @@
+"""Decision tree classification, for one attempt and for many attempts."""
+import numpy as np
+import pytest
+
+from core.registry.model_registry import model_registry
+from corpus import REFERENCE_ANALYSIS, USER_ANALYSIS
+from core.evaluation.evaluator import SpeechEvaluator
+
+@pytest.fixture(scope="module")
+def classifier():
+    return model_registry.classifier
+
+def bench_classify(benchmark, classifier):
+    evaluator = SpeechEvaluator()
+    difference_analysis = evaluator.get_difference_analysis(REFERENCE_ANALYSIS, USER_ANALYSIS)
+    label = benchmark(classifier.get_classification, difference_analysis, 0.1)
+    assert label != "Unclassified"
+
+@pytest.mark.parametrize("attempts", [10, 100, 1000])
+def bench_classify_batch(benchmark, attempts, classifier):
+    features = np.random.default_rng(0).uniform(0, 1, (attempts, 8)).round(1)
+    benchmark(classifier.get_classifications, features)
+    benchmark.extra_info["attempts_per_second"] = round(attempts / benchmark.stats.stats.mean, 1)
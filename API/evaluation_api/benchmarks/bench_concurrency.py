@@ -0,0 +1,56 @@
+"""Throughput of the analysis service and the ARLI client when several
+requests arrive at the same time. Analyses go through the Praat process pool
+and the Whisper batcher like in the API, without the analysis cache."""
+import asyncio
+import pytest
+
+from core.registry.model_registry import model_registry
+from core.feedback.advisor import SpeechAdvisor
+from core.feedback.arli_client import ArliClient
+from services.analysis_service import AnalysisService
+from corpus import REFERENCE_ANALYSIS, USER_ANALYSIS
+from core.evaluation.evaluator import SpeechEvaluator
+
+CONCURRENCY_CLIP = "synthetic-5s"
+
+@pytest.mark.parametrize("concurrency", [1, 2, 4, 8])
+def bench_analysis_concurrency(benchmark, concurrency, audio_contents, event_loop_runner):
+    if CONCURRENCY_CLIP not in audio_contents:
+        pytest.skip(f"The {CONCURRENCY_CLIP} clip is not part of BENCH_DURATIONS.")
+    content = audio_contents[CONCURRENCY_CLIP]
+    service = AnalysisService(
+        analyzer=model_registry.analyzer,
+        transcriber=model_registry.transcriber,
+        batcher=model_registry.transcription_batcher
+    )
+
+    async def analyze_all():
+        # Every request has its own analyzer results, as if the audios were different
+        model_registry.analyzer.results.clear()
+        return await asyncio.gather(*[
+            service.analyze_content(content, f"{CONCURRENCY_CLIP}.wav")
+            for _ in range(concurrency)
+        ])
+
+    benchmark.pedantic(lambda: event_loop_runner.run_until_complete(analyze_all()), rounds=3, iterations=1)
+    benchmark.extra_info["concurrency"] = concurrency
+    benchmark.extra_info["requests_per_second"] = round(concurrency / benchmark.stats.stats.mean, 2)
+    benchmark.extra_info["batcher"] = model_registry.transcription_batcher.metrics()
+
+@pytest.mark.parametrize("concurrency", [1, 8, 32])
+def bench_arli_concurrency(benchmark, concurrency, arli_stub_url, event_loop_runner):
+    client = ArliClient(arli_stub_url, "benchmark", hedge_percentile=0)
+    advisor = SpeechAdvisor(client=client)
+    difference_analysis = SpeechEvaluator().get_difference_analysis(REFERENCE_ANALYSIS, USER_ANALYSIS)
+
+    async def request_all():
+        return await asyncio.gather(*[
+            advisor.get_feedback(difference_analysis, 0.1)
+            for _ in range(concurrency)
+        ])
+
+    benchmark.pedantic(lambda: event_loop_runner.run_until_complete(request_all()), rounds=5, iterations=1)
+    benchmark.extra_info["concurrency"] = concurrency
+    benchmark.extra_info["requests_per_second"] = round(concurrency / benchmark.stats.stats.mean, 2)
+    benchmark.extra_info["client"] = client.metrics()
+    event_loop_runner.run_until_complete(client.aclose())
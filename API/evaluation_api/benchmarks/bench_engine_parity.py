@@ -0,0 +1,69 @@
+"""Parity of the NumPy engine with myspsolution.praat. Every clip of the corpus,
+and synthetic clips of other seeds and background noise levels, must give the
+same metrics with both engines. A failure names the metrics that differ."""
+from dataclasses import fields
+import numpy as np
+import time
+import pytest
+
+from corpus import synthesize_speech
+from core.analysis.analyzer import (
+    PraatResult,
+    run_praat_on_buffer,
+    run_word_praat_on_buffer,
+    run_numpy_on_buffer,
+    run_word_numpy_on_buffer
+)
+from core.utils import audio_tools as atools
+from core.utils.audio_tools import AudioBuffer
+
+# Synthetic clips beyond the corpus: seeds, durations and noise standard deviations
+PARITY_SEEDS = range(8)
+PARITY_DURATIONS = [1.2, 5, 12]
+PARITY_NOISE = [0.0, 0.005]
+
+# Only measured by the Praat script
+SKIPPED_METRICS = {"pronunciation_probability"}
+
+def _differences(expected: PraatResult, result: PraatResult) -> dict:
+    """Metrics of result that differ from expected, NaN equals NaN."""
+    differences = {}
+    for field in fields(PraatResult):
+        if field.name in SKIPPED_METRICS:
+            continue
+        a, b = getattr(expected, field.name), getattr(result, field.name)
+        if a != b and not (np.isnan(a) and np.isnan(b)):
+            differences[field.name] = (a, b)
+    return differences
+
+def _compare(benchmark, audio: AudioBuffer, run_praat, run_numpy) -> None:
+    """Time the NumPy engine, next to the Praat script, and compare their results."""
+    start = time.perf_counter()
+    expected = run_praat(audio)
+    praat_seconds = time.perf_counter() - start
+    result = benchmark.pedantic(run_numpy, args=(audio,), rounds=1, iterations=1)
+
+    benchmark.extra_info["audio_seconds"] = round(audio.duration, 2)
+    benchmark.extra_info["praat_seconds"] = round(praat_seconds, 4)
+    # Both engines reject the same clips
+    assert (expected is None) == (result is None)
+    if expected is not None:
+        assert _differences(expected, result) == {}
+
+def _synthetic_clip(seed: int, duration: float, noise: float) -> AudioBuffer:
+    samples = synthesize_speech(duration, 44100, seed)
+    samples = samples + np.random.default_rng(seed).normal(0, noise, len(samples)).astype(np.float32)
+    return AudioBuffer(samples=np.clip(samples, -1, 1).astype(np.float32), sample_rate=44100)
+
+def bench_parity(benchmark, clip, audio_buffers):
+    _compare(benchmark, audio_buffers[clip], run_praat_on_buffer, run_numpy_on_buffer)
+
+def bench_word_parity(benchmark, clip, audio_buffers):
+    audio = atools.resample_audio(audio_buffers[clip], 16000)
+    _compare(benchmark, audio, run_word_praat_on_buffer, run_word_numpy_on_buffer)
+
+@pytest.mark.parametrize("noise", PARITY_NOISE)
+@pytest.mark.parametrize("duration", PARITY_DURATIONS)
+@pytest.mark.parametrize("seed", PARITY_SEEDS)
+def bench_synthetic_parity(benchmark, seed, duration, noise):
+    _compare(benchmark, _synthetic_clip(seed, duration, noise), run_praat_on_buffer, run_numpy_on_buffer)
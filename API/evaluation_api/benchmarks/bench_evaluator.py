@@ -0,0 +1,91 @@
+"""Word error rate, difference analysis and scoring, for one attempt and for
+many attempts with the batch evaluator. The WER engine is compared with jiwer,
+which it replaced, on speed and on every measure."""
+import random
+import jiwer
+import pytest
+
+from core.evaluation.evaluator import SpeechEvaluator
+from core.evaluation.batch_evaluator import BatchSpeechEvaluator
+from core.evaluation.wer_engine import WEREngine
+from corpus import REFERENCE_ANALYSIS, USER_ANALYSIS
+
+# Random transcription pairs checked against jiwer
+PARITY_PAIRS = 5000
+PARITY_WORDS = ["the", "The", "a", "tree", "three", "it's", "its", "art,", "art", "é"]
+PARITY_SEPARATORS = [" ", "  ", "\t", " \n "]
+
+def _attempts(reference: str, attempts: int, seed: int = 0) -> list:
+    """Distinct user transcriptions of a reference, with dropped, changed and added words."""
+    rng = random.Random(seed)
+    words = reference.split()
+    hypotheses = []
+    for _ in range(attempts):
+        said = [word for word in words if rng.random() > 0.15]
+        said = [rng.choice(words) if rng.random() < 0.1 else word for word in said]
+        said.insert(rng.randrange(len(said) + 1), rng.choice(["um", "uh", "the"]))
+        hypotheses.append(" ".join(said))
+    return hypotheses
+
+def _random_transcription(rng: random.Random) -> str:
+    return rng.choice(["", " "]) + "".join(
+        rng.choice(PARITY_WORDS) + rng.choice(PARITY_SEPARATORS)
+        for _ in range(rng.randrange(12))
+    )
+
+def bench_wer(benchmark):
+    evaluator = SpeechEvaluator()
+    benchmark(evaluator.compare_transcripts, REFERENCE_ANALYSIS["transcription"], USER_ANALYSIS["transcription"])
+
+@pytest.mark.parametrize("attempts", [100, 1000])
+def bench_wer_distinct(benchmark, attempts):
+    # Every attempt at the resource has its own transcription
+    engine = WEREngine()
+    reference = REFERENCE_ANALYSIS["transcription"]
+    hypotheses = _attempts(reference, attempts)
+    benchmark(lambda: [engine.wer(reference, hypothesis) for hypothesis in hypotheses])
+    benchmark.extra_info["attempts_per_second"] = round(attempts / benchmark.stats.stats.mean, 1)
+
+@pytest.mark.parametrize("attempts", [100, 1000])
+def bench_wer_distinct_jiwer(benchmark, attempts):
+    reference = REFERENCE_ANALYSIS["transcription"]
+    hypotheses = _attempts(reference, attempts)
+    benchmark(lambda: [jiwer.wer(reference, hypothesis) for hypothesis in hypotheses])
+    benchmark.extra_info["attempts_per_second"] = round(attempts / benchmark.stats.stats.mean, 1)
+
+def bench_wer_alignment(benchmark):
+    engine = WEREngine()
+    alignment = benchmark(engine.align, REFERENCE_ANALYSIS["transcription"], USER_ANALYSIS["transcription"])
+    assert alignment.deleted == ["an", "an"]
+
+def bench_wer_parity(benchmark):
+    # Same WER, hits, substitutions, deletions and insertions as jiwer
+    rng = random.Random(1234)
+    pairs = [(_random_transcription(rng), _random_transcription(rng)) for _ in range(PARITY_PAIRS)]
+    engine = WEREngine()
+    alignments = benchmark.pedantic(
+        lambda: [engine.align(*pair) for pair in pairs], rounds=1, iterations=1
+    )
+
+    mismatches = []
+    for pair, alignment in zip(pairs, alignments):
+        expected = jiwer.process_words(*pair)
+        if (alignment.wer, alignment.hits, alignment.substitutions, alignment.deletions, alignment.insertions) != \
+           (expected.wer, expected.hits, expected.substitutions, expected.deletions, expected.insertions):
+            mismatches.append(pair)
+    benchmark.extra_info["pairs"] = len(pairs)
+    assert mismatches == []
+
+def bench_score(benchmark):
+    evaluator = SpeechEvaluator()
+    benchmark(evaluator.get_score, USER_ANALYSIS, REFERENCE_ANALYSIS)
+
+@pytest.mark.parametrize("attempts", [10, 100, 1000])
+def bench_score_batch(benchmark, attempts):
+    evaluator = BatchSpeechEvaluator()
+    user_analyses = [
+        {**USER_ANALYSIS, "speech_rate": 2 + (index % 20) / 10}
+        for index in range(attempts)
+    ]
+    benchmark(evaluator.evaluate, user_analyses, [REFERENCE_ANALYSIS], False)
+    benchmark.extra_info["attempts_per_second"] = round(attempts / benchmark.stats.stats.mean, 1)
@@ -0,0 +1,21 @@
+"""Whisper transcription of single clips and of a batch of short clips."""
+import pytest
+
+from core.registry.model_registry import model_registry
+
+@pytest.fixture(scope="module")
+def transcriber():
+    return model_registry.transcriber
+
+def bench_transcribe(benchmark, clip, audio_buffers, transcriber):
+    audio = audio_buffers[clip]
+    benchmark.pedantic(transcriber.get_transcription_from_buffer, args=(audio,), rounds=3, iterations=1)
+    benchmark.extra_info["audio_seconds"] = round(audio.duration, 2)
+
+@pytest.mark.parametrize("batch_size", [1, 4, 8])
+def bench_transcribe_batch(benchmark, batch_size, audio_buffers, transcriber):
+    if "synthetic-1s" not in audio_buffers:
+        pytest.skip("The 1 second clip is not part of BENCH_DURATIONS.")
+    audios = [audio_buffers["synthetic-1s"]] * batch_size
+    benchmark.pedantic(transcriber.get_transcriptions_from_buffers, args=(audios,), rounds=3, iterations=1)
+    benchmark.extra_info["clips_per_second"] = round(batch_size / benchmark.stats.stats.mean, 2)
@@ -0,0 +1,62 @@
+"""Latency and word error rate of each transcription backend and model size.
+Word error rate is measured on the recordings of BENCH_SAMPLE_DIR that have a
+.txt transcription next to them, synthetic clips only report latency."""
+import string
+import os
+import pytest
+from jiwer import wer
+
+from corpus import get_sample_transcripts
+from core.transcription.backends import TranscriptionBackendError
+from core.transcription.transcriber import SpeechTranscriber
+
+# Backends and Whisper model sizes compared, comma separated
+BACKENDS = os.getenv("BENCH_TRANSCRIPTION_BACKENDS", "whisper,faster_whisper").split(",")
+MODEL_SIZES = os.getenv("BENCH_WHISPER_SIZES", "small.en").split(",")
+
+def _clean(text: str) -> str:
+    return text.translate(str.maketrans('', '', string.punctuation)).strip().lower()
+
+@pytest.fixture(scope="module", params=[
+    (backend.strip(), size.strip()) for backend in BACKENDS for size in MODEL_SIZES
+], ids=lambda param: f"{param[0]}-{param[1]}")
+def backend_transcriber(request):
+    backend, model_size = request.param
+    try:
+        return SpeechTranscriber(model_size=model_size, backend=backend)
+    except TranscriptionBackendError as e:
+        pytest.skip(str(e))
+
+@pytest.fixture(scope="module")
+def transcripts():
+    return get_sample_transcripts()
+
+def bench_backend_transcribe(benchmark, clip, audio_buffers, backend_transcriber, transcripts):
+    audio = audio_buffers[clip]
+    transcription = benchmark.pedantic(
+        backend_transcriber.get_transcription_from_buffer, args=(audio,), rounds=3, iterations=1
+    )
+    benchmark.extra_info["model"] = backend_transcriber.version
+    benchmark.extra_info["audio_seconds"] = round(audio.duration, 2)
+    benchmark.extra_info["real_time_factor"] = round(benchmark.stats.stats.mean / audio.duration, 3)
+    if clip in transcripts:
+        benchmark.extra_info["wer"] = round(wer(_clean(transcripts[clip]), transcription or "<empty>"), 3)
+
+def bench_backend_corpus_wer(benchmark, audio_buffers, backend_transcriber, transcripts):
+    clips = [clip for clip in transcripts if clip in audio_buffers]
+    if not clips:
+        pytest.skip("No recording of BENCH_SAMPLE_DIR has a .txt transcription.")
+    audios = [audio_buffers[clip] for clip in clips]
+    transcriptions = benchmark.pedantic(
+        backend_transcriber.get_transcriptions_from_buffers, args=(audios,), rounds=1, iterations=1
+    )
+    # Word error rate of the whole corpus, as jiwer counts it over every pair
+    benchmark.extra_info["model"] = backend_transcriber.version
+    benchmark.extra_info["clips"] = len(clips)
+    benchmark.extra_info["wer"] = round(wer(
+        [_clean(transcripts[clip]) for clip in clips],
+        [transcription or "<empty>" for transcription in transcriptions]
+    ), 3)
+    benchmark.extra_info["audio_seconds_per_second"] = round(
+        sum(audio.duration for audio in audios) / benchmark.stats.stats.mean, 2
+    )
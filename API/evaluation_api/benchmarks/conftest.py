@@ -0,0 +1,92 @@
+from typing import Dict
+import threading
+import resource
+import asyncio
+import socket
+import time
+import sys
+import os
+
+# Benchmarks run on CPU only, with the ARLI API replaced by the local stub
+os.environ["CUDA_VISIBLE_DEVICES"] = ""
+os.environ.setdefault("ARLI_API_KEY", "benchmark")
+os.environ.setdefault("ARLI_STUB_DELAY_MS", "150")
+os.environ.setdefault("ARLI_STUB_JITTER_MS", "100")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+import uvicorn
+
+from corpus import build_corpus, get_clip_names
+from core.utils import audio_tools as atools
+from core.utils.audio_tools import AudioBuffer
+from core.registry.model_registry import get_process_memory
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def pytest_generate_tests(metafunc):
+    # Benchmarks that take a clip run once for every clip of the corpus
+    if "clip" in metafunc.fixturenames:
+        metafunc.parametrize("clip", get_clip_names())
+
+@pytest.fixture(scope="session")
+def corpus(tmp_path_factory) -> Dict[str, str]:
+    """Path of every clip of the corpus by name."""
+    return build_corpus(str(tmp_path_factory.mktemp("corpus")))
+
+@pytest.fixture(scope="session")
+def audio_contents(corpus) -> Dict[str, bytes]:
+    """Content of every clip, as uploaded to the API."""
+    contents = {}
+    for name, path in corpus.items():
+        with open(path, "rb") as audio_file:
+            contents[name] = audio_file.read()
+    return contents
+
+@pytest.fixture(scope="session")
+def audio_buffers(audio_contents) -> Dict[str, AudioBuffer]:
+    """Every clip decoded and normalized to 44100 Hz, as the analysis service does."""
+    return {
+        name: atools.resample_audio(atools.decode_audio(content, "wav"), 44100)
+        for name, content in audio_contents.items()
+    }
+
+@pytest.fixture(scope="session")
+def event_loop_runner():
+    """Event loop shared by every asynchronous benchmark. The transcription
+    batcher and the ARLI client stay bound to the loop they first ran in."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+@pytest.fixture(scope="session")
+def arli_stub_url():
+    """Start the ARLI API stub in a background thread and get its URL."""
+    from core.feedback.arli_stub import app
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    yield f"http://127.0.0.1:{port}/v1/completions"
+    server.should_exit = True
+    thread.join(timeout=5)
+
+@pytest.fixture(autouse=True)
+def record_memory(request):
+    """Add the peak and current resident memory of the process to each benchmark."""
+    yield
+    benchmark = request.node.funcargs.get("benchmark")
+    if benchmark is None:
+        return
+    # Reported in KB on Linux
+    benchmark.extra_info["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    current = get_process_memory()
+    if current is not None:
+        benchmark.extra_info["rss_mb"] = round(current / (1024 * 1024), 1)
@@ -0,0 +1,128 @@
+"""Fixed audio corpus and analyses used by the benchmarks. Clips are synthesized with a
+fixed seed, so every run analyzes exactly the same samples, and recordings
+found in BENCH_SAMPLE_DIR are added to them."""
+from typing import Dict, List
+import numpy as np
+import wave
+import os
+
+# Durations of the synthetic clips, in seconds
+DURATIONS = [1, 5, 30, 120]
+SAMPLE_RATE = 48000
+SEED = 1234
+
+# Analyses compared by the evaluation, classification and feedback benchmarks
+REFERENCE_ANALYSIS = {
+    "number_of_syllables": 12, "number_of_pauses": 1, "speech_rate": 3.0,
+    "articulation_rate": 4.0, "speaking_duration": 3.2, "total_duration": 4.1,
+    "ratio": 0.8, "transcription": "life is not an exact science it is an art"
+}
+USER_ANALYSIS = {
+    "number_of_syllables": 13, "number_of_pauses": 0, "speech_rate": 3.0,
+    "articulation_rate": 5.0, "speaking_duration": 2.7, "total_duration": 4.6,
+    "ratio": 0.6, "transcription": "life is not exact science it is art"
+}
+
+def get_durations() -> List[int]:
+    """Get the durations to benchmark. BENCH_DURATIONS limits them, for
+    example to 1,5 on a slow machine."""
+    durations = os.getenv("BENCH_DURATIONS", "")
+    if not durations:
+        return DURATIONS
+    return [int(duration) for duration in durations.split(",") if duration.strip()]
+
+def synthesize_speech(duration: float, sample_rate: int = SAMPLE_RATE,
+                      seed: int = SEED) -> np.ndarray:
+    """Synthesize speech-like audio: voiced syllables of a gliding pitch with
+    harmonics, about four per second, separated by a pause every few seconds.
+    Praat detects its syllables and pauses like it would in a recording.
+
+    Args:
+        duration (float): Duration in seconds.
+        sample_rate (int): Sample rate in Hz.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        np.ndarray: Mono float32 samples between -1 and 1.
+    """
+    rng = np.random.default_rng(seed)
+    samples = np.zeros(int(duration * sample_rate), dtype=np.float32)
+    position = int(0.1 * sample_rate)
+    since_pause = 0.0
+
+    while position < len(samples):
+        length = int(rng.uniform(0.15, 0.25) * sample_rate)
+        t = np.arange(length) / sample_rate
+        f0 = rng.uniform(100, 220) * (1 + 0.1 * t / t[-1])
+        phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+        syllable = sum(np.sin(harmonic * phase) / harmonic for harmonic in range(1, 6))
+        syllable *= np.hanning(length) * rng.uniform(0.3, 0.6)
+
+        end = min(position + length, len(samples))
+        samples[position:end] = syllable[:end - position]
+
+        gap = rng.uniform(0.04, 0.1)
+        since_pause += (length / sample_rate) + gap
+        # At least one pause, Praat rejects speech without any
+        if since_pause > min(rng.uniform(2, 4), duration / 3):
+            gap += rng.uniform(0.3, 0.6)
+            since_pause = 0.0
+        position = end + int(gap * sample_rate)
+
+    # Low background noise, like a quiet room
+    samples += rng.normal(0, 0.002, len(samples)).astype(np.float32)
+    return np.clip(samples, -1, 1)
+
+def write_wav(path: str, samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> None:
+    """Write mono float samples as a 16 bit PCM wav file."""
+    pcm = (np.clip(samples, -1, 1) * 32767).astype("<i2")
+    with wave.open(path, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm.tobytes())
+
+def get_sample_paths() -> Dict[str, str]:
+    """Get the wav recordings in BENCH_SAMPLE_DIR by name, such as sample-hello."""
+    sample_dir = os.getenv("BENCH_SAMPLE_DIR", "")
+    if not sample_dir or not os.path.isdir(sample_dir):
+        return {}
+    return {
+        f"sample-{os.path.splitext(filename)[0]}": os.path.join(sample_dir, filename)
+        for filename in sorted(os.listdir(sample_dir))
+        if filename.lower().endswith(".wav")
+    }
+
+def get_sample_transcripts() -> Dict[str, str]:
+    """Get the known transcription of the recordings in BENCH_SAMPLE_DIR by
+    name, read from a .txt file next to each wav file, such as hello.txt."""
+    transcripts = {}
+    for name, path in get_sample_paths().items():
+        transcript_path = os.path.splitext(path)[0] + ".txt"
+        if os.path.isfile(transcript_path):
+            with open(transcript_path, encoding="utf-8") as transcript_file:
+                transcripts[name] = transcript_file.read().strip()
+    return transcripts
+
+def get_clip_names() -> List[str]:
+    """Get the name of every clip of the corpus."""
+    return [f"synthetic-{duration}s" for duration in get_durations()] + list(get_sample_paths())
+
+def build_corpus(corpus_dir: str) -> Dict[str, str]:
+    """Write the synthetic clips and collect the sample recordings.
+
+    Args:
+        corpus_dir (str): Directory where the clips are written.
+
+    Returns:
+        Dict[str, str]: Path of each clip by name, such as synthetic-5s.
+    """
+    os.makedirs(corpus_dir, exist_ok=True)
+    corpus = {}
+    for duration in get_durations():
+        path = os.path.join(corpus_dir, f"synthetic-{duration}s.wav")
+        if not os.path.isfile(path):
+            write_wav(path, synthesize_speech(duration))
+        corpus[f"synthetic-{duration}s"] = path
+    corpus.update(get_sample_paths())
+    return corpus
@@ -0,0 +1,78 @@
+"""Load test of the evaluation API, started locally with the ARLI API stubbed.
+
+From the evaluation_api directory, start the stub and the API pointing to it:
+    uvicorn core.feedback.arli_stub:app --port 8002
+    ARLI_API_URL=http://127.0.0.1:8002/v1/completions uvicorn app.main:app --port 8000 --workers 2
+
+Then run, for example with 20 users for two minutes:
+    locust -f benchmarks/locustfile.py --host http://127.0.0.1:8000 \
+        --headless -u 20 -r 2 -t 2m --csv benchmarks/results/load
+"""
+from locust import HttpUser, task, between
+import json
+import os
+
+from corpus import synthesize_speech, write_wav, REFERENCE_ANALYSIS, USER_ANALYSIS
+
+# Clip uploaded by every user, LOAD_CLIP_SECONDS long
+CLIP_SECONDS = float(os.getenv("LOAD_CLIP_SECONDS", 5))
+CLIP_PATH = os.path.join(os.path.dirname(__file__), "results", f"load-{CLIP_SECONDS:g}s.wav")
+
+def _load_clip() -> bytes:
+    if not os.path.isfile(CLIP_PATH):
+        os.makedirs(os.path.dirname(CLIP_PATH), exist_ok=True)
+        write_wav(CLIP_PATH, synthesize_speech(CLIP_SECONDS))
+    with open(CLIP_PATH, "rb") as clip_file:
+        return clip_file.read()
+
+class EvaluationUser(HttpUser):
+    """User practicing a sentence: records it, gets it graded and asks for tips."""
+    wait_time = between(0.5, 2)
+
+    def on_start(self):
+        self.clip = _load_clip()
+        self.analyses = {
+            "reference_analysis": json.dumps(REFERENCE_ANALYSIS),
+            "user_analysis": json.dumps(USER_ANALYSIS),
+        }
+
+    @task(3)
+    def analyze_audio(self):
+        self.client.post(
+            "/evaluation/analyze_audio",
+            files={"audio_file": ("clip.wav", self.clip, "audio/wav")}
+        )
+
+    @task(3)
+    def evaluate_audio(self):
+        self.client.post("/evaluation/evaluate_audio", data=self.analyses)
+
+    @task(3)
+    def template_feedback(self):
+        self.client.post("/evaluation/feedback", data=self.analyses, name="/evaluation/feedback [template]")
+
+    @task(1)
+    def arli_feedback(self):
+        self.client.post(
+            "/evaluation/feedback",
+            data={**self.analyses, "use_llm": "true"},
+            name="/evaluation/feedback [arli]"
+        )
+
+    @task(1)
+    def classify_audio(self):
+        self.client.post("/classification/classify_audio", data=self.analyses)
+
+    @task(1)
+    def full_evaluation(self):
+        # Read the whole stream, so the time covers every stage
+        with self.client.post(
+            "/evaluation/full",
+            files={"audio_file": ("clip.wav", self.clip, "audio/wav")},
+            data={"reference_analysis": self.analyses["reference_analysis"]},
+            stream=True,
+            catch_response=True
+        ) as response:
+            stages = [json.loads(line) for line in response.iter_lines() if line]
+            if not stages or stages[-1].get("stage") != "done":
+                response.failure("Full evaluation stream did not finish.")
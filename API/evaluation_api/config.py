@@ -8,4 +8,89 @@ load_dotenv()
 # Access variables
 ARLI_API_KEY = os.getenv("ARLI_API_KEY")
 if ARLI_API_KEY is None:
-    raise ValueError("ARLI_API_KEY not found in environment variables.")
\ No newline at end of file
+    raise ValueError("ARLI_API_KEY not found in environment variables.")
+
+# ARLI completions API: endpoint, seconds per attempt, attempts, first retry
+# delay, latency percentile after which a second request is sent (0 disables it)
+# and latencies needed before hedging
+ARLI_API_URL = os.getenv("ARLI_API_URL", "https://api.arliai.com/v1/completions")
+ARLI_TIMEOUT = float(os.getenv("ARLI_TIMEOUT", 30))
+ARLI_MAX_TRIES = int(os.getenv("ARLI_MAX_TRIES", 3))
+ARLI_BACKOFF_SECONDS = float(os.getenv("ARLI_BACKOFF_SECONDS", 0.5))
+ARLI_HEDGE_PERCENTILE = float(os.getenv("ARLI_HEDGE_PERCENTILE", 0.95))
+ARLI_HEDGE_MIN_SAMPLES = int(os.getenv("ARLI_HEDGE_MIN_SAMPLES", 20))
+
+# Local feedback model: URL of a llama.cpp server (llama-server) to use instead of
+# loading the model in the API, its parallel slots and seconds per request
+LOCAL_LLM_SERVER_URL = os.getenv("LOCAL_LLM_SERVER_URL", "")
+LOCAL_LLM_SLOTS = int(os.getenv("LOCAL_LLM_SLOTS", 4))
+LOCAL_LLM_TIMEOUT = float(os.getenv("LOCAL_LLM_TIMEOUT", 120))
+
+# Logging: minimum level and format, json or text
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+
+# Models loaded when the API starts, comma separated
+WARMUP_MODELS = [
+    name.strip()
+    for name in os.getenv("WARMUP_MODELS", "analyzer,transcriber,classifier,template_advisor").split(",")
+    if name.strip()
+]
+
+# Processes used to run Praat analysis and seconds an analysis may take before
+# its process is restarted
+PRAAT_WORKERS = int(os.getenv("PRAAT_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+PRAAT_TIMEOUT = float(os.getenv("PRAAT_TIMEOUT", 60))
+
+# Engine measuring syllables, pauses and pitch: praat (myspsolution.praat) or numpy
+# (the same detection in NumPy, without the pronunciation probability)
+ANALYSIS_ENGINE = os.getenv("ANALYSIS_ENGINE", "praat")
+
+# Transcription: backend, whisper (PyTorch) or faster_whisper (CTranslate2),
+# Whisper model size, CPU threads (0 for the library default) and quantization
+# used by faster_whisper
+TRANSCRIPTION_BACKEND = os.getenv("TRANSCRIPTION_BACKEND", "whisper")
+TRANSCRIPTION_MODEL_SIZE = os.getenv("TRANSCRIPTION_MODEL_SIZE", "small.en")
+TRANSCRIPTION_THREADS = int(os.getenv("TRANSCRIPTION_THREADS", 0))
+TRANSCRIPTION_COMPUTE_TYPE = os.getenv("TRANSCRIPTION_COMPUTE_TYPE", "int8")
+
+# Silence detection before analysis: method, off, energy or webrtc (needs webrtcvad),
+# shortest silence in milliseconds between two spans of speech and audio kept
+# around each span. Off by default, the reference analyses are of untrimmed audio
+VAD_METHOD = os.getenv("VAD_METHOD", "off")
+VAD_MIN_SILENCE_MS = int(os.getenv("VAD_MIN_SILENCE_MS", 300))
+VAD_PADDING_MS = int(os.getenv("VAD_PADDING_MS", 200))
+
+# Word mode: clips of word resources, or up to WORD_MODE_MAX_SECONDS long when the
+# resource type is unknown (0, the default, only for word resources), are analyzed
+# at 16000 Hz with the reduced Praat script and a Whisper decode of at most
+# WORD_MODE_MAX_TOKENS tokens
+WORD_MODE_MAX_SECONDS = float(os.getenv("WORD_MODE_MAX_SECONDS", 0))
+WORD_MODE_MAX_TOKENS = int(os.getenv("WORD_MODE_MAX_TOKENS", 12))
+
+# Longest recording accepted by the streamed analysis, in seconds
+STREAM_MAX_SECONDS = float(os.getenv("STREAM_MAX_SECONDS", 300))
+
+# Whisper micro-batching: maximum clips per batch and how long to wait for them
+TRANSCRIPTION_BATCH_SIZE = int(os.getenv("TRANSCRIPTION_BATCH_SIZE", 8))
+TRANSCRIPTION_BATCH_WINDOW_MS = float(os.getenv("TRANSCRIPTION_BATCH_WINDOW_MS", 25))
+
+# Analysis cache: entries kept in memory and optional SQLite file with its size limit
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", 1024))
+ANALYSIS_CACHE_PATH = os.getenv("ANALYSIS_CACHE_PATH", "")
+ANALYSIS_CACHE_MAX_MB = float(os.getenv("ANALYSIS_CACHE_MAX_MB", 256))
+
+# LLM feedback cache: entries in memory, optional SQLite file, expiration in
+# seconds and answers kept per input, picked at random
+FEEDBACK_CACHE_SIZE = int(os.getenv("FEEDBACK_CACHE_SIZE", 4096))
+FEEDBACK_CACHE_PATH = os.getenv("FEEDBACK_CACHE_PATH", "")
+FEEDBACK_CACHE_MAX_MB = float(os.getenv("FEEDBACK_CACHE_MAX_MB", 64))
+FEEDBACK_CACHE_TTL = float(os.getenv("FEEDBACK_CACHE_TTL", 7 * 24 * 3600))
+FEEDBACK_CACHE_VARIANTS = int(os.getenv("FEEDBACK_CACHE_VARIANTS", 3))
+
+# Reference analyses resolved by resource id
+RESOURCES_API_URL = os.getenv("RESOURCES_API_URL", "http://127.0.0.1:8001")
+RESOURCES_API_TIMEOUT = float(os.getenv("RESOURCES_API_TIMEOUT", 5))
+REFERENCE_SNAPSHOT_PATH = os.getenv("REFERENCE_SNAPSHOT_PATH", "")
+REFERENCE_CACHE_SIZE = int(os.getenv("REFERENCE_CACHE_SIZE", 4096))
+REFERENCE_CACHE_TTL = float(os.getenv("REFERENCE_CACHE_TTL", 3600))
@@ -1,45 +1,402 @@
-from parselmouth.praat import run_file
+from parselmouth.praat import run, run_file
+from parselmouth import Sound
+from concurrent.futures import Executor
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+from bisect import bisect_left
+from typing import List, Optional
 import numpy as np
-from scipy.stats import ks_2samp, ttest_ind
+import tempfile
+import hashlib
 import os
+import logging
+
+from config import ANALYSIS_ENGINE
+from core.analysis.syllable_nuclei import measure_syllable_nuclei, measure_word_syllable_nuclei
+from core.utils.cache import LRUCache
+from core.utils.praat_pool import PraatWorkerError
+from core.utils.audio_tools import AudioBuffer
+
+logger = logging.getLogger(__name__)
+
+def _to_float(value: str) -> float:
+    """Parse a Praat number, undefined values become NaN."""
+    return float("nan") if value == "--undefined--" else float(value)
+
+@dataclass(frozen=True)
+class PraatResult:
+    """Every metric reported by a single run of myspsolution.praat, in the
+    order the script prints them."""
+    number_of_syllables: int
+    number_of_pauses: int
+    speech_rate: float
+    articulation_rate: float
+    speaking_duration: float
+    total_duration: float
+    ratio: float
+    f0_mean: float
+    f0_sd: float
+    f0_median: float
+    f0_min: float
+    f0_max: float
+    f0_quantile25: float
+    f0_quantile75: float
+    pronunciation_probability: float
+
+    @classmethod
+    def from_output(cls, values: List[str]) -> "PraatResult":
+        """Build the result from the values printed by the Praat script.
+
+        Args:
+            values (List[str]): Whitespace separated output of the script.
+
+        Raises:
+            ValueError: The output doesn't contain every metric or a speech 
+            metric is undefined.
+
+        Returns:
+            PraatResult: Parsed analysis.
+        """
+        if len(values) < 15:
+            raise ValueError(f"Expected 15 values from PRAAT, got: {' '.join(values)}")
+        return cls(
+            number_of_syllables=int(values[0]),
+            number_of_pauses=int(values[1]),
+            speech_rate=float(values[2]),
+            articulation_rate=float(values[3]),
+            speaking_duration=float(values[4]),
+            total_duration=float(values[5]),
+            ratio=float(values[6]),
+            f0_mean=_to_float(values[7]),
+            f0_sd=_to_float(values[8]),
+            f0_median=_to_float(values[9]),
+            f0_min=_to_float(values[10]),
+            f0_max=_to_float(values[11]),
+            f0_quantile25=_to_float(values[12]),
+            f0_quantile75=_to_float(values[13]),
+            pronunciation_probability=_to_float(values[14]),
+        )
+
+    @classmethod
+    def from_word_output(cls, values: List[str]) -> "PraatResult":
+        """Build the result from the values printed by the word script, which
+        doesn't measure pitch or pronunciation. Those metrics are NaN.
+
+        Args:
+            values (List[str]): Whitespace separated output of the script.
+
+        Raises:
+            ValueError: The output doesn't contain every metric or a speech 
+            metric is undefined.
+
+        Returns:
+            PraatResult: Parsed analysis.
+        """
+        if len(values) < 7:
+            raise ValueError(f"Expected 7 values from PRAAT, got: {' '.join(values)}")
+        return cls.from_output(values[:7] + ["--undefined--"] * 8)
+
+    def to_overview(self) -> dict:
+        """Get the speech metrics returned by the analysis endpoint.
+
+        Returns:
+            dict: Number of syllables, number of pauses, speech rate, 
+            articulation rate, speaking duration, total duration and ratio.
+        """
+        return {
+            "number_of_syllables": self.number_of_syllables,
+            "number_of_pauses": self.number_of_pauses,
+            "speech_rate": self.speech_rate,
+            "articulation_rate": self.articulation_rate,
+            "speaking_duration": self.speaking_duration,
+            "total_duration": self.total_duration,
+            "ratio": self.ratio
+        }
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+def get_script_path() -> str:
+    """Get the absolute path to myspsolution.praat in analysis/"""
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_path, "myspsolution.praat")
+
+def get_word_script_path() -> str:
+    """Get the absolute path to myspsolution_word.praat in analysis/"""
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_path, "myspsolution_word.praat")
+
+@lru_cache(maxsize=None)
+def load_script(script_path: str) -> str:
+    """Read the source of a Praat script once per process."""
+    with open(script_path, encoding="utf-8") as script_file:
+        return script_file.read()
+
+def preload_scripts() -> None:
+    """Read every Praat script used on audio held in memory, so worker 
+    processes don't open them for each analysis."""
+    load_script(get_script_path())
+    load_script(get_word_script_path())
+
+def _to_sound(audio: AudioBuffer) -> Sound:
+    sound = Sound(audio.samples.astype(np.float64), sampling_frequency=audio.sample_rate)
+    sound.name = "audio"
+    return sound
+
+def run_praat_on_buffer(audio: AudioBuffer) -> Optional[PraatResult]:
+    """Run Praat analysis on audio held in memory. Nothing is read from or 
+    written to disk. Defined at module level so it can run in worker processes.
+
+    Args:
+        audio (AudioBuffer): Audio to analyze.
+
+    Returns:
+        Optional[PraatResult]: Analysis of the audio, None if it failed.
+    """
+    try:
+        # An empty sound path makes the script use the selected Sound
+        result = run(
+            _to_sound(audio), load_script(get_script_path()), -20, 2, 0.3, "yes",
+            "", "", 80, 400, 0.01, capture_output=True
+        )
+        return PraatResult.from_output(str(result[1]).strip().split())
+    except Exception as e:
+        logger.error(f"Error for PRAAT analyzing audio, check analyzer : {e}")
+        return None
+
+def run_word_praat_on_buffer(audio: AudioBuffer) -> Optional[PraatResult]:
+    """Run the reduced Praat analysis for a single word on audio held in 
+    memory. Only syllables, pauses and durations are measured, with the same
+    parameters as run_praat_on_buffer.
+
+    Args:
+        audio (AudioBuffer): Audio to analyze.
+
+    Returns:
+        Optional[PraatResult]: Analysis of the audio without pitch metrics, 
+        None if it failed.
+    """
+    try:
+        result = run(
+            _to_sound(audio), load_script(get_word_script_path()), -20, 2, 0.3, capture_output=True
+        )
+        return PraatResult.from_word_output(str(result[1]).strip().split())
+    except Exception as e:
+        logger.error(f"Error for PRAAT analyzing word audio, check analyzer : {e}")
+        return None
+
+def run_numpy_on_buffer(audio: AudioBuffer) -> Optional[PraatResult]:
+    """Run the NumPy syllable nuclei detector on audio held in memory. Same 
+    metrics as run_praat_on_buffer, the pronunciation probability is NaN.
+
+    Args:
+        audio (AudioBuffer): Audio to analyze.
+
+    Returns:
+        Optional[PraatResult]: Analysis of the audio, None if it failed.
+    """
+    try:
+        return PraatResult.from_output(measure_syllable_nuclei(audio))
+    except Exception as e:
+        logger.error(f"Error for NumPy analyzing audio, check syllable_nuclei : {e}")
+        return None
+
+def run_word_numpy_on_buffer(audio: AudioBuffer) -> Optional[PraatResult]:
+    """Run the NumPy syllable nuclei detector on a single word held in memory,
+    with the same metrics as run_word_praat_on_buffer.
+
+    Args:
+        audio (AudioBuffer): Audio to analyze.
+
+    Returns:
+        Optional[PraatResult]: Analysis of the audio without pitch metrics, 
+        None if it failed.
+    """
+    try:
+        return PraatResult.from_word_output(measure_word_syllable_nuclei(audio))
+    except Exception as e:
+        logger.error(f"Error for NumPy analyzing word audio, check syllable_nuclei : {e}")
+        return None
+
+# Functions analyzing audio and single words held in memory, by engine
+ENGINES = {
+    "praat": (run_praat_on_buffer, run_word_praat_on_buffer),
+    "numpy": (run_numpy_on_buffer, run_word_numpy_on_buffer),
+}
+
+# Highest f0 median in Hz of each gender and mood, in increasing order. Medians up
+# to 97 Hz are classified as reading, like in My-Voice Analysis
+GENDER_AND_MOOD_BY_F0 = [
+    (97, "Male", "Reading"),
+    (114, "Male", "Showing no emotion, normal"),
+    (135, "Male", "Reading"),
+    (163, "Male", "Speaking passionately"),
+    (197, "Female", "Showing no emotion, normal"),
+    (226, "Female", "Reading"),
+    (245, "Male", "Speaking passionately"),
+]
+
+def classify_gender_and_mood(f0_median: float) -> Optional[dict]:
+    """Classify gender and mood of speech by its f0 median.
+
+    Args:
+        f0_median (float): Median of the fundamental frequency in Hz.
+
+    Returns:
+        Optional[dict]: Gender and mood of speech, None if the median is 
+        undefined or above every threshold.
+    """
+    if not np.isfinite(f0_median):
+        logger.warning("Voice not recognized")
+        return None
+
+    index = bisect_left([bound for bound, _, _ in GENDER_AND_MOOD_BY_F0], f0_median)
+    if index == len(GENDER_AND_MOOD_BY_F0):
+        logger.warning("Voice not recognized")
+        return None
+
+    _, gender, mood = GENDER_AND_MOOD_BY_F0[index]
+    return {
+        "gender": gender,
+        "mood": mood
+    }
 
 class SpeechAnalyzer:
-    """Class for the analysis of voice without the need of a transcription."""
+    """Class for the analysis of voice without the need of a transcription.
+    The Praat script runs once per audio content, every metric is read from
+    the memoized result."""
+    # Change when the script or its parameters change, invalidates cached analyses
+    VERSION = "myspsolution-2018.07"
+    WORD_VERSION = "myspsolution-word-1"
+    NUMPY_VERSION = "syllable-nuclei-1"
+
+    def __init__(self, cache_size: int = 128, executor: Optional[Executor] = None,
+                 engine: str = ANALYSIS_ENGINE):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown analysis engine '{engine}', expected one of {', '.join(ENGINES)}.")
+        self.results = LRUCache(max_size=cache_size)
+        # Audio held in memory is analyzed in this executor when given
+        self.executor = executor
+        self.engine = engine
+        self._run_buffer, self._run_word_buffer = ENGINES[engine]
+
+    @property
+    def version(self) -> str:
+        """Identifier of the analysis of audio held in memory, used to key cached results."""
+        if self.engine == "numpy":
+            return f"{self.VERSION}:{self.NUMPY_VERSION}"
+        return self.VERSION
+
+    @property
+    def word_version(self) -> str:
+        """Identifier of the analysis of single words, used to key cached results."""
+        if self.engine == "numpy":
+            return f"{self.WORD_VERSION}:{self.NUMPY_VERSION}"
+        return self.WORD_VERSION
+
+    def _hash_audio(self, full_audio_path: str) -> str:
+        """Hash the content of an audio file.
 
-    def _analyze_audio(self, audio_filename: str, audio_dir: str):
-        """Internal helper to run Praat analysis and extract result array.
+        Args:
+            full_audio_path (str): Complete path to the audio file.
+
+        Returns:
+            str: SHA-256 hex digest of the file content.
+        """
+        digest = hashlib.sha256()
+        with open(full_audio_path, "rb") as audio:
+            for block in iter(lambda: audio.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _run_praat(self, audio_filename: str, audio_dir: str) -> Optional[PraatResult]:
+        """Internal helper to run Praat analysis on an audio file and parse the result.
         
         Args:
             audio_filename (str): Filename with extension.
             audio_dir (str): Filepath where the audio is.
         """
         full_audio_path = os.path.join(audio_dir, audio_filename)
-        
-        # Get the path to this script's directory
-        base_path = os.path.dirname(os.path.abspath(__file__))
-        
-        # Build absolute path to myspsolution.praat in analysis/
-        praat_script_path = os.path.join(base_path, "myspsolution.praat")
-        
-        textgrid_path = f"{audio_dir}/{audio_filename}.TextGrid"  # Expected output from Praat
 
         try:
-            result = run_file(
-                praat_script_path, -20, 2, 0.3, "yes",
-                full_audio_path, audio_dir + "/", 80, 400, 0.01, capture_output=True
-            )
-            
-            parsed_textgrid = str(result[1]).strip().split()
-            
-            # Clean up: delete the .TextGrid file if it exists
-            if os.path.isfile(textgrid_path):
-                os.remove(textgrid_path)
-
-            return parsed_textgrid
+            # The script writes its TextGrid in a directory of its own, removed afterwards
+            with tempfile.TemporaryDirectory(prefix="praat-") as scratch_dir:
+                result = run_file(
+                    get_script_path(), -20, 2, 0.3, "yes",
+                    full_audio_path, scratch_dir + "/", 80, 400, 0.01, capture_output=True
+                )
+
+            return PraatResult.from_output(str(result[1]).strip().split())
         except Exception as e:
-            print(f"Error for PRAAT analyzing audio, check analyzer : {e}")
+            logger.error(f"Error for PRAAT analyzing audio, check analyzer : {e}")
             return None
 
+    def analyze(self, audio_filename: str, audio_dir: str) -> Optional[PraatResult]:
+        """Get the Praat analysis of an audio file. The script only runs the 
+        first time a given audio content is analyzed.
+
+        Args:
+            audio_filename (str): Filename with extension.
+            audio_dir (str): Filepath where the audio is.
+
+        Returns:
+            Optional[PraatResult]: Analysis of the audio, None if it failed.
+        """
+        full_audio_path = os.path.join(audio_dir, audio_filename)
+        try:
+            audio_hash = self._hash_audio(full_audio_path)
+        except OSError as e:
+            logger.error(f"Error reading audio for PRAAT analysis, check analyzer : {e}")
+            return None
+
+        result = self.results.get(audio_hash)
+        if result is None:
+            result = self._run_praat(audio_filename, audio_dir)
+            if result is not None:
+                self.results.set(audio_hash, result)
+        return result
+
+    def analyze_buffer(self, audio: AudioBuffer) -> Optional[PraatResult]:
+        """Get the Praat analysis of audio held in memory, with the configured
+        engine. It only runs the first time a given audio content is analyzed.
+
+        Args:
+            audio (AudioBuffer): Audio to analyze.
+
+        Returns:
+            Optional[PraatResult]: Analysis of the audio, None if it failed.
+        """
+        return self._analyze_buffer(audio, self._run_buffer, audio.content_hash())
+
+    def analyze_word_buffer(self, audio: AudioBuffer) -> Optional[PraatResult]:
+        """Get the reduced Praat analysis of a single word held in memory, with
+        the configured engine, see run_word_praat_on_buffer.
+
+        Args:
+            audio (AudioBuffer): Audio to analyze.
+
+        Returns:
+            Optional[PraatResult]: Analysis of the audio, None if it failed.
+        """
+        return self._analyze_buffer(audio, self._run_word_buffer, f"word:{audio.content_hash()}")
+
+    def _analyze_buffer(self, audio: AudioBuffer, run_praat, audio_hash: str) -> Optional[PraatResult]:
+        """Run a Praat function on audio, in the executor when given, and 
+        memoize its result by audio_hash."""
+        result = self.results.get(audio_hash)
+        if result is None:
+            if self.executor is not None:
+                try:
+                    result = self.executor.submit(run_praat, audio).result()
+                except PraatWorkerError as e:
+                    logger.error(f"Error for PRAAT analyzing audio, check praat pool : {e}")
+                    return None
+            else:
+                result = run_praat(audio)
+            if result is not None:
+                self.results.set(audio_hash, result)
+        return result
+
     def get_syllable_count(self, audio_filename: str, audio_dir: str) -> int:
         """Detect and count number of syllables.
 
@@ -50,8 +407,8 @@ class SpeechAnalyzer:
         Returns:
             int: Number of syllables.
         """
-        data = self._analyze_audio(audio_filename, audio_dir)
-        return int(data[0]) if data else None
+        result = self.analyze(audio_filename, audio_dir)
+        return result.number_of_syllables if result else None
 
     def get_pauses_count(self, audio_filename: str, audio_dir: str) -> int:
         """Detect and count number of pauses and fillers.
@@ -63,8 +420,8 @@ class SpeechAnalyzer:
         Returns:
             int: Number of pauses and fillers.
         """
-        data = self._analyze_audio(audio_filename, audio_dir)
-        return int(data[1]) if data else None
+        result = self.analyze(audio_filename, audio_dir)
+        return result.number_of_pauses if result else None
 
     def get_rate_of_speech(self, audio_filename: str, audio_dir: str) -> int:
         """Measure the total number of syllables spoken per second (including 
@@ -77,8 +434,8 @@ class SpeechAnalyzer:
         Returns:
             int: Number of syllables spoken per second.
         """
-        data = self._analyze_audio(audio_filename, audio_dir)
-        return int(data[2]) if data else None
+        result = self.analyze(audio_filename, audio_dir)
+        return int(result.speech_rate) if result else None
 
     def get_articulation_rate(self, audio_filename: str, audio_dir: str) -> int:
         """Measure the total number of syllables spoken per second 
@@ -91,8 +448,8 @@ class SpeechAnalyzer:
         Returns:
             int: Number of syllables articulated per second.
         """
-        data = self._analyze_audio(audio_filename, audio_dir)
-        return int(data[3]) if data else None
+        result = self.analyze(audio_filename, audio_dir)
+        return int(result.articulation_rate) if result else None
 
     def get_speaking_time(self, audio_filename: str, audio_dir: str) -> float:
         """Measure speaking time (excluding fillers and pauses).
@@ -104,8 +461,8 @@ class SpeechAnalyzer:
         Returns:
             float: Number of seconds of only speaking duration without pauses.
         """
-        data = self._analyze_audio(audio_filename, audio_dir)
-        return float(data[4]) if data else None
+        result = self.analyze(audio_filename, audio_dir)
+        return result.speaking_duration if result else None
 
     def get_total_speaking_time(self, audio_filename: str, audio_dir: str) -> float:
         """Measure speaking time (including fillers and pauses).
@@ -117,8 +474,8 @@ class SpeechAnalyzer:
         Returns:
             float: Number of seconds of only speaking duration with pauses.
         """
-        data = self._analyze_audio(audio_filename, audio_dir)
-        return float(data[5]) if data else None
+        result = self.analyze(audio_filename, audio_dir)
+        return result.total_duration if result else None
 
     def get_speaking_to_total_time_ratio(self, audio_filename: str, audio_dir: str) -> float:
         """Measure ratio between speaking duration and total speaking duration.
@@ -130,8 +487,8 @@ class SpeechAnalyzer:
         Returns:
             float: Ratio (speaking duration)/(original duration).
         """
-        data = self._analyze_audio(audio_filename, audio_dir)
-        return float(data[6]) if data else None
+        result = self.analyze(audio_filename, audio_dir)
+        return result.ratio if result else None
 
     def get_overview(self, audio_filename: str, audio_dir: str) -> dict:
         """Get total overview of audio properties. Includes number of syllables,
@@ -145,21 +502,49 @@ class SpeechAnalyzer:
         Returns:
             dict: Overview of audio properties.
         """
-        data = self._analyze_audio(audio_filename, audio_dir)
-        if not data:
-            print("Getting PRAAT analysis failed ;(")
+        result = self.analyze(audio_filename, audio_dir)
+        if not result:
+            logger.error("Getting PRAAT analysis failed ;(")
             return None
         
-        print("Getting PRAAT analysis success!")
-        return {
-            "number_of_syllables": int(data[0]),
-            "number_of_pauses": int(data[1]),
-            "speech_rate": float(data[2]),
-            "articulation_rate": float(data[3]),
-            "speaking_duration": float(data[4]),
-            "total_duration": float(data[5]),
-            "ratio": float(data[6])
-        }
+        logger.debug("Getting PRAAT analysis success!")
+        return result.to_overview()
+
+    def get_overview_from_buffer(self, audio: AudioBuffer) -> dict:
+        """Get total overview of the properties of audio held in memory. 
+        Includes the same metrics as get_overview.
+
+        Args:
+            audio (AudioBuffer): Audio to analyze.
+
+        Returns:
+            dict: Overview of audio properties.
+        """
+        result = self.analyze_buffer(audio)
+        if not result:
+            logger.error("Getting PRAAT analysis failed ;(")
+            return None
+        
+        logger.debug("Getting PRAAT analysis success!")
+        return result.to_overview()
+
+    def get_word_overview_from_buffer(self, audio: AudioBuffer) -> dict:
+        """Get the overview of a single word held in memory with the reduced
+        Praat analysis. Includes the same metrics as get_overview.
+
+        Args:
+            audio (AudioBuffer): Audio to analyze.
+
+        Returns:
+            dict: Overview of audio properties.
+        """
+        result = self.analyze_word_buffer(audio)
+        if not result:
+            logger.error("Getting PRAAT word analysis failed ;(")
+            return None
+        
+        logger.debug("Getting PRAAT word analysis success!")
+        return result.to_overview()
 
     def get_gender_and_mood(self, audio_filename: str, audio_dir: str) -> dict:
         """Recognize gender and mood of speech.
@@ -171,64 +556,22 @@ class SpeechAnalyzer:
         Returns:
             dict: Gender and mood of speech.
         """
-        data = self._analyze_audio(audio_filename, audio_dir)
-        if not data:
+        result = self.analyze(audio_filename, audio_dir)
+        if not result:
             return None
+        return classify_gender_and_mood(result.f0_median)
 
-        f0_mean = float(data[8])
-        f0_median = float(data[7])
-
-        # Gender/mood classification threshold
-        if f0_median <= 114:
-            g, j = 101, 3.4
-        elif f0_median <= 135:
-            g, j = 128, 4.35
-        elif f0_median <= 163:
-            g, j = 142, 4.85
-        elif f0_median <= 197:
-            g, j = 182, 2.7
-        elif f0_median <= 226:
-            g, j = 213, 4.5
-        elif f0_median > 226:
-            g, j = 239, 5.3
-        else:
-            print("Voice not recognized")
-            return None
+    def get_gender_and_mood_from_buffer(self, audio: AudioBuffer) -> dict:
+        """Recognize gender and mood of speech held in memory, from the same
+        memoized analysis as get_overview_from_buffer.
 
-        def compare_distributions(a, b, c, d):
-            d1 = np.random.wald(a, 1, 1000)
-            d2 = np.random.wald(b, 1, 1000)
-            ks = ks_2samp(d1, d2)
-            c1 = np.random.normal(a, c, 1000)
-            c2 = np.random.normal(b, d, 1000)
-            t_stat = ttest_ind(c1, c2)
-            return [ks[0], ks[1], abs(t_stat[0]), t_stat[1]]
-
-        # Repeated statistical testing
-        attempts = 0
-        result = compare_distributions(g, j, f0_median, f0_mean)
-        while (result[3] > 0.05 and result[0] > 0.04) or attempts < 5:
-            result = compare_distributions(g, j, f0_median, f0_mean)
-            attempts += 1
-
-        gender, mood = None, None
-        if 97 < f0_median <= 114:
-            gender, mood = "Male", "Showing no emotion, normal"
-        elif f0_median <= 135:
-            gender, mood = "Male", "Reading"
-        elif f0_median <= 163:
-            gender, mood = "Male", "Speaking passionately"
-        elif f0_median <= 197:
-            gender, mood = "Female", "Showing no emotion, normal"
-        elif f0_median <= 226:
-            gender, mood = "Female", "Reading"
-        elif f0_median <= 245:
-            gender, mood = "Male", "Speaking passionately"
-        else:
-            print("Voice not recognized")
-            return None
+        Args:
+            audio (AudioBuffer): Audio to analyze.
 
-        return {
-            "gender": gender,
-            "mood": mood
-        }
\ No newline at end of file
+        Returns:
+            dict: Gender and mood of speech.
+        """
+        result = self.analyze_buffer(audio)
+        if not result:
+            return None
+        return classify_gender_and_mood(result.f0_median)
@@ -0,0 +1,354 @@
+"""NumPy implementation of the syllable nuclei detection of myspsolution.praat,
+the algorithm of de Jong & Wempe (2009).
+
+The intensity contour and the pitch tracks are still computed by Praat through
+parselmouth. The loops of the script (silences, intensity peaks, dips and
+voicing) run on NumPy arrays, and no TextGrid or temporary object is created.
+Values are formatted like the script prints them, so both engines produce the
+same metrics. The pronunciation probability of the script, which comes from
+its formant scoring, is not measured."""
+from parselmouth.praat import call
+from parselmouth import Intensity, Sound
+from typing import List, Tuple
+import numpy as np
+
+from core.utils.audio_tools import AudioBuffer
+
+# Parameters myspsolution.praat is run with
+SILENCE_DB = -20
+MIN_DIP_DB = 2
+MIN_PAUSE_SECONDS = 0.3
+MIN_SOUNDING_SECONDS = 0.1
+PITCH_FLOOR = 80
+PITCH_CEILING = 400
+PITCH_TIME_STEP = 0.01
+# Depth of the sinc interpolation Praat refines intensity peaks with
+SINC_DEPTH = 70
+
+UNDEFINED = "--undefined--"
+
+class SyllableNucleiError(Exception):
+    """Custom exception for audio the script would fail to analyze."""
+    pass
+
+def _format(value: float, decimals: int) -> str:
+    """Format a value like Praat prints 'value:decimals', which shows the first
+    significant digit of small values and drops trailing zeros."""
+    if value is None or not np.isfinite(value):
+        return UNDEFINED
+    if value == 0:
+        return "0"
+    decimals = max(decimals, -int(np.floor(np.log10(abs(value)))))
+    text = f"{value:.{decimals}f}"
+    return text.rstrip("0").rstrip(".") if "." in text else text
+
+def _quantile(values: np.ndarray, factor: float) -> float:
+    """Quantile of values, interpolated like Praat's Get quantile."""
+    values = np.sort(values)
+    size = len(values)
+    if size == 1:
+        return float(values[0])
+    place = factor * size + 0.5
+    left = min(max(int(np.floor(place)), 1), size - 1)
+    if values[left] == values[left - 1]:
+        return float(values[left - 1])
+    return float(values[left - 1] + (place - left) * (values[left] - values[left - 1]))
+
+def _parabolic_extreme(values: np.ndarray, maximum: bool) -> float:
+    """Maximum or minimum of a contour like Praat's Get maximum... Parabolic,
+    the local extremes are refined with a parabola through their neighbours."""
+    y = values if maximum else -values
+    best = max(y[0], y[-1])
+    middle = y[1:-1]
+    is_peak = (middle > y[:-2]) & (middle >= y[2:])
+    if np.any(is_peak):
+        left, right, center = y[:-2][is_peak], y[2:][is_peak], middle[is_peak]
+        dy = 0.5 * (right - left)
+        d2y = 2.0 * center - left - right
+        best = max(best, float(np.max(center + 0.5 * dy * dy / d2y)))
+    return best if maximum else -best
+
+def _interpolate_cubic(y: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """Interpolate y at real 0-based indexes like Praat's Get value at time...
+    Cubic, which is linear next to the edges."""
+    size = len(y)
+    index = np.clip(index, 0, size - 1)
+    left = np.minimum(np.floor(index).astype(int), size - 2)
+    phi = index - left
+    yl, yr = y[left], y[left + 1]
+    dyl = 0.5 * (yr - y[np.maximum(left - 1, 0)])
+    dyr = 0.5 * (y[np.minimum(left + 2, size - 1)] - yl)
+    cubic = yl * (1.0 - phi) + yr * phi - phi * (1.0 - phi) * (
+        0.5 * (dyr - dyl) + (phi - 0.5) * (dyl + dyr - 2.0 * (yr - yl))
+    )
+    linear = yl + phi * (yr - yl)
+    has_neighbours = (left >= 1) & (left + 2 <= size - 1)
+    return np.where(has_neighbours, cubic, linear)
+
+def _interpolate_sinc(y: np.ndarray, index: np.ndarray, depth: int = SINC_DEPTH) -> np.ndarray:
+    """Interpolate y at real 0-based indexes with the windowed sinc of Praat,
+    whose depth shrinks to the samples available near the edges."""
+    size = len(y)
+    left = np.floor(index).astype(int)
+    phi = index - left
+    depths = np.minimum(np.minimum(depth, left + 1), size - 1 - left)[:, None]
+    offsets = np.arange(depth)
+    # Samples phi + k away on the left of the index and 1 - phi + k away on its right
+    near = np.concatenate((phi[:, None], 1.0 - phi[:, None]), axis=1)
+    distance = np.concatenate((near[:, :1] + offsets, near[:, 1:] + offsets), axis=1)
+    positions = np.concatenate((left[:, None] - offsets, left[:, None] + 1 + offsets), axis=1)
+    width = np.repeat(near + depths, depth, axis=1)
+    a = np.pi * distance
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weights = np.sin(a) / a * 0.5 * (1.0 + np.cos(a / width))
+    weights[np.tile(offsets, 2) >= depths] = 0.0
+    weights[phi == 0] = 0.0
+    result = np.sum(weights * np.take(y, positions, mode="clip"), axis=1)
+
+    # Shallow depths fall back to linear and cubic interpolation, exact indexes to the sample
+    shallow = depths[:, 0] <= 2
+    if np.any(shallow):
+        result[shallow] = _interpolate_cubic(y, index[shallow])
+    on_sample = phi == 0
+    result[on_sample] = y[left[on_sample]]
+    return result
+
+def _refine_maxima(y: np.ndarray, peaks: np.ndarray, iterations: int = 5,
+                   step: float = 1e-4) -> np.ndarray:
+    """Find the maximum of the sinc interpolated contour between the
+    neighbours of each local maximum, like Praat's Sinc70 peak interpolation.
+
+    The interpolation is smooth between samples but not on them, so the best
+    point of a grid of 1/8 of a sample is refined by Newton steps on finite
+    differences, on both of its sides, inside an interval between samples.
+
+    Args:
+        y (np.ndarray): Contour.
+        peaks (np.ndarray): 0-based indexes of local maxima, not at the edges.
+        iterations (int): Newton steps.
+        step (float): Distance in samples of the finite differences.
+
+    Returns:
+        np.ndarray: Real 0-based indexes of the maxima.
+    """
+    count = len(peaks)
+    grid = peaks[:, None] + np.linspace(-1.0, 1.0, 17)
+    values = _interpolate_sinc(y, grid.ravel()).reshape(grid.shape)
+    best = np.argmax(values, axis=1)
+    best_position, best_value = grid[np.arange(count), best], values[np.arange(count), best]
+
+    # Start half a grid step before and after the best point
+    position = np.concatenate((best_position - 1.0 / 16, best_position + 1.0 / 16))
+    bound = np.tile(peaks, 2)
+    cell = np.floor(position)
+    low = np.maximum(cell + step, bound - 1.0)
+    high = np.minimum(cell + 1.0 - step, bound + 1.0)
+    position = np.clip(position, low, high)
+    for _ in range(iterations):
+        before, center, after = _interpolate_sinc(
+            y, np.concatenate((position - step, position, position + step))
+        ).reshape(3, -1)
+        slope = (after - before) / (2.0 * step)
+        curvature = (after - 2.0 * center + before) / (step * step)
+        # Only move where the contour is concave, towards its top
+        with np.errstate(invalid="ignore", divide="ignore"):
+            move = np.where(curvature < 0, -slope / curvature, 0.0)
+        position = np.clip(position + move, low, high)
+
+    candidates = np.stack((best_position, position[:count], position[count:]))
+    candidate_values = np.stack((best_value, *_interpolate_sinc(y, position).reshape(2, -1)))
+    return candidates[np.argmax(candidate_values, axis=0), np.arange(count)]
+
+def _cut_short_intervals(intervals: List[list], sounding: bool, min_duration: float) -> None:
+    """Remove the intervals with a label shorter than min_duration, each one is
+    absorbed by the interval before it, then merge neighbours with the same
+    label. Follows Praat's IntervalTier_cutIntervals_minimumDuration."""
+    i = 0
+    while i < len(intervals) and len(intervals) > 1:
+        start, end, is_sounding = intervals[i]
+        if is_sounding == sounding and end - start < min_duration:
+            del intervals[i]
+            if i == 0:
+                intervals[0][0] = start
+            else:
+                intervals[i - 1][1] = end
+        else:
+            i += 1
+
+    i = 0
+    while i < len(intervals) - 1:
+        if intervals[i][2] != sounding and intervals[i + 1][2] != sounding:
+            intervals[i][1] = intervals[i + 1][1]
+            del intervals[i + 1]
+        else:
+            i += 1
+
+def _detect_silences(intensity: np.ndarray, times: np.ndarray, duration: float,
+                     threshold: float) -> List[list]:
+    """Split the audio in silent and sounding intervals, like Praat's
+    To TextGrid (silences) with the parameters of the script.
+
+    Args:
+        intensity (np.ndarray): Intensity contour in dB.
+        times (np.ndarray): Time of each frame of the contour.
+        duration (float): Duration of the audio in seconds.
+        threshold (float): Intensity in dB under which a frame is silent.
+
+    Returns:
+        List[list]: [start, end, is_sounding] of each interval, in order.
+    """
+    is_sounding = intensity >= threshold
+    # Boundaries lie at the first frame after each change
+    changes = np.flatnonzero(is_sounding[1:] != is_sounding[:-1]) + 1
+    boundaries = times[changes]
+    inside = (boundaries > 0.0) & (boundaries < duration)
+    edges = np.concatenate(([0.0], boundaries[inside], [duration]))
+    labels = np.concatenate(([is_sounding[0]], is_sounding[changes[inside]]))
+    intervals = [[float(edges[i]), float(edges[i + 1]), bool(labels[i])] for i in range(len(labels))]
+
+    # Short bursts between silences go first, then the remaining short silences
+    _cut_short_intervals(intervals, True, MIN_SOUNDING_SECONDS)
+    _cut_short_intervals(intervals, False, MIN_PAUSE_SECONDS)
+    return intervals
+
+def _find_nuclei(intensity: Intensity, sound: Sound, intervals: List[list],
+                 require_peak: bool) -> np.ndarray:
+    """Find the syllable nuclei: voiced intensity peaks in sounding intervals,
+    above the intensity threshold and followed by a dip of at least MIN_DIP_DB.
+
+    Args:
+        intensity (Intensity): Intensity contour of the audio.
+        sound (Sound): Audio.
+        intervals (List[list]): Silent and sounding intervals.
+        require_peak (bool): Fail without a peak above the threshold, like the 
+            full script does.
+
+    Raises:
+        SyllableNucleiError: No peak above the threshold and require_peak is set.
+
+    Returns:
+        np.ndarray: Time of each nucleus.
+    """
+    values = intensity.values[0]
+    x1, dx = intensity.x1, intensity.dx
+
+    min_int = _parabolic_extreme(values, maximum=False)
+    max99_int = _quantile(values, 0.99)
+    threshold = max(max99_int + SILENCE_DB, min_int)
+
+    # Every local maximum of the contour, refined and kept above the threshold
+    middle = values[1:-1]
+    peaks = (np.flatnonzero((middle > values[:-2]) & (middle >= values[2:])) + 1).astype(float)
+    if len(peaks) > 0:
+        peaks = _refine_maxima(values, peaks)
+    peak_values = _interpolate_cubic(values, peaks)
+    above = peak_values > threshold
+    peaks, peak_values = peaks[above], peak_values[above]
+    if len(peaks) == 0 and require_peak:
+        raise SyllableNucleiError("No intensity peak above the threshold")
+    if len(peaks) < 2:
+        return np.empty(0)
+
+    # A peak is valid when the dip until the next peak is deeper than MIN_DIP_DB,
+    # the last peak is never valid
+    first = np.ceil(peaks[:-1]).astype(int)
+    last = np.floor(peaks[1:]).astype(int)
+    dips = np.array([values[i:j + 1].min() for i, j in zip(first, last)])
+    valid = np.abs(peak_values[:-1] - dips) > MIN_DIP_DB
+    candidates = x1 + peaks[:-1][valid] * dx
+
+    # Keep the peaks voiced in the pitch track and inside a sounding interval
+    pitch = sound.to_pitch_ac(
+        time_step=0.02, pitch_floor=30, max_number_of_candidates=4, very_accurate=False,
+        silence_threshold=0.03, voicing_threshold=0.25, octave_cost=0.01,
+        octave_jump_cost=0.35, voiced_unvoiced_cost=0.25, pitch_ceiling=450
+    )
+    frequencies = pitch.selected_array["frequency"]
+    nearest = np.floor((candidates - pitch.x1) / pitch.dx + 0.5).astype(int)
+    voiced = (nearest >= 0) & (nearest < len(frequencies))
+    voiced[voiced] = frequencies[nearest[voiced]] > 0
+
+    ends = np.array([end for _, end, _ in intervals])
+    sounding = np.array([is_sounding for _, _, is_sounding in intervals])
+    which = np.minimum(np.searchsorted(ends, candidates, side="right"), len(intervals) - 1)
+    return candidates[voiced & sounding[which]]
+
+def _divide(numerator: float, denominator: float) -> float:
+    """Divide like Praat, by zero is undefined."""
+    return numerator / denominator if denominator != 0 else float("nan")
+
+def _measure(audio: AudioBuffer, word: bool) -> Tuple[List[str], Sound]:
+    """Measure the seven speech metrics of the script, see measure_syllable_nuclei."""
+    sound = Sound(audio.samples.astype(np.float64), sampling_frequency=audio.sample_rate)
+    duration = sound.xmax - sound.xmin
+    intensity = sound.to_intensity(minimum_pitch=50, time_step=None, subtract_mean=True)
+    values = intensity.values[0]
+
+    # Silences are quieter than SILENCE_DB under the 0.99 quantile of intensity
+    max_int = _parabolic_extreme(values, maximum=True)
+    max99_int = _quantile(values, 0.99)
+    silence_threshold = max_int - abs(SILENCE_DB - (max_int - max99_int))
+    intervals = _detect_silences(values, intensity.xs(), duration, silence_threshold)
+    if not word and len(intervals) < 2:
+        raise SyllableNucleiError("A noisy background or unnatural-sounding speech detected")
+
+    speaking_duration = sum(end - start for start, end, sounding in intervals if sounding)
+    sounding_count = sum(1 for _, _, sounding in intervals if sounding)
+    syllables = len(_find_nuclei(intensity, sound, intervals, require_peak=not word))
+
+    speech_rate = _divide(syllables, duration)
+    articulation_rate = _divide(syllables, speaking_duration)
+    pauses = sounding_count - 1
+    ratio = _divide(speech_rate, articulation_rate)
+    if word:
+        articulation_rate = articulation_rate if speaking_duration > 0 else 0.0
+        pauses = max(pauses, 0)
+        ratio = _divide(speaking_duration, duration)
+
+    output = [
+        _format(syllables, 0), _format(pauses, 0), _format(speech_rate, 0),
+        _format(articulation_rate, 0), _format(speaking_duration, 1),
+        _format(duration, 1), _format(ratio, 1),
+    ]
+    return output, sound
+
+def measure_syllable_nuclei(audio: AudioBuffer) -> List[str]:
+    """Measure audio like myspsolution.praat: number of syllables, number of
+    pauses, speech rate, articulation rate, speaking duration, total duration,
+    ratio and the f0 mean, standard deviation, median, minimum, maximum and 
+    quartiles. The pronunciation probability is undefined.
+
+    Args:
+        audio (AudioBuffer): Audio to analyze.
+
+    Raises:
+        SyllableNucleiError: The script would reject or fail on the audio.
+
+    Returns:
+        List[str]: Values as printed by the script.
+    """
+    output, sound = _measure(audio, word=False)
+    pitch = sound.to_pitch(time_step=PITCH_TIME_STEP, pitch_floor=PITCH_FLOOR, pitch_ceiling=PITCH_CEILING)
+    f0_statistics = [
+        (call(pitch, "Get mean", 0, 0, "Hertz"), 2),
+        (call(pitch, "Get standard deviation", 0, 0, "Hertz"), 2),
+        (call(pitch, "Get quantile", 0, 0, 0.5, "Hertz"), 1),
+        (call(pitch, "Get minimum", 0, 0, "Hertz", "Parabolic"), 0),
+        (call(pitch, "Get maximum", 0, 0, "Hertz", "Parabolic"), 0),
+        (call(pitch, "Get quantile", 0, 0, 0.25, "Hertz"), 0),
+        (call(pitch, "Get quantile", 0, 0, 0.75, "Hertz"), 0),
+    ]
+    return output + [_format(value, decimals) for value, decimals in f0_statistics] + [UNDEFINED]
+
+def measure_word_syllable_nuclei(audio: AudioBuffer) -> List[str]:
+    """Measure a single word like myspsolution_word.praat: the first seven
+    values of measure_syllable_nuclei, without rejecting audio with no pause.
+
+    Args:
+        audio (AudioBuffer): Audio to analyze.
+
+    Returns:
+        List[str]: Values as printed by the script.
+    """
+    output, _ = _measure(audio, word=True)
+    return output
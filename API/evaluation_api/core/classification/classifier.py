@@ -1,6 +1,11 @@
 import pickle
 import numpy as np
 import os
+import logging
+
+from core.utils.telemetry import stage_timer
+
+logger = logging.getLogger(__name__)
 
 class SpeechClassifier:
     def __init__(self):
@@ -16,14 +21,12 @@ class SpeechClassifier:
     def _load_model(self):
         """ Load the classifier model. """
         
-        print("Loading model...", end="")
         try:
             with open(self.full_model_path, "rb") as f:
                 self.tree = pickle.load(f)
-            print("Success!")
+            logger.info("Loaded classifier model")
         except Exception as e:
-            print("Failed.")
-            print(f"Speech Classifier error: Could not load model. {e}")
+            logger.error(f"Speech Classifier error: Could not load model. {e}")
         
     def _shape_data(self, difference_analysis:dict, wer:float)->np.array:
         """Reshape the difference analysis for the model.
@@ -34,17 +37,14 @@ class SpeechClassifier:
         Returns:
             np.array: Reshaped difference analysis.
         """
-        print("Reshaping data...", end="")
         difference_data = [abs(x) for x in list(difference_analysis.values())]
         difference_data.append(wer)
         try:
             n_features = len(difference_data)
             difference_np = np.array(difference_data).reshape(1, n_features)
-            print("Success!")
             return difference_np
         except Exception as e:
-            print("Failed.")
-            print(f"Error speech classifier: Could not reshape difference array. Check if the features are correct. {e}")
+            logger.error(f"Error speech classifier: Could not reshape difference array. Check if the features are correct. {e}")
     
     def get_classification(self, difference_analysis:dict, wer:float)->str:
         """Predict a label for the difference array as beginner, intermediate or advanced.
@@ -55,12 +55,30 @@ class SpeechClassifier:
         Returns:
             str: Label for classification.
         """
-        print("Predicting data...")
         difference_np = self._shape_data(difference_analysis, wer)
         try:
-            y_pred = self.tree.predict(difference_np)[-1]
+            with stage_timer("classification"):
+                y_pred = self.tree.predict(difference_np)[-1]
             label = self.label_map[y_pred]
             return label
         except Exception as e:
-            print(f"Error speech classifier: Could not predict. {e} ")
-            return "Unclassified"
\ No newline at end of file
+            logger.error(f"Error speech classifier: Could not predict. {e} ")
+            return "Unclassified"
+    
+    def get_classifications(self, features:np.ndarray)->list:
+        """Predict a label for each row of a feature matrix in a single call.
+
+        Args:
+            features (np.ndarray): Matrix with one row per attempt, with the 
+            absolute differences in analysis order followed by the WER.
+
+        Returns:
+            list: Label for each row.
+        """
+        try:
+            with stage_timer("classification"):
+                y_pred = self.tree.predict(features)
+            return [self.label_map[y] for y in y_pred]
+        except Exception as e:
+            logger.error(f"Error speech classifier: Could not predict batch. {e} ")
+            return ["Unclassified"] * len(features)
\ No newline at end of file
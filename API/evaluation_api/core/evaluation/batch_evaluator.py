@@ -0,0 +1,162 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from core.evaluation.evaluator import SpeechEvaluator
+from core.evaluation.wer_engine import WEREngine, get_wer_engine
+from core.classification.classifier import SpeechClassifier
+from core.utils.telemetry import stage_timer
+
+class BatchSpeechEvaluator():
+    """Class to evaluate many speech analyses at once. Differences, scores and
+    classifications are computed with NumPy over every attempt in a single
+    pass, with the same results as SpeechEvaluator and SpeechClassifier."""
+    # Order of the metrics in the matrices, same as the classifier features
+    FEATURES = SpeechEvaluator.METRICS
+
+    def __init__(self, classifier: Optional[SpeechClassifier] = None,
+                 wer_engine: Optional[WEREngine] = None):
+        self.classifier = classifier
+        self.weights = SpeechEvaluator.SCORE_WEIGHTS
+        self.wer_engine = wer_engine if wer_engine is not None else get_wer_engine()
+
+    def _to_matrix(self, analyses: List[dict]) -> np.ndarray:
+        """Stack the metrics of the analyses in feature order.
+
+        Raises:
+            ValueError: An analysis is missing a metric.
+        """
+        try:
+            return np.array(
+                [[float(analysis[key]) for key in self.FEATURES] for analysis in analyses],
+                dtype=np.float64
+            ).reshape(len(analyses), len(self.FEATURES))
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Analysis is missing a metric or has an invalid value: {e}")
+
+    def get_difference_matrix(self, reference: np.ndarray, user: np.ndarray) -> np.ndarray:
+        """Relative difference of each metric, truncated to one decimal and
+        negative when the user had less of it. Same as
+        SpeechEvaluator.get_difference_analysis.
+
+        Args:
+            reference (np.ndarray): Reference metrics, one row per attempt or a single row.
+            user (np.ndarray): User metrics, one row per attempt.
+
+        Returns:
+            np.ndarray: Difference matrix with one row per attempt.
+        """
+        reference = np.broadcast_to(reference, user.shape)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            relative = np.minimum(1.0, np.abs(reference - user) / np.abs(reference))
+        relative = np.where(reference == 0, np.where(user == 0, 0.0, 1.0), relative)
+        difference = np.trunc(relative * 10) / 10
+        return np.where(user < reference, -difference, difference)
+
+    def get_wer_vector(self, references: List[str], hypotheses: List[str],
+                       tolerance: float = 0.10) -> np.ndarray:
+        """Adjusted word error rate of each pair of transcriptions. Same as
+        SpeechEvaluator.compare_transcripts, repeated pairs are computed once.
+
+        Args:
+            references (List[str]): Reference transcriptions, one per attempt or a single one.
+            hypotheses (List[str]): User transcriptions, one per attempt.
+            tolerance (float): Acceptable WER threshold.
+
+        Returns:
+            np.ndarray: Adjusted WER of each attempt.
+        """
+        if len(references) == 1:
+            references = references * len(hypotheses)
+
+        computed: Dict[Tuple[str, str], float] = {}
+        wers = np.empty(len(hypotheses), dtype=np.float64)
+        for index, pair in enumerate(zip(references, hypotheses)):
+            if pair not in computed:
+                error_rate = round(self.wer_engine.wer(*pair), 1)
+                computed[pair] = max(0.0, round(error_rate - tolerance, 1))
+            wers[index] = computed[pair]
+        return wers
+
+    def get_score_matrix(self, difference: np.ndarray, wers: np.ndarray) -> Dict[str, np.ndarray]:
+        """Score every attempt. Same as SpeechEvaluator._get_analysis_score.
+
+        Args:
+            difference (np.ndarray): Difference matrix with one row per attempt.
+            wers (np.ndarray): Adjusted WER of each attempt.
+
+        Returns:
+            Dict[str, np.ndarray]: Integer scores of each category and total_score.
+        """
+        columns = {key: index for index, key in enumerate(self.FEATURES)}
+        n_attempts = difference.shape[0]
+
+        def compute_scores(criteria_weight: dict) -> np.ndarray:
+            """Compute the weighted integer score (0-10) of every attempt."""
+            score = np.zeros(n_attempts, dtype=np.float64)
+            for metric, weight in criteria_weight.items():
+                if metric == "wer":
+                    diff = wers
+                elif metric in columns:
+                    diff = np.abs(difference[:, columns[metric]])
+                else:
+                    # Same as a metric missing from the difference analysis
+                    diff = np.zeros(n_attempts, dtype=np.float64)
+                score += (1 - np.minimum(diff, 1)) * weight
+            return np.clip(np.round(score * 10), 0, 10).astype(int)
+
+        scores = {
+            f"{category}_score": compute_scores(criteria_weight)
+            for category, criteria_weight in self.weights.items()
+        }
+        scores["total_score"] = np.round(sum(scores.values()) * 2.5).astype(int)
+        return scores
+
+    def evaluate(self, user_analyses: List[dict], reference_analyses: List[dict],
+                 classify: bool = True) -> List[dict]:
+        """Score and classify many user analyses against their references.
+
+        Args:
+            user_analyses (List[dict]): Analyses of the user's audios.
+            reference_analyses (List[dict]): One reference per user analysis, or
+            a single reference shared by all of them.
+            classify (bool): Whether to predict the label of each attempt.
+
+        Raises:
+            ValueError: The number of references doesn't match the analyses,
+            or an analysis is missing a metric.
+
+        Returns:
+            List[dict]: Scores and label of each attempt, in input order.
+        """
+        if not user_analyses:
+            return []
+        if len(reference_analyses) not in (1, len(user_analyses)):
+            raise ValueError("Expected one reference analysis or one per user analysis.")
+
+        try:
+            references = [analysis["transcription"] for analysis in reference_analyses]
+            hypotheses = [analysis["transcription"] for analysis in user_analyses]
+        except KeyError:
+            raise ValueError("Analysis is missing the transcription.")
+
+        with stage_timer("wer"):
+            wers = self.get_wer_vector(references, hypotheses)
+        with stage_timer("scoring"):
+            difference = self.get_difference_matrix(
+                self._to_matrix(reference_analyses),
+                self._to_matrix(user_analyses)
+            )
+            scores = self.get_score_matrix(difference, wers)
+
+        labels = [None] * len(user_analyses)
+        if classify and self.classifier is not None:
+            features = np.column_stack([np.abs(difference), wers])
+            labels = self.classifier.get_classifications(features)
+
+        return [
+            {
+                **{key: int(values[index]) for key, values in scores.items()},
+                "label": labels[index],
+            }
+            for index in range(len(user_analyses))
+        ]
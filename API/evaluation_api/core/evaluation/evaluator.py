@@ -1,8 +1,44 @@
-from jiwer import wer
+from typing import Optional, Tuple
 import math
+import logging
+
+from core.evaluation.wer_engine import WEREngine, TranscriptAlignment, get_wer_engine
+from core.utils.telemetry import stage_timer
+
+logger = logging.getLogger(__name__)
+
 class SpeechEvaluator():
     """Class to evaluate speech analysis."""
+    # Weight of each metric in the score of each category
+    SCORE_WEIGHTS = {
+        "clarity": {"wer": 0.9, "syllables": 0.1},
+        "speed": {
+            "speech_rate": 0.7, 
+            "speaking_duration": 0.15, 
+            "total_duration": 0.15
+        },
+        "articulation": {"articulation_rate": 0.8, "syllables": 0.2},
+        "rythm": {"ratio": 0.7, "pauses": 0.3},
+    }
+    # Praat metrics compared between user and reference, in the order of the
+    # classifier features. Other keys of an analysis, like trimmed_duration, aren't
+    METRICS = [
+        "number_of_syllables",
+        "number_of_pauses",
+        "speech_rate",
+        "articulation_rate",
+        "speaking_duration",
+        "total_duration",
+        "ratio",
+    ]
     
+    def __init__(self, wer_engine: Optional[WEREngine] = None):
+        self.wer_engine = wer_engine if wer_engine is not None else get_wer_engine()
+
+    def _adjust_error_rate(self, error_rate: float, tolerance: float) -> float:
+        """Round the WER to one decimal and subtract the tolerance, without going below 0."""
+        return max(0.0, round(round(error_rate, 1) - tolerance, 1))
+
     def compare_transcripts(self, reference:str, hypothesis:str, 
                              tolerance:float=0.10)->float:
         """Compare two transcriptions using Word Error Rate and subtract a 
@@ -16,11 +52,32 @@ class SpeechEvaluator():
         Returns:
             float: Adjusted WER (WER - tolerance). If negative, the WER is within tolerance.
         """
-        error_rate = round(wer(reference, hypothesis), 1)
-        adjusted_error = max(0.0, round(error_rate - tolerance, 1))
-        print(f"wer:{adjusted_error}")
-        print(f"Calculating wer...success!")
+        with stage_timer("wer"):
+            adjusted_error = self._adjust_error_rate(
+                self.wer_engine.wer(reference, hypothesis),
+                tolerance
+            )
+        logger.debug("wer:%s", adjusted_error)
         return adjusted_error
+
+    def align_transcripts(self, reference:str, hypothesis:str,
+                          tolerance:float=0.10) -> Tuple[float, TranscriptAlignment]:
+        """Compare two transcriptions like compare_transcripts, also returning
+        the words that were substituted, deleted or inserted.
+
+        Args:
+            reference (str): Ground truth transcription.
+            hypothesis (str): Predicted transcription.
+            tolerance (float): Acceptable WER threshold (e.g. 0.10 for 10%).
+
+        Returns:
+            Tuple[float, TranscriptAlignment]: Adjusted WER and word alignment.
+        """
+        with stage_timer("wer"):
+            alignment = self.wer_engine.align(reference, hypothesis)
+            adjusted_error = self._adjust_error_rate(alignment.wer, tolerance)
+        logger.debug("wer:%s alignment:%s", adjusted_error, alignment)
+        return adjusted_error, alignment
     
     
     def _get_analysis_score(self, difference_analysis: dict, wer: float) -> dict:
@@ -35,16 +92,7 @@ class SpeechEvaluator():
             dict: Integer scores for clarity, speed, articulation, rythm, and total_score.
         """
         
-        weights = {
-            "clarity": {"wer": 0.9, "syllables": 0.1},
-            "speed": {
-                "speech_rate": 0.7, 
-                "speaking_duration": 0.15, 
-                "total_duration": 0.15
-            },
-            "articulation": {"articulation_rate": 0.8, "syllables": 0.2},
-            "rythm": {"ratio": 0.7, "pauses": 0.3},
-        }
+        weights = self.SCORE_WEIGHTS
 
         def compute_score(criteria_weight: dict) -> int:
             """Compute a weighted integer score (0-10) for an assessment 
@@ -70,7 +118,6 @@ class SpeechEvaluator():
             (clarity_score + speed_score + articulation_score + rythm_score) * 2.5
         )
         
-        print(f"Calculating evaluation score...success!")
         return {
             "clarity_score": clarity_score,
             "speed_score": speed_score,
@@ -102,23 +149,18 @@ class SpeechEvaluator():
                 return 0.0 if b == 0 else 1.0
             return min(1.0, abs(a - b) / abs(a))
         
-        categories = user_analysis.keys()
+        categories = [category for category in self.METRICS if category in user_analysis]
         difference_analysis = dict()
         for category in categories:
-            if category != "transcription":
-                difference = math.trunc(
-                    relative_diff(reference_analysis[category],
-                                  user_analysis[category]) * 10
-                ) / 10
-                if user_analysis[category] < reference_analysis[category]:
-                    difference *= -1
-                difference_analysis[category] =  difference
+            difference = math.trunc(
+                relative_diff(reference_analysis[category],
+                              user_analysis[category]) * 10
+            ) / 10
+            if user_analysis[category] < reference_analysis[category]:
+                difference *= -1
+            difference_analysis[category] =  difference
         
-        print("difference analysis:")
-        for key, value in difference_analysis.items():
-            print(f"{key}: {value}")
-            
-        print(f"Calculating difference analysis...success!") 
+        logger.debug("difference analysis: %s", difference_analysis)
         return difference_analysis
         
     def get_score(self, user_analysis:dict, reference_analysis:dict) -> dict:
@@ -138,9 +180,25 @@ class SpeechEvaluator():
             reference_analysis["transcription"],
             user_analysis["transcription"]
         )
-        difference_analysis = self.get_difference_analysis(
-            reference_analysis, 
-            user_analysis
-        )
-        analysis_score = self._get_analysis_score(difference_analysis, wer)
-        return analysis_score 
\ No newline at end of file
+        with stage_timer("scoring"):
+            difference_analysis = self.get_difference_analysis(
+                reference_analysis, 
+                user_analysis
+            )
+            analysis_score = self._get_analysis_score(difference_analysis, wer)
+        return analysis_score
+
+    def get_score_from_difference(self, difference_analysis:dict, wer:float) -> dict:
+        """Get the score of the user's audio from an already computed difference
+        analysis and word error rate.
+
+        Args:
+            difference_analysis (dict): Relative difference between reference and user analysis.
+            wer (float): Word Error Rate.
+
+        Returns:
+            dict: User's audio score with clarity_score, speed_score, 
+            articulation_score, rythm_score, and total_score.
+        """
+        with stage_timer("scoring"):
+            return self._get_analysis_score(difference_analysis, wer)
\ No newline at end of file
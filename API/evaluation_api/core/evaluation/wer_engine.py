@@ -0,0 +1,149 @@
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Tuple
+from rapidfuzz.distance import Levenshtein
+import threading
+import re
+
+from core.utils.cache import LRUCache
+
+# Same tokenization as the default transformation of jiwer.wer
+_MULTIPLE_SPACES = re.compile(r"\s\s+")
+# Id of the hypothesis words missing from the reference, they never match
+_UNKNOWN_WORD = -1
+
+@dataclass(frozen=True)
+class _Reference:
+    """Tokenized reference transcription, with an integer id for each distinct word."""
+    words: Tuple[str, ...]
+    word_ids: Dict[str, int]
+    ids: Tuple[int, ...]
+
+@dataclass(frozen=True)
+class TranscriptAlignment:
+    """Word level alignment of a user transcription with its reference."""
+    wer: float
+    hits: int
+    substitutions: int
+    deletions: int
+    insertions: int
+    # Reference word and the word said instead of it
+    substituted: List[Tuple[str, str]]
+    # Reference words the user didn't say
+    deleted: List[str]
+    # Words said that aren't in the reference
+    inserted: List[str]
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+def tokenize(text: str) -> List[str]:
+    """Split a transcription into words the same way jiwer.wer does, on single
+    spaces after collapsing runs of whitespace. Case and punctuation are kept.
+
+    Args:
+        text (str): Transcription.
+
+    Returns:
+        List[str]: Words of the transcription.
+    """
+    return [word for word in _MULTIPLE_SPACES.sub(" ", text).strip().split(" ") if word]
+
+class WEREngine:
+    """Word error rate between a reference and a user transcription, with the
+    same results as jiwer.wer. References are tokenized once and their words
+    mapped to integer ids, so every attempt at the same resource only tokenizes
+    the user transcription. The edit distance runs over the integer ids."""
+    def __init__(self, cache_size: int = 4096):
+        self.references = LRUCache(max_size=cache_size)
+
+    def _get_reference(self, reference: str) -> _Reference:
+        """Get the tokenized reference, from the cache if it was already seen."""
+        cached = self.references.get(reference)
+        if cached is not None:
+            return cached
+
+        words = tuple(tokenize(reference))
+        word_ids = {}
+        for word in words:
+            word_ids.setdefault(word, len(word_ids))
+        cached = _Reference(words, word_ids, tuple(word_ids[word] for word in words))
+        self.references.set(reference, cached)
+        return cached
+
+    def _encode(self, reference: _Reference, hypothesis: str) -> Tuple[List[str], List[int]]:
+        """Tokenize the hypothesis and map its words to the ids of the reference."""
+        words = tokenize(hypothesis)
+        return words, [reference.word_ids.get(word, _UNKNOWN_WORD) for word in words]
+
+    def wer(self, reference: str, hypothesis: str) -> float:
+        """Get the word error rate of a transcription.
+
+        Args:
+            reference (str): Ground truth transcription.
+            hypothesis (str): Predicted transcription.
+
+        Returns:
+            float: Edits over reference words. With an empty reference, the
+            number of words of the hypothesis.
+        """
+        cached = self._get_reference(reference)
+        _, ids = self._encode(cached, hypothesis)
+        if not cached.ids:
+            return float(len(ids))
+        return Levenshtein.distance(cached.ids, ids) / len(cached.ids)
+
+    def align(self, reference: str, hypothesis: str) -> TranscriptAlignment:
+        """Get the word error rate of a transcription and which words were
+        substituted, deleted and inserted.
+
+        Args:
+            reference (str): Ground truth transcription.
+            hypothesis (str): Predicted transcription.
+
+        Returns:
+            TranscriptAlignment: Error rate, edit counts and edited words.
+        """
+        cached = self._get_reference(reference)
+        words, ids = self._encode(cached, hypothesis)
+
+        hits = 0
+        substituted, deleted, inserted = [], [], []
+        for opcode in Levenshtein.opcodes(cached.ids, ids):
+            reference_words = cached.words[opcode.src_start:opcode.src_end]
+            hypothesis_words = words[opcode.dest_start:opcode.dest_end]
+            if opcode.tag == "equal":
+                hits += len(reference_words)
+            elif opcode.tag == "replace":
+                substituted.extend(zip(reference_words, hypothesis_words))
+            elif opcode.tag == "delete":
+                deleted.extend(reference_words)
+            elif opcode.tag == "insert":
+                inserted.extend(hypothesis_words)
+
+        edits = len(substituted) + len(deleted) + len(inserted)
+        return TranscriptAlignment(
+            wer=edits / len(cached.ids) if cached.ids else float(len(inserted)),
+            hits=hits,
+            substitutions=len(substituted),
+            deletions=len(deleted),
+            insertions=len(inserted),
+            substituted=substituted,
+            deleted=deleted,
+            inserted=inserted
+        )
+
+_wer_engine: Optional[WEREngine] = None
+_lock = threading.Lock()
+
+def get_wer_engine() -> WEREngine:
+    """Get the engine shared by every evaluator, so its tokenized references
+    are reused across requests.
+
+    Returns:
+        WEREngine: Shared engine.
+    """
+    global _wer_engine
+    with _lock:
+        if _wer_engine is None:
+            _wer_engine = WEREngine()
+        return _wer_engine
@@ -1,16 +1,41 @@
-import requests
 from json.decoder import JSONDecodeError
+from typing import Optional
 import json
-from config import ARLI_API_KEY
+import logging
+from config import (
+    ARLI_API_KEY, ARLI_API_URL, ARLI_TIMEOUT, ARLI_MAX_TRIES,
+    ARLI_BACKOFF_SECONDS, ARLI_HEDGE_PERCENTILE, ARLI_HEDGE_MIN_SAMPLES
+)
+from core.feedback.arli_client import ArliClient, ArliRequestError
+
+logger = logging.getLogger(__name__)
 
 class SpeechAdvisor:
     """Class that takes two audio analysis and returns recommendations."""
-    def __init__(self):
+    # Change when the prompt changes, cached feedback depends on it
+    PROMPT_VERSION = "prompt-v1"
+    # Model selected in the ARLI API key parameters
+    MODEL_NAME = "Qwen3-14B-ArliAI-RpR-v5-Small"
+    def __init__(self, client: Optional[ArliClient] = None):
         self.API_KEY = None
         self._load_api_key()
         # self.model = "Gemma-3-27B-it"
-        self.API_URL = "https://api.arliai.com/v1/completions"
+        self.API_URL = ARLI_API_URL
+        self.client = client if client is not None else ArliClient(
+            self.API_URL,
+            self.API_KEY,
+            timeout=ARLI_TIMEOUT,
+            max_tries=ARLI_MAX_TRIES,
+            backoff_seconds=ARLI_BACKOFF_SECONDS,
+            hedge_percentile=ARLI_HEDGE_PERCENTILE,
+            hedge_min_samples=ARLI_HEDGE_MIN_SAMPLES
+        )
         
+    @property
+    def version(self) -> str:
+        """Version of the prompt and model used to generate feedback."""
+        return f"arli/{self.MODEL_NAME}/{self.PROMPT_VERSION}"
+
     def _load_api_key(self):
         """Load the API key from the config file."""
         self.API_KEY = ARLI_API_KEY
@@ -72,14 +97,18 @@ class SpeechAdvisor:
         
         return prompt
     
-    def _make_api_request(self, prompt: str) -> dict:
+    async def _make_api_request(self, prompt: str) -> dict:
         """Send a prompt to the Arli AI API and retrieve the structured response.
 
         Args:
             prompt (str): Prompt for the LLM model.
 
+        Raises:
+            ArliRequestError: Every attempt of the client failed.
+
         Returns:
             dict: Dictionary with speed_tip, clarity_tip, articulation_tip, rythm_tip.
+            Empty if the response is malformed.
         """
 
         # JSON schema to enforce format
@@ -130,48 +159,35 @@ class SpeechAdvisor:
             "stop":["}"]
         }
 
-        headers = {
-            'Content-Type': 'application/json',
-            'Authorization': f"Bearer {self.API_KEY}"
-        }
-
-        try:
-            response = requests.post(self.API_URL, 
-                                     headers=headers, 
-                                     data=json.dumps(payload)
-                                    )
-            response_json = response.json()
-
-            # Expect structured JSON response under choices[0].text
-            if (
-                isinstance(response_json, dict)
-                and "choices" in response_json
-                and isinstance(response_json["choices"], list)
-                and response_json["choices"]
-                and "text" in response_json["choices"][0]
-            ):
+        # Connection reuse, deadlines, retries and hedging are handled by the client
+        response_json = await self.client.complete(payload)
+
+        # Expect structured JSON response under choices[0].text
+        if (
+            isinstance(response_json, dict)
+            and "choices" in response_json
+            and isinstance(response_json["choices"], list)
+            and response_json["choices"]
+            and "text" in response_json["choices"][0]
+        ):
+            try:
+                response_text = response_json["choices"][0]["text"]
+                logger.debug("ARLI response: %s", response_text)
+                return json.loads(response_text)
+            except JSONDecodeError as e:
+                fixed = response_text[response_text.rfind("{"):] + "}"
                 try:
-                    response_text = response_json["choices"][0]["text"]
-                    print(response_text)
-                    return json.loads(response_text)
-                except JSONDecodeError as e:
-                    fixed = response_text[response_text.rfind("{"):] + "}"
-                    try:
-                        final_response = json.loads(fixed)
-                        return final_response
-                    except JSONDecodeError as inner_e:
-                        print(f"JSON decode failed after fix: {inner_e}")
-                        return {}
-
-            print("Warning: Unexpected ARLI API response structure")
-            print(f"Response: {response_json}")
-            return {}
-
-        except Exception as e:
-            print(f"Error obtaining ARLI API feedback: {e}")
-            return {}
-
-    def get_feedback(self, difference_analysis: dict, wer: float) -> dict:
+                    final_response = json.loads(fixed)
+                    return final_response
+                except JSONDecodeError as inner_e:
+                    logger.error(f"JSON decode failed after fix: {inner_e}")
+                    return {}
+
+        logger.warning("Unexpected ARLI API response structure")
+        logger.debug("Response: %s", response_json)
+        return {}
+
+    async def get_feedback(self, difference_analysis: dict, wer: float) -> dict:
         """Generate structured speech feedback comparing user and reference audio.
 
         Args:
@@ -183,20 +199,25 @@ class SpeechAdvisor:
         """
         prompt = self._create_prompt(difference_analysis, wer)
         
-        MAX_TRIES = 3
+        # Failed requests are already retried by the client, only a malformed
+        # answer is asked for again
+        MAX_TRIES = 2
         response_keys = ["speed_tip", "clarity_tip", "articulation_tip", "rythm_tip"]
         
         attempt = 1
-        while attempt < MAX_TRIES:
-            print(f"Making a request to ARLI model, attempt {attempt}...")
-            response = self._make_api_request(prompt)
+        while attempt <= MAX_TRIES:
+            logger.debug("Making a request to ARLI model, attempt %s...", attempt)
+            try:
+                response = await self._make_api_request(prompt)
+            except ArliRequestError as e:
+                logger.error(f"Error obtaining ARLI API feedback: {e}")
+                return {}
             if (
                     isinstance(response, dict) and 
                     all(key in response for key in response_keys)
                 ):
-                    print("Successful response!")
                     return response
-            print(f"Attempt {attempt} failed. Retrying...")    
+            logger.warning(f"Attempt {attempt} returned malformed feedback.")
             attempt += 1
 
         # Fallback if API fails or returns malformed output
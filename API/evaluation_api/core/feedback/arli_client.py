@@ -0,0 +1,180 @@
+from collections import deque
+from typing import Optional
+import asyncio
+import random
+import time
+import httpx
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ArliRequestError(Exception):
+    """Custom exception for requests to the ARLI API that failed every attempt."""
+    pass
+
+class ArliClient:
+    """Asynchronous client for the ARLI completions API. Connections are pooled
+    and reused between requests, each attempt has its own deadline and failed
+    attempts are retried with exponential backoff. When hedging is enabled, a
+    second identical request is sent if the first one takes longer than the
+    given percentile of recent latencies, and the first answer wins."""
+    # Responses worth retrying, any other error status is final
+    RETRY_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+    def __init__(self, api_url: str, api_key: str, timeout: float = 30,
+                 max_tries: int = 3, backoff_seconds: float = 0.5,
+                 hedge_percentile: float = 0.95, hedge_min_samples: int = 20,
+                 max_connections: int = 20):
+        self.api_url = api_url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_tries = max(1, max_tries)
+        self.backoff_seconds = backoff_seconds
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.max_connections = max_connections
+        self._client: Optional[httpx.AsyncClient] = None
+        self._latencies = deque(maxlen=200)
+
+        # Metrics
+        self.requests = 0
+        self.attempts = 0
+        self.retries = 0
+        self.failures = 0
+        self.hedged_requests = 0
+        self.hedge_wins = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the pooled HTTP client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers={
+                    "Content-Type": "application/json",
+                    "Authorization": f"Bearer {self.api_key}"
+                },
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self._client
+
+    def _percentile(self, percentile: float) -> Optional[float]:
+        """Get a percentile of recent latencies, in seconds."""
+        if not self._latencies:
+            return None
+        latencies = sorted(self._latencies)
+        index = min(len(latencies) - 1, int(percentile * len(latencies)))
+        return latencies[index]
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Get how long to wait before hedging, None if hedging is disabled or
+        there are not enough latency samples yet."""
+        if not self.hedge_percentile or len(self._latencies) < self.hedge_min_samples:
+            return None
+        return self._percentile(self.hedge_percentile)
+
+    async def _post(self, payload: dict) -> dict:
+        """Send a single request and return its JSON body.
+
+        Raises:
+            httpx.HTTPStatusError: The API answered with an error status.
+            httpx.TransportError: The API could not be reached in time.
+        """
+        self.attempts += 1
+        start = time.perf_counter()
+        response = await self._get_client().post(self.api_url, json=payload)
+        response.raise_for_status()
+        self._latencies.append(time.perf_counter() - start)
+        return response.json()
+
+    async def _post_hedged(self, payload: dict) -> dict:
+        """Send a request and, if it's slower than usual, a second identical one.
+        The first successful answer is returned and the other request is cancelled."""
+        hedge_delay = self._hedge_delay()
+        primary = asyncio.ensure_future(self._post(payload))
+        if hedge_delay is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+        if done:
+            return primary.result()
+
+        self.hedged_requests += 1
+        hedge = asyncio.ensure_future(self._post(payload))
+        pending = {primary, hedge}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def complete(self, payload: dict) -> dict:
+        """Send a completion request, retrying failed attempts with exponential
+        backoff.
+
+        Args:
+            payload (dict): Completion request body.
+
+        Raises:
+            ArliRequestError: Every attempt failed.
+
+        Returns:
+            dict: JSON body of the response.
+        """
+        self.requests += 1
+        for attempt in range(1, self.max_tries + 1):
+            try:
+                return await asyncio.wait_for(self._post_hedged(payload), self.timeout)
+            except httpx.HTTPStatusError as e:
+                error = e
+                if e.response.status_code not in self.RETRY_STATUS_CODES:
+                    break
+            except (httpx.TransportError, asyncio.TimeoutError, ValueError) as e:
+                error = e
+
+            if attempt < self.max_tries:
+                self.retries += 1
+                delay = self.backoff_seconds * 2 ** (attempt - 1)
+                logger.warning(f"ARLI request attempt {attempt} failed: {error!r}. Retrying in {delay:.2f}s...")
+                await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+
+        self.failures += 1
+        raise ArliRequestError(f"ARLI request failed: {error!r}")
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def metrics(self) -> dict:
+        """Get request, retry and hedging counters and recent latencies.
+
+        Returns:
+            dict: Client metrics.
+        """
+        def to_ms(seconds: Optional[float]) -> Optional[float]:
+            return round(seconds * 1000, 1) if seconds is not None else None
+
+        return {
+            "requests": self.requests,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "failures": self.failures,
+            "hedged_requests": self.hedged_requests,
+            "hedge_wins": self.hedge_wins,
+            "p50_latency_ms": to_ms(self._percentile(0.5)),
+            "p95_latency_ms": to_ms(self._percentile(0.95)),
+            "hedge_after_ms": to_ms(self._hedge_delay()),
+        }
@@ -0,0 +1,51 @@
+"""Local server that imitates the ARLI completions API, so the ARLI advisor can
+be used in tests and load tests without an API key or network access.
+
+Run from the evaluation_api directory:
+    uvicorn core.feedback.arli_stub:app --port 8002
+
+and point the API to it in the .env file:
+    ARLI_API_URL = "http://127.0.0.1:8002/v1/completions"
+"""
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+import asyncio
+import random
+import json
+import os
+
+from core.feedback.template_advisor import TemplateSpeechAdvisor
+
+# Average latency, random variation added to it and share of failed requests
+STUB_DELAY_MS = float(os.getenv("ARLI_STUB_DELAY_MS", 0))
+STUB_JITTER_MS = float(os.getenv("ARLI_STUB_JITTER_MS", 0))
+STUB_ERROR_RATE = float(os.getenv("ARLI_STUB_ERROR_RATE", 0))
+
+DIFFERENCE_KEYS = [
+    "number_of_syllables",
+    "number_of_pauses",
+    "speech_rate",
+    "articulation_rate",
+    "speaking_duration",
+    "total_duration",
+    "ratio",
+]
+
+app = FastAPI(title="ARLI API stub")
+template_advisor = TemplateSpeechAdvisor()
+stub_feedback = template_advisor.get_feedback({key: 0.0 for key in DIFFERENCE_KEYS}, 0.0)
+
+@app.post("/v1/completions")
+async def completions(request: Request):
+    await request.json()
+
+    delay = STUB_DELAY_MS + random.uniform(0, STUB_JITTER_MS)
+    if delay > 0:
+        await asyncio.sleep(delay / 1000)
+
+    if random.random() < STUB_ERROR_RATE:
+        return JSONResponse(status_code=503, content={"detail": "Stub error."})
+
+    # Same shape as the ARLI answer, the closing brace is removed by the stop token
+    text = json.dumps(stub_feedback)[:-1]
+    return {"choices": [{"index": 0, "text": text, "finish_reason": "stop"}]}
@@ -0,0 +1,108 @@
+"""Generate the phrase bank used by TemplateSpeechAdvisor with one of the LLM
+advisors. Each band of each category is sent to the LLM as a representative
+difference analysis, and the tips it returns are stored as phrases.
+
+Run from the evaluation_api directory:
+    python -m core.feedback.build_phrase_bank --advisor local --variants 3
+"""
+from typing import Callable, Dict, List
+import argparse
+import asyncio
+import json
+
+from core.feedback.template_advisor import TemplateSpeechAdvisor
+
+# Value sent to the LLM for each band
+BAND_VALUES = {
+    "close": 0.0,
+    "somewhat": 0.3,
+    "very": 0.7,
+}
+DIFFERENCE_KEYS = [
+    "number_of_syllables",
+    "number_of_pauses",
+    "speech_rate",
+    "articulation_rate",
+    "speaking_duration",
+    "total_duration",
+    "ratio",
+]
+
+def get_band_inputs(category: str, band: str) -> tuple:
+    """Build the difference analysis and WER that represent a band of a category.
+
+    Args:
+        category (str): Feedback category, such as speed_tip.
+        band (str): Band of the category, such as more_somewhat.
+
+    Returns:
+        tuple: Difference analysis and WER.
+    """
+    direction, _, magnitude = band.rpartition("_")
+    value = BAND_VALUES[magnitude]
+    if direction == "less":
+        value *= -1
+
+    difference_analysis = {key: 0.0 for key in DIFFERENCE_KEYS}
+    wer = 0.0
+    metric = TemplateSpeechAdvisor.CATEGORY_METRICS[category]
+    if metric == "wer":
+        wer = value
+    else:
+        difference_analysis[metric] = value
+    return difference_analysis, wer
+
+def build_phrase_bank(get_feedback: Callable[[dict, float], dict], variants: int,
+                      version: str) -> Dict[str, Dict[str, Dict[str, List[str]]]]:
+    """Ask an advisor for feedback on every band and collect the tips.
+
+    Args:
+        get_feedback (Callable[[dict, float], dict]): Feedback function of the advisor.
+        variants (int): Number of answers requested for each band.
+        version (str): Version stored in the phrase bank.
+
+    Returns:
+        dict: Phrase bank.
+    """
+    template_advisor = TemplateSpeechAdvisor()
+    phrase_bank = {"version": version}
+    for category in TemplateSpeechAdvisor.CATEGORY_METRICS:
+        phrase_bank[category] = {}
+        for band in template_advisor.phrase_bank[category]:
+            difference_analysis, wer = get_band_inputs(category, band)
+            slots = {slot: [] for slot in TemplateSpeechAdvisor.TIP_SLOTS}
+            for _ in range(variants):
+                tips = get_feedback(difference_analysis, wer).get(category, [])
+                for slot, tip in zip(TemplateSpeechAdvisor.TIP_SLOTS, tips):
+                    if tip not in slots[slot]:
+                        slots[slot].append(tip)
+            if not all(slots.values()):
+                # Keep the existing phrases rather than leaving a band empty
+                print(f"No tips generated for {category} {band}, keeping current phrases.")
+                slots = template_advisor.phrase_bank[category][band]
+            phrase_bank[category][band] = slots
+            print(f"Generated {category} {band}.")
+    return phrase_bank
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the template feedback phrase bank.")
+    parser.add_argument("--advisor", choices=["arli", "local"], default="local")
+    parser.add_argument("--variants", type=int, default=3)
+    parser.add_argument("--version", default="phrase-bank-v1")
+    parser.add_argument("--output", default=TemplateSpeechAdvisor().phrase_bank_path)
+    args = parser.parse_args()
+
+    if args.advisor == "arli":
+        from core.feedback.advisor import SpeechAdvisor
+        advisor = SpeechAdvisor()
+        # The ARLI advisor is asynchronous, run every request in the same loop
+        loop = asyncio.new_event_loop()
+        get_feedback = lambda difference, wer: loop.run_until_complete(advisor.get_feedback(difference, wer))
+    else:
+        from core.feedback.local_advisor import LocalSpeechAdvisor
+        get_feedback = LocalSpeechAdvisor().get_feedback
+
+    phrase_bank = build_phrase_bank(get_feedback, args.variants, args.version)
+    with open(args.output, "w", encoding="utf-8") as bank_file:
+        json.dump(phrase_bank, bank_file, indent=4, ensure_ascii=False)
+    print(f"Phrase bank saved to {args.output}")
@@ -0,0 +1,113 @@
+from typing import Callable, Optional
+import hashlib
+import random
+import json
+import time
+
+from core.utils.cache import TieredCache
+
+class FeedbackCache:
+    """Cache of LLM feedback keyed by the difference analysis and WER, which are
+    already truncated to one decimal, together with the version of the advisor.
+    The model is asked max_variants times for each key, keeping the distinct
+    answers, and then one of them is picked at random so repeated attempts
+    don't always get the same tips."""
+    def __init__(self, cache: TieredCache, max_variants: int = 3,
+                 ttl_seconds: Optional[float] = None):
+        self.cache = cache
+        self.max_variants = max(1, max_variants)
+        self.ttl = ttl_seconds
+
+    def _get_key(self, advisor_version: str, difference_analysis: dict, wer: float) -> str:
+        """Get the cache key of a quantized difference analysis and WER.
+
+        Args:
+            advisor_version (str): Version of the advisor and its model.
+            difference_analysis (dict): Analysis of differences between user and reference analysis.
+            wer (float): Word error rate between the user and reference transcription.
+
+        Returns:
+            str: Cache key.
+        """
+        quantized = {key: round(float(value), 1) for key, value in difference_analysis.items()}
+        quantized["wer"] = round(float(wer), 1)
+        payload = f"{advisor_version}:{json.dumps(quantized, sort_keys=True)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _get_entry(self, key: str) -> dict:
+        """Get the cached answers of a key and the number of answers generated
+        for it, dropping them if they expired."""
+        entry = self.cache.get(key)
+        if not entry:
+            return {"variants": [], "generated": 0}
+        if self.ttl is not None and time.time() - entry["created_at"] > self.ttl:
+            return {"variants": [], "generated": 0}
+        # Entries stored before the counter was added count their answers
+        generated = entry.get("generated", len(entry["variants"]))
+        return {"variants": entry["variants"], "generated": generated}
+
+    def get(self, advisor_version: str, difference_analysis: dict, wer: float) -> Optional[dict]:
+        """Get a cached answer once max_variants answers of the key have been
+        generated, even if some of them were repeated.
+
+        Args:
+            advisor_version (str): Version of the advisor and its model.
+            difference_analysis (dict): Analysis of differences between user and reference analysis.
+            wer (float): Word error rate between the user and reference transcription.
+
+        Returns:
+            Optional[dict]: Cached feedback, None if more variants are needed.
+        """
+        entry = self._get_entry(self._get_key(advisor_version, difference_analysis, wer))
+        if not entry["variants"] or entry["generated"] < self.max_variants:
+            return None
+        return random.choice(entry["variants"])
+
+    def add(self, advisor_version: str, difference_analysis: dict, wer: float,
+            feedback: dict) -> None:
+        """Count a new answer for a key and store it if it's not repeated,
+        keeping at most max_variants answers.
+
+        Args:
+            advisor_version (str): Version of the advisor and its model.
+            difference_analysis (dict): Analysis of differences between user and reference analysis.
+            wer (float): Word error rate between the user and reference transcription.
+            feedback (dict): Feedback generated by the advisor.
+        """
+        if not feedback:
+            return
+        key = self._get_key(advisor_version, difference_analysis, wer)
+        entry = self._get_entry(key)
+        variants = entry["variants"]
+        if feedback not in variants:
+            variants = (variants + [feedback])[-self.max_variants:]
+        self.cache.set(key, {
+            "created_at": time.time(),
+            "variants": variants,
+            "generated": entry["generated"] + 1
+        })
+
+    def get_or_generate(self, advisor_version: str, difference_analysis: dict, wer: float,
+                        generate: Callable[[dict, float], dict]) -> dict:
+        """Get a cached answer or generate and store a new one.
+
+        Args:
+            advisor_version (str): Version of the advisor and its model.
+            difference_analysis (dict): Analysis of differences between user and reference analysis.
+            wer (float): Word error rate between the user and reference transcription.
+            generate (Callable[[dict, float], dict]): Advisor get_feedback function.
+
+        Returns:
+            dict: Feedback, empty if it could not be generated.
+        """
+        feedback = self.get(advisor_version, difference_analysis, wer)
+        if feedback is not None:
+            return feedback
+
+        feedback = generate(difference_analysis, wer)
+        self.add(advisor_version, difference_analysis, wer, feedback)
+        return feedback
+
+    def stats(self) -> dict:
+        """Get hit and miss counters of the cache."""
+        return self.cache.stats()
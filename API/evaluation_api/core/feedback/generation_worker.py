@@ -0,0 +1,230 @@
+from collections import deque
+from typing import Iterator, Optional
+import threading
+import requests
+import json
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class GenerationError(Exception):
+    """Custom exception for errors generating text with the local model."""
+    pass
+
+class LlamaCppBackend:
+    """Generates text with a llama.cpp model loaded in this process. The model
+    holds a single context, so it can only decode one sequence at a time.
+    
+    When a prefix is given, it is evaluated once and the model state is saved.
+    Before each prompt the state is restored if the context no longer starts
+    with the prefix, so only the rest of the prompt is evaluated."""
+    name = "in_process"
+
+    def __init__(self, model, grammar, max_tokens: int = 2000, prefix: str = ""):
+        self.model = model
+        self.grammar = grammar
+        self.max_tokens = max_tokens
+        self.slots = 1
+        self.prefix_tokens = []
+        self.prefix_state = None
+        if prefix:
+            self._evaluate_prefix(prefix)
+
+    def _evaluate_prefix(self, prefix: str) -> None:
+        """Evaluate the prefix shared by every prompt and save the model state."""
+        start = time.perf_counter()
+        self.prefix_tokens = self.model.tokenize(prefix.encode("utf-8"))
+        self.model.reset()
+        self.model.eval(self.prefix_tokens)
+        self.prefix_state = self.model.save_state()
+        logger.info(f"Evaluated {len(self.prefix_tokens)} prompt prefix tokens in {time.perf_counter() - start:.2f}s")
+
+    def _restore_prefix(self) -> None:
+        """Restore the prefix state unless the context already starts with it.
+        The model reuses the longest matching prefix of the context by itself."""
+        if self.prefix_state is None:
+            return
+        n_prefix = len(self.prefix_tokens)
+        if (
+            self.model.n_tokens >= n_prefix and
+            list(self.model.input_ids[:n_prefix]) == self.prefix_tokens
+        ):
+            return
+        self.model.load_state(self.prefix_state)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Generate text for a prompt, token by token.
+
+        Args:
+            prompt (str): Prompt needed for the model.
+
+        Yields:
+            str: Text generated for each token.
+        """
+        self._restore_prefix()
+        stream = self.model(
+            prompt,
+            grammar=self.grammar,
+            max_tokens=self.max_tokens,
+            echo=False,
+            stream=True
+        )
+        for chunk in stream:
+            yield chunk["choices"][0]["text"]
+
+class LlamaServerBackend:
+    """Generates text with a llama.cpp server (llama-server) running as a
+    sidecar. The server decodes up to `slots` sequences in parallel with
+    continuous batching and keeps the KV cache of each slot's last prompt,
+    so the shared part of the prompt is not evaluated again."""
+    name = "llama_server"
+
+    def __init__(self, server_url: str, grammar: str, max_tokens: int = 2000,
+                 slots: int = 4, timeout: float = 120):
+        self.completion_url = f"{server_url.rstrip('/')}/completion"
+        self.grammar = grammar
+        self.max_tokens = max_tokens
+        self.slots = max(1, slots)
+        self.timeout = timeout
+        self._session = requests.Session()
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Generate text for a prompt, token by token.
+
+        Args:
+            prompt (str): Prompt needed for the model.
+
+        Raises:
+            GenerationError: The server could not be reached or answered an error.
+
+        Yields:
+            str: Text generated for each token.
+        """
+        payload = {
+            "prompt": prompt,
+            "grammar": self.grammar,
+            "n_predict": self.max_tokens,
+            "cache_prompt": True,
+            "stream": True,
+        }
+        try:
+            with self._session.post(self.completion_url, json=payload,
+                                    stream=True, timeout=self.timeout) as response:
+                response.raise_for_status()
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data: "):
+                        continue
+                    chunk = json.loads(line[len("data: "):])
+                    if chunk.get("content"):
+                        yield chunk["content"]
+                    if chunk.get("stop"):
+                        break
+        except requests.RequestException as e:
+            raise GenerationError(f"Could not reach local LLM server: {e}")
+
+class GenerationWorker:
+    """Queues prompts for a generation backend and runs as many at once as the
+    backend has slots. Records queue depth, time to first token and tokens per
+    second."""
+    def __init__(self, backend):
+        self.backend = backend
+        self._slots = threading.BoundedSemaphore(backend.slots)
+        self._metrics_lock = threading.Lock()
+        self._ttft = deque(maxlen=200)
+
+        # Metrics
+        self.queue_depth = 0
+        self.active = 0
+        self.requests_completed = 0
+        self.requests_failed = 0
+        self.tokens_generated = 0
+        self.generation_time = 0.0
+        self.last_tokens_per_second = 0.0
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Wait for a free slot and generate text for a prompt, token by token.
+        The slot is released when generation ends or the caller stops reading.
+
+        Args:
+            prompt (str): Prompt needed for the model.
+
+        Yields:
+            str: Text generated for each token.
+        """
+        enqueued_at = time.perf_counter()
+        with self._metrics_lock:
+            self.queue_depth += 1
+        try:
+            self._slots.acquire()
+        finally:
+            with self._metrics_lock:
+                self.queue_depth -= 1
+
+        with self._metrics_lock:
+            self.active += 1
+        started_at = time.perf_counter()
+        first_token_at = None
+        tokens = 0
+        failed = False
+        try:
+            for text in self.backend.stream(prompt):
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                    with self._metrics_lock:
+                        # Includes the time spent waiting for a slot
+                        self._ttft.append(first_token_at - enqueued_at)
+                tokens += 1
+                yield text
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started_at
+            self._slots.release()
+            with self._metrics_lock:
+                self.active -= 1
+                if failed:
+                    self.requests_failed += 1
+                else:
+                    self.requests_completed += 1
+                self.tokens_generated += tokens
+                self.generation_time += elapsed
+                if elapsed > 0:
+                    self.last_tokens_per_second = tokens / elapsed
+
+    def generate(self, prompt: str) -> str:
+        """Generate the full text for a prompt.
+
+        Args:
+            prompt (str): Prompt needed for the model.
+
+        Returns:
+            str: Generated text.
+        """
+        return "".join(self.stream(prompt))
+
+    def metrics(self) -> dict:
+        """Get queue depth, throughput and time to first token of the worker.
+
+        Returns:
+            dict: Worker metrics.
+        """
+        def to_ms(seconds: Optional[float]) -> Optional[float]:
+            return round(seconds * 1000, 1) if seconds is not None else None
+
+        with self._metrics_lock:
+            ttft = list(self._ttft)
+            return {
+                "backend": self.backend.name,
+                "slots": self.backend.slots,
+                "queue_depth": self.queue_depth,
+                "active": self.active,
+                "requests_completed": self.requests_completed,
+                "requests_failed": self.requests_failed,
+                "tokens_generated": self.tokens_generated,
+                "tokens_per_second": round(self.tokens_generated / self.generation_time, 2) if self.generation_time else 0.0,
+                "last_tokens_per_second": round(self.last_tokens_per_second, 2),
+                "last_ttft_ms": to_ms(ttft[-1]) if ttft else None,
+                "average_ttft_ms": to_ms(sum(ttft) / len(ttft)) if ttft else None,
+            }
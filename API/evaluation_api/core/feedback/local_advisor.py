@@ -1,13 +1,83 @@
 from llama_cpp import Llama
 from llama_cpp import LlamaGrammar
+from typing import Iterator, List, Optional, Tuple
 import json5
 import os
+import logging
+
+from config import LOCAL_LLM_SERVER_URL, LOCAL_LLM_SLOTS, LOCAL_LLM_TIMEOUT
+from core.feedback.generation_worker import GenerationWorker, LlamaCppBackend, LlamaServerBackend
+
+logger = logging.getLogger(__name__)
+
 # from huggingface_hub import hf_hub_download
 
+class TipStreamParser:
+    """Incremental parser for the JSON generated by the local model. Text is
+    fed as it is generated and each tip list is returned as soon as its
+    closing bracket arrives."""
+    def __init__(self):
+        self.text = ""
+        self._position = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = None
+        self._array_start = None
+        self._key = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, List[str]]]:
+        """Add generated text and get the tip lists completed by it.
+
+        Args:
+            chunk (str): Newly generated text.
+
+        Returns:
+            List[Tuple[str, List[str]]]: Key and tips of each completed list.
+        """
+        self.text += chunk
+        completed = []
+        while self._position < len(self.text):
+            index = self._position
+            char = self.text[index]
+            self._position += 1
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    # Strings directly inside the object are keys
+                    if self._depth == 1:
+                        self._key = json5.loads(self.text[self._string_start:index + 1])
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = index
+            elif char in "{[":
+                self._depth += 1
+                if char == "[" and self._depth == 2:
+                    self._array_start = index
+            elif char in "}]":
+                if char == "]" and self._depth == 2 and self._key is not None:
+                    tips = json5.loads(self.text[self._array_start:index + 1])
+                    completed.append((self._key, tips))
+                    self._key = None
+                self._depth -= 1
+        return completed
+
 class LocalSpeechAdvisor:
+    # Change when the prompt changes, cached feedback depends on it
+    PROMPT_VERSION = "prompt-v2"
+
     def __init__(self):
         self.model = None
+        self.worker = None
         self.CONTEXT_SIZE = 4096
+        self.MAX_TOKENS = 2000
         
         # Define where the model comes from (Hugging Face repo + file)
         # https://huggingface.co/urdadval/mistral-7b-local-speech/blob/main/mistral-7b-instruct-v0.1.Q5_K_S.gguf
@@ -40,36 +110,57 @@ string ::= "\"" (
 ws ::= ([ \t\n]*)
 '''
         self.json_grammar = LlamaGrammar.from_string(self.JSON_GRAMMAR_STR)
+        self.PROMPT_PREFIX = self._create_prompt_prefix()
         self._load_model()
         
+    @property
+    def version(self) -> str:
+        """Version of the prompt and model file used to generate feedback."""
+        return f"local/{os.path.basename(self.model_filename)}/{self.PROMPT_VERSION}"
+
     def _load_model(self) -> None:
-        """Load the local model into memory."""
+        """Load the local model into memory, or connect to the llama.cpp server
+        if one is configured. Prompts are queued by the generation worker."""
         try:
-            self.model = Llama(
-                model_path=self.full_model_path,
-                n_ctx=self.CONTEXT_SIZE,
-                verbose=False
-            )
+            if LOCAL_LLM_SERVER_URL:
+                backend = LlamaServerBackend(
+                    LOCAL_LLM_SERVER_URL,
+                    self.JSON_GRAMMAR_STR,
+                    max_tokens=self.MAX_TOKENS,
+                    slots=LOCAL_LLM_SLOTS,
+                    timeout=LOCAL_LLM_TIMEOUT
+                )
+            else:
+                self.model = Llama(
+                    model_path=self.full_model_path,
+                    n_ctx=self.CONTEXT_SIZE,
+                    verbose=False
+                )
+                backend = LlamaCppBackend(
+                    self.model,
+                    self.json_grammar,
+                    max_tokens=self.MAX_TOKENS,
+                    prefix=self.PROMPT_PREFIX
+                )
+            self.worker = GenerationWorker(backend)
         except Exception as e:
-            print(f"Error occurred during local model load: {e}")
+            logger.error(f"Error occurred during local model load: {e}")
             
-    def _create_prompt(self, difference_analysis:dict, wer:float)->str: 
-        """Generate a structured prompt for the speech coaching LLM.
-
-        Args:
-            difference_analysis (dict): Analysis of differences between user and reference analysis.
-            wer (float): Word error rate between the user and reference transcription.
+    def _create_prompt_prefix(self) -> str:
+        """Generate the part of the prompt shared by every request, with the
+        instructions and the worked example. It goes before the analysis so
+        the model can reuse its evaluation between requests.
 
         Returns:
-            str: Formatted prompt text for the LLM.
-        """       
-        prompt = f"""You are a speech coach helping an English learner improve their pronunciation.
+            str: Constant prompt text for the LLM.
+        """
+        prefix = """You are a speech coach helping an English learner improve their pronunciation.
         Your job is to compare the user's delivery to the original audio and return feedback.
         You will be given as input a numerical analysis of the differences between both deliveries.
         
         You must answer with a single, continuous line of text that is a valid JSON object.
         - DO NOT use any newline characters (\\n), tabulations (\\t), or other formatting whitespace.
-        - Your entire response must be a "minified" JSON string starting with {{ and ending with }}.
+        - Your entire response must be a "minified" JSON string starting with { and ending with }.
         - This JSON object must have **EXACTLY* the following keys:
             - speed_tip
             - clarity_tip
@@ -99,17 +190,6 @@ ws ::= ([ \t\n]*)
         - Negative values mean the user had less of that metric.
         - WER (0-1): low = clear and intelligible, high = unclear and difficult to follow.
         
-        Here is the numerical analysis of the differences between the user and the original audio you must give feedback on:
-
-        - Syllables per second: {difference_analysis["number_of_syllables"]}
-        - Number of pauses: {difference_analysis["number_of_pauses"]}
-        - Speech rate: {difference_analysis["speech_rate"]}
-        - Articulation rate: {difference_analysis["articulation_rate"]}
-        - Speaking time: {difference_analysis["speaking_duration"]}
-        - Total audio time: {difference_analysis["total_duration"]}
-        - Speaking time to total time ratio: {difference_analysis["ratio"]}
-        - Transcription Error Rate (WER): {wer}
-    
         Here's an example input:
         
         - Syllables per second: 0.0
@@ -122,7 +202,33 @@ ws ::= ([ \t\n]*)
         - Transcription Error Rate (WER): 0.3
         
         Here's the corresponding example output:
-        {{"clarity_tip":["There was some variation from the original audio; sometimes words weren't quite clear.","Pay attention to making sure all parts of each word come through distinctly for better understanding.","Practicing difficult sounds slowly can make them easier to say clearly over time."],"speed_tip":["Overall you were close to the pace of the original audio.","Try slowing down just slightly when speaking so each word has enough space.","Focusing on consistent pacing will help listeners understand every part of your message."],"rythm_tip":["Your rhythm felt very similar to the original audio.","Think about emphasizing key words naturally while keeping everything flowing smoothly.","A natural flow makes your communication feel effortless and engaging!"],"articulation_tip":["The way you formed certain sounds varied somewhat from the original audio.","Imagine stretching out your mouth muscles before starting - this helps create more precise shapes!","Being mindful about forming each sound fully will increase precision overall."]}}
+        {"clarity_tip":["There was some variation from the original audio; sometimes words weren't quite clear.","Pay attention to making sure all parts of each word come through distinctly for better understanding.","Practicing difficult sounds slowly can make them easier to say clearly over time."],"speed_tip":["Overall you were close to the pace of the original audio.","Try slowing down just slightly when speaking so each word has enough space.","Focusing on consistent pacing will help listeners understand every part of your message."],"rythm_tip":["Your rhythm felt very similar to the original audio.","Think about emphasizing key words naturally while keeping everything flowing smoothly.","A natural flow makes your communication feel effortless and engaging!"],"articulation_tip":["The way you formed certain sounds varied somewhat from the original audio.","Imagine stretching out your mouth muscles before starting - this helps create more precise shapes!","Being mindful about forming each sound fully will increase precision overall."]}
+        
+"""
+        
+        return prefix
+    
+    def _create_prompt(self, difference_analysis:dict, wer:float)->str: 
+        """Generate a structured prompt for the speech coaching LLM.
+
+        Args:
+            difference_analysis (dict): Analysis of differences between user and reference analysis.
+            wer (float): Word error rate between the user and reference transcription.
+
+        Returns:
+            str: Formatted prompt text for the LLM.
+        """       
+        prompt = self.PROMPT_PREFIX + f"""        Here is the numerical analysis of the differences between the user and the original audio you must give feedback on:
+
+        - Syllables per second: {difference_analysis["number_of_syllables"]}
+        - Number of pauses: {difference_analysis["number_of_pauses"]}
+        - Speech rate: {difference_analysis["speech_rate"]}
+        - Articulation rate: {difference_analysis["articulation_rate"]}
+        - Speaking time: {difference_analysis["speaking_duration"]}
+        - Total audio time: {difference_analysis["total_duration"]}
+        - Speaking time to total time ratio: {difference_analysis["ratio"]}
+        - Transcription Error Rate (WER): {wer}
+    
         """
         
         return prompt
@@ -137,32 +243,32 @@ ws ::= ([ \t\n]*)
             str: JSON structured string with model response.
         """
         try:
-            print("Obtaining response from model...", end="")
-            response = self.model(
-                prompt,
-                grammar=self.json_grammar,
-                max_tokens=2000,
-                echo=False
-            )
-            generated_text = response["choices"][0]["text"]
-            print(generated_text)
+            generated_text = self.worker.generate(prompt)
+            logger.debug("Local model response: %s", generated_text)
             return generated_text
         except Exception as e:
-            print(f"Error generating local model response: {e}")
-            print(f"Response: {response}")
+            logger.error(f"Error generating local model response: {e}")
             return ""
         
+    def _stream_output(self, prompt:str) -> Iterator[str]:
+        """Use prompt to generate output from the model, token by token.
+
+        Args:
+            prompt (str): Prompt needed for the model.
+
+        Yields:
+            str: Text generated for each token.
+        """
+        yield from self.worker.stream(prompt)
+
     def _parse_response(self, response: str) -> dict:
         """Parse the response obtained from the model and turn it into a valid dictionary."""
-        print("Processing local api response...")
         try:
             feedback_dict = json5.loads(response)
-            print("Successfully parsed response!")
             return feedback_dict
         except Exception as e:
-            print("Error parsing response, could not form a valid JSON format")
-            print(f"Error is: {e}")
-            print(f"Response: {response}")
+            logger.error(f"Error parsing response, could not form a valid JSON format: {e}")
+            logger.debug("Response: %s", response)
             return {}
     
     def get_feedback(self, difference_analysis:dict, wer:float)->dict:
@@ -183,7 +289,7 @@ ws ::= ([ \t\n]*)
         
         attempt = 1
         while attempt < MAX_TRIES:
-            print(f"Making a request to local model, attempt {attempt}...")
+            logger.debug("Making a request to local model, attempt %s...", attempt)
             response = self._generate_output(prompt)
             feedback_dict = self._parse_response(response)
             if (
@@ -191,10 +297,42 @@ ws ::= ([ \t\n]*)
                     isinstance(feedback_dict, dict) and 
                     all(key in feedback_dict for key in response_keys)
                 ):
-                    print("Successful response!")
                     return feedback_dict
                 
-            print(f"Attempt {attempt} failed. Retrying...")    
+            logger.warning(f"Attempt {attempt} failed. Retrying...")    
             attempt += 1
             
-        return {}
\ No newline at end of file
+        return {}
+
+    def stream_feedback(self, difference_analysis:dict, 
+                        wer:float) -> Iterator[Tuple[str, List[str]]]:
+        """Generate structured speech feedback, returning each tip list as soon
+        as the model finishes writing it. The model is not retried, since
+        tips may have already been sent.
+
+        Args:
+            difference_analysis (dict): Analysis of differences between user and reference analysis.
+            wer (float): Word error rate between the user and reference transcription.
+
+        Raises:
+            ValueError: The model stopped before writing every tip list.
+
+        Yields:
+            Tuple[str, List[str]]: Key (speed_tip, clarity_tip, articulation_tip 
+            or rythm_tip) and its three tips.
+        """
+        prompt = self._create_prompt(difference_analysis, wer)
+        response_keys = ["speed_tip", "clarity_tip", "articulation_tip", "rythm_tip"]
+        parser = TipStreamParser()
+        received_keys = set()
+
+        logger.debug("Streaming response from local model...")
+        for text in self._stream_output(prompt):
+            for key, tips in parser.feed(text):
+                received_keys.add(key)
+                yield key, tips
+
+        missing_keys = [key for key in response_keys if key not in received_keys]
+        if missing_keys:
+            logger.debug("Response: %s", parser.text)
+            raise ValueError(f"Local model response is missing {', '.join(missing_keys)}.")
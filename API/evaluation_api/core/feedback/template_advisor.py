@@ -0,0 +1,142 @@
+from typing import Dict, List, Optional
+import zlib
+import json
+import os
+import logging
+
+from core.evaluation.wer_engine import TranscriptAlignment
+
+logger = logging.getLogger(__name__)
+
+class TemplateSpeechAdvisor:
+    """Class that returns recommendations from a precomputed phrase bank
+    instead of prompting a Large Language Model. Each category is placed in
+    a band using the same guide given to the LLM advisors, and its tips are
+    drawn from the phrases written for that band."""
+    # Metric that drives the tips of each category
+    CATEGORY_METRICS = {
+        "speed_tip": "speech_rate",
+        "clarity_tip": "wer",
+        "articulation_tip": "articulation_rate",
+        "rythm_tip": "ratio",
+    }
+    # Values are truncated to one decimal, so 0.0 and 0.1 are close to 0,
+    # 0.2 to 0.5 are around ±0.3 and 0.6 or more are very different
+    CLOSE_LIMIT = 0.2
+    VERY_LIMIT = 0.6
+    TIP_SLOTS = ["comment", "improve", "future"]
+    # Words of the transcription named in the clarity tip, when it is aligned
+    MAX_NAMED_WORDS = 3
+    WORD_TIP = "Practice these words on their own before saying the whole sentence again: {words}."
+
+    def __init__(self, phrase_bank_path: Optional[str] = None):
+        base_path = os.path.dirname(os.path.abspath(__file__))
+        self.phrase_bank_path = phrase_bank_path or os.path.join(base_path, "phrase_bank.json")
+        self.phrase_bank = None
+        self.version = None
+        self._load_phrase_bank()
+
+    def _load_phrase_bank(self) -> None:
+        """Load the phrase bank into memory."""
+        try:
+            with open(self.phrase_bank_path, "r", encoding="utf-8") as bank_file:
+                phrase_bank = json.load(bank_file)
+            self.version = phrase_bank.pop("version", "unversioned")
+            self.phrase_bank = phrase_bank
+        except Exception as e:
+            logger.error(f"Error occurred during phrase bank load: {e}")
+
+    def _get_band(self, value: float, signed: bool = True) -> str:
+        """Get the band of a difference value.
+
+        Args:
+            value (float): Difference between user and reference, or WER.
+            signed (bool): Whether the band includes the direction of the difference.
+
+        Returns:
+            str: close, somewhat or very, prefixed with more or less if signed.
+        """
+        magnitude = abs(value)
+        if magnitude < self.CLOSE_LIMIT:
+            return "close"
+        band = "somewhat" if magnitude < self.VERY_LIMIT else "very"
+        if not signed:
+            return band
+        direction = "more" if value > 0 else "less"
+        return f"{direction}_{band}"
+
+    def get_bands(self, difference_analysis: dict, wer: float) -> Dict[str, str]:
+        """Get the band of every feedback category.
+
+        Args:
+            difference_analysis (dict): Analysis of differences between user and reference analysis.
+            wer (float): Word error rate between the user and reference transcription.
+
+        Returns:
+            Dict[str, str]: Band of each category.
+        """
+        bands = {}
+        for category, metric in self.CATEGORY_METRICS.items():
+            if metric == "wer":
+                bands[category] = self._get_band(wer, signed=False)
+            else:
+                bands[category] = self._get_band(difference_analysis.get(metric, 0))
+        return bands
+
+    def _pick(self, phrases: List[str], seed: str) -> str:
+        """Pick a phrase deterministically, so the same input gets the same tips."""
+        return phrases[zlib.crc32(seed.encode("utf-8")) % len(phrases)]
+
+    def get_word_tip(self, alignment: TranscriptAlignment) -> Optional[str]:
+        """Get a clarity tip naming the reference words that were misheard or missing.
+
+        Args:
+            alignment (TranscriptAlignment): Alignment of the user transcription with the reference.
+
+        Returns:
+            Optional[str]: Tip, None if every reference word was said.
+        """
+        # A word missed more than once is only named once
+        named_words = list(dict.fromkeys([
+            f'"{reference}" (it sounded like "{said}")' for reference, said in alignment.substituted
+        ] + [
+            f'"{reference}" (it was missing)' for reference in alignment.deleted
+        ]))
+        if not named_words:
+            return None
+        return self.WORD_TIP.format(words=", ".join(named_words[:self.MAX_NAMED_WORDS]))
+
+    def get_feedback(self, difference_analysis: dict, wer: float,
+                     alignment: Optional[TranscriptAlignment] = None) -> dict:
+        """Generate structured speech feedback comparing user and reference audio.
+        With the alignment of the transcriptions, the improve tip of clarity
+        names the words to practice.
+
+        Args:
+            difference_analysis (dict): Analysis of differences between user and reference analysis.
+            wer (float): Word error rate between the user and reference transcription.
+            alignment (Optional[TranscriptAlignment]): Word alignment of the transcriptions.
+
+        Returns:
+            dict: Returns speed_tip, clarity_tip, articulation_tip, and rythm_tip.
+        """
+        if not self.phrase_bank:
+            return {}
+
+        seed = json.dumps([difference_analysis, wer], sort_keys=True)
+        feedback = {}
+        try:
+            for category, band in self.get_bands(difference_analysis, wer).items():
+                band_phrases = self.phrase_bank[category][band]
+                feedback[category] = [
+                    self._pick(band_phrases[slot], f"{seed}:{category}:{slot}")
+                    for slot in self.TIP_SLOTS
+                ]
+        except (KeyError, ZeroDivisionError) as e:
+            logger.error(f"Error building template feedback, check phrase bank: {e}")
+            return {}
+
+        word_tip = self.get_word_tip(alignment) if alignment is not None else None
+        if word_tip is not None:
+            feedback["clarity_tip"][self.TIP_SLOTS.index("improve")] = word_tip
+        return feedback
@@ -0,0 +1,319 @@
+from typing import Any, Callable, Dict, List, Optional
+import threading
+import resource
+import time
+import os
+import logging
+
+from core.analysis.analyzer import SpeechAnalyzer
+from core.transcription.transcriber import SpeechTranscriber
+from core.classification.classifier import SpeechClassifier
+from core.feedback.local_advisor import LocalSpeechAdvisor
+from core.feedback.template_advisor import TemplateSpeechAdvisor
+from core.feedback.feedback_cache import FeedbackCache
+from core.feedback.arli_client import ArliClient
+from core.transcription.batcher import TranscriptionBatcher
+from core.utils.executors import get_praat_executor, get_inference_executor
+from core.utils.cache import LRUCache, SQLiteCache, TieredCache
+from config import (
+    TRANSCRIPTION_BATCH_SIZE, TRANSCRIPTION_BATCH_WINDOW_MS,
+    ANALYSIS_CACHE_SIZE, ANALYSIS_CACHE_PATH, ANALYSIS_CACHE_MAX_MB,
+    FEEDBACK_CACHE_SIZE, FEEDBACK_CACHE_PATH, FEEDBACK_CACHE_MAX_MB,
+    FEEDBACK_CACHE_TTL, FEEDBACK_CACHE_VARIANTS,
+    ARLI_API_KEY, ARLI_API_URL, ARLI_TIMEOUT, ARLI_MAX_TRIES,
+    ARLI_BACKOFF_SECONDS, ARLI_HEDGE_PERCENTILE, ARLI_HEDGE_MIN_SAMPLES
+)
+
+logger = logging.getLogger(__name__)
+
+def build_tiered_cache(name: str, size: int, path: str, max_mb: float) -> TieredCache:
+    """Build an in-memory cache with an optional SQLite tier when a path is given.
+
+    Args:
+        name (str): Name of the cache, used in error messages.
+        size (int): Entries kept in memory.
+        path (str): Path of the SQLite file, empty for memory only.
+        max_mb (float): Size limit of the SQLite file in megabytes.
+
+    Returns:
+        TieredCache: Cache.
+    """
+    disk = None
+    if path:
+        try:
+            disk = SQLiteCache(path, max_bytes=int(max_mb * 1024 * 1024))
+        except Exception as e:
+            logger.warning(f"Error opening {name} disk cache, using memory only: {e}")
+    return TieredCache(LRUCache(max_size=size), disk)
+
+
+def get_process_memory() -> Optional[int]:
+    """Get the resident set size of the current process.
+
+    Returns:
+        Optional[int]: Resident memory in bytes, None if it can't be measured.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        # Peak memory as a fallback, reported in KB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except Exception:
+        return None
+
+
+class ModelHandle:
+    """Process-wide handle to a model that is loaded once and then shared."""
+    def __init__(self, name: str, loader: Callable[[], Any],
+                 is_ready: Optional[Callable[[Any], bool]] = None):
+        self.name = name
+        self._loader = loader
+        self._is_ready = is_ready
+        self._instance = None
+        self._lock = threading.Lock()
+        self.load_time = None
+        self.memory_bytes = None
+        self.error = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    @property
+    def ready(self) -> bool:
+        if self._instance is None:
+            return False
+        if self._is_ready is None:
+            return True
+        return self._is_ready(self._instance)
+
+    def get(self) -> Any:
+        """Get the model instance, loading it on first use.
+
+        Returns:
+            Any: Shared model instance.
+        """
+        if self._instance is None:
+            with self._lock:
+                # Another thread may have loaded it while we waited
+                if self._instance is None:
+                    self._load()
+        return self._instance
+
+    def _load(self) -> None:
+        """Load the model and record how long it took and how much memory it uses."""
+        logger.info(f"Loading {self.name} model...")
+        memory_before = get_process_memory()
+        start = time.perf_counter()
+        try:
+            self._instance = self._loader()
+            self.error = None
+        except Exception as e:
+            self.error = str(e)
+            logger.error(f"Error loading {self.name} model, check model registry: {e}")
+            raise
+        finally:
+            self.load_time = time.perf_counter() - start
+
+        memory_after = get_process_memory()
+        if memory_before is not None and memory_after is not None:
+            self.memory_bytes = max(0, memory_after - memory_before)
+        logger.info(f"Loaded {self.name} model in {self.load_time:.2f}s")
+
+    def status(self) -> Dict[str, Any]:
+        """Get the load status of the model.
+
+        Returns:
+            Dict[str, Any]: Name, loaded, ready, load time, memory and error.
+        """
+        return {
+            "name": self.name,
+            "loaded": self.loaded,
+            "ready": self.ready,
+            "load_time_seconds": round(self.load_time, 3) if self.load_time is not None else None,
+            "memory_mb": round(self.memory_bytes / (1024 * 1024), 1) if self.memory_bytes is not None else None,
+            "error": self.error,
+        }
+
+
+class ModelRegistry:
+    """Registry of the models used by the evaluation API. Each model is loaded
+    at most once per worker process and shared between requests."""
+    def __init__(self):
+        self.handles = {
+            "analyzer": ModelHandle(
+                "analyzer",
+                lambda: SpeechAnalyzer(executor=get_praat_executor())
+            ),
+            "transcriber": ModelHandle(
+                "transcriber",
+                SpeechTranscriber,
+                is_ready=lambda transcriber: transcriber.model is not None
+            ),
+            "classifier": ModelHandle(
+                "classifier",
+                SpeechClassifier,
+                is_ready=lambda classifier: classifier.tree is not None
+            ),
+            "template_advisor": ModelHandle(
+                "template_advisor",
+                TemplateSpeechAdvisor,
+                is_ready=lambda advisor: advisor.phrase_bank is not None
+            ),
+            "local_advisor": ModelHandle(
+                "local_advisor",
+                LocalSpeechAdvisor,
+                is_ready=lambda advisor: advisor.worker is not None
+            ),
+        }
+        self._batcher = None
+        self._batcher_lock = threading.Lock()
+        self._analysis_cache = None
+        self._feedback_cache = None
+        self._arli_client = None
+        self._cache_lock = threading.Lock()
+
+    @property
+    def analyzer(self) -> SpeechAnalyzer:
+        return self.handles["analyzer"].get()
+
+    @property
+    def transcriber(self) -> SpeechTranscriber:
+        return self.handles["transcriber"].get()
+
+    @property
+    def classifier(self) -> SpeechClassifier:
+        return self.handles["classifier"].get()
+
+    @property
+    def template_advisor(self) -> TemplateSpeechAdvisor:
+        return self.handles["template_advisor"].get()
+
+    @property
+    def local_advisor(self) -> LocalSpeechAdvisor:
+        return self.handles["local_advisor"].get()
+
+    @property
+    def transcription_batcher(self) -> TranscriptionBatcher:
+        """Batching scheduler shared by every transcription request."""
+        with self._batcher_lock:
+            if self._batcher is None:
+                self._batcher = TranscriptionBatcher(
+                    self.transcriber,
+                    get_inference_executor(),
+                    max_batch_size=TRANSCRIPTION_BATCH_SIZE,
+                    max_wait_ms=TRANSCRIPTION_BATCH_WINDOW_MS
+                )
+            return self._batcher
+
+    @property
+    def analysis_cache(self) -> TieredCache:
+        """Cache of audio analyses keyed by audio content, shared by every request."""
+        with self._cache_lock:
+            if self._analysis_cache is None:
+                self._analysis_cache = build_tiered_cache(
+                    "analysis",
+                    ANALYSIS_CACHE_SIZE,
+                    ANALYSIS_CACHE_PATH,
+                    ANALYSIS_CACHE_MAX_MB
+                )
+            return self._analysis_cache
+
+    @property
+    def feedback_cache(self) -> FeedbackCache:
+        """Cache of LLM feedback keyed by difference analysis, shared by every request."""
+        with self._cache_lock:
+            if self._feedback_cache is None:
+                self._feedback_cache = FeedbackCache(
+                    build_tiered_cache(
+                        "feedback",
+                        FEEDBACK_CACHE_SIZE,
+                        FEEDBACK_CACHE_PATH,
+                        FEEDBACK_CACHE_MAX_MB
+                    ),
+                    max_variants=FEEDBACK_CACHE_VARIANTS,
+                    ttl_seconds=FEEDBACK_CACHE_TTL
+                )
+            return self._feedback_cache
+
+    @property
+    def arli_client(self) -> ArliClient:
+        """ARLI API client whose connection pool is shared by every request."""
+        with self._cache_lock:
+            if self._arli_client is None:
+                self._arli_client = ArliClient(
+                    ARLI_API_URL,
+                    ARLI_API_KEY,
+                    timeout=ARLI_TIMEOUT,
+                    max_tries=ARLI_MAX_TRIES,
+                    backoff_seconds=ARLI_BACKOFF_SECONDS,
+                    hedge_percentile=ARLI_HEDGE_PERCENTILE,
+                    hedge_min_samples=ARLI_HEDGE_MIN_SAMPLES
+                )
+            return self._arli_client
+
+    def transcription_metrics(self) -> Dict[str, Any]:
+        """Get the batcher metrics without loading the transcription model.
+
+        Returns:
+            Dict[str, Any]: Batcher metrics, only loaded is set if the batcher isn't started.
+        """
+        with self._batcher_lock:
+            batcher = self._batcher
+        if batcher is None:
+            return {"loaded": False}
+        return {"loaded": True, **batcher.metrics()}
+
+    def local_llm_metrics(self) -> Dict[str, Any]:
+        """Get the generation worker metrics of the local model without loading it.
+
+        Returns:
+            Dict[str, Any]: Worker metrics, only loaded is set if the model isn't loaded.
+        """
+        handle = self.handles["local_advisor"]
+        if not handle.ready:
+            return {"loaded": False}
+        return {"loaded": True, **handle.get().worker.metrics()}
+
+    async def shutdown(self) -> None:
+        """Stop the background tasks started by the registry."""
+        if self._batcher is not None:
+            await self._batcher.stop()
+        if self._arli_client is not None:
+            await self._arli_client.aclose()
+
+    def warm_up(self, names: List[str]) -> None:
+        """Load the given models ahead of the first request. Failures are
+        reported but don't stop the API from starting.
+
+        Args:
+            names (List[str]): Names of the models to load.
+        """
+        for name in names:
+            if name not in self.handles:
+                logger.warning(f"Unknown model '{name}' in warm up, skipping.")
+                continue
+            try:
+                self.handles[name].get()
+            except Exception:
+                # Error is already recorded in the handle status
+                pass
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Get the load status of every model in the registry.
+
+        Returns:
+            List[Dict[str, Any]]: Status of each model.
+        """
+        return [handle.status() for handle in self.handles.values()]
+
+
+model_registry = ModelRegistry()
+
+def get_model_registry() -> ModelRegistry:
+    return model_registry
@@ -0,0 +1,167 @@
+from typing import Any, Dict, Optional
+import requests
+import threading
+import json
+import os
+import logging
+
+from core.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+class ReferenceNotFoundError(Exception):
+    """Custom exception for resources without a reference analysis."""
+    pass
+
+class ReferenceUnavailableError(Exception):
+    """Custom exception for errors reaching the source of reference analyses."""
+    pass
+
+class ReferenceStore:
+    """Read-through cache of the reference audio analyses stored per word,
+    sentence and text by the resources API. Analyses are looked up in memory,
+    then in an optional snapshot file and finally requested to the resources API."""
+    # Resource type and its collection in the resources API
+    RESOURCE_COLLECTIONS = {
+        "word": "words",
+        "sentence": "sentences",
+        "text": "texts",
+    }
+    ANALYSIS_KEYS = [
+        "number_of_syllables",
+        "number_of_pauses",
+        "speech_rate",
+        "articulation_rate",
+        "speaking_duration",
+        "total_duration",
+        "ratio",
+        "transcription",
+    ]
+
+    def __init__(self, resources_api_url: str, snapshot_path: str = "",
+                 cache_size: int = 4096, ttl_seconds: float = 3600,
+                 timeout: float = 5):
+        self.resources_api_url = resources_api_url.rstrip("/")
+        self.snapshot_path = snapshot_path
+        self.timeout = timeout
+        self.cache = LRUCache(max_size=cache_size, ttl=ttl_seconds)
+        self._snapshot = None
+        self._snapshot_lock = threading.Lock()
+        self._session = requests.Session()
+
+    def _extract_analysis(self, document: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Get the analysis keys used for evaluation from a resource document.
+
+        Args:
+            document (Dict[str, Any]): Resource document.
+
+        Returns:
+            Optional[Dict[str, Any]]: Reference analysis, None if it's missing
+            or incomplete.
+        """
+        audio_analysis = document.get("audio_analysis") if isinstance(document, dict) else None
+        if not audio_analysis:
+            return None
+        if any(audio_analysis.get(key) is None for key in self.ANALYSIS_KEYS):
+            return None
+        return {key: audio_analysis[key] for key in self.ANALYSIS_KEYS}
+
+    def _load_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Load the snapshot file once. It maps each collection (words, sentences,
+        texts) to either a list of documents with an id or a dictionary of
+        documents by id, as returned by the resources API.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Documents by id for each collection.
+        """
+        with self._snapshot_lock:
+            if self._snapshot is not None:
+                return self._snapshot
+
+            self._snapshot = {}
+            if not self.snapshot_path or not os.path.isfile(self.snapshot_path):
+                return self._snapshot
+
+            try:
+                with open(self.snapshot_path, "r", encoding="utf-8") as snapshot_file:
+                    raw_snapshot = json.load(snapshot_file)
+                for collection, documents in raw_snapshot.items():
+                    if isinstance(documents, list):
+                        documents = {str(document.get("id")): document for document in documents}
+                    self._snapshot[collection] = documents
+                logger.info(f"Loaded reference snapshot: {self.snapshot_path}")
+            except Exception as e:
+                logger.error(f"Error loading reference snapshot, check reference store: {e}")
+            return self._snapshot
+
+    def _request_document(self, collection: str, resource_id: str,
+                          authorization: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Request a resource document to the resources API.
+
+        Args:
+            collection (str): Collection of the resource.
+            resource_id (str): Id of the resource.
+            authorization (Optional[str]): Authorization header of the client.
+
+        Raises:
+            ReferenceUnavailableError: The resources API could not be reached.
+
+        Returns:
+            Optional[Dict[str, Any]]: Resource document, None if it doesn't exist.
+        """
+        url = f"{self.resources_api_url}/resources/{collection}/{resource_id}"
+        headers = {"Authorization": authorization} if authorization else {}
+        try:
+            response = self._session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise ReferenceUnavailableError(f"Could not reach resources API: {e}")
+
+        # The resources API reports missing documents as a 404 wrapped in a 500
+        if response.status_code == 404 or (
+            response.status_code == 500 and "not found" in response.text.lower()
+        ):
+            return None
+        if response.status_code != 200:
+            raise ReferenceUnavailableError(
+                f"Resources API answered {response.status_code} for {collection}/{resource_id}"
+            )
+        return response.json()
+
+    def get_reference_analysis(self, resource_type: str, resource_id: str,
+                               authorization: Optional[str] = None) -> Dict[str, Any]:
+        """Get the reference analysis of a word, sentence or text.
+
+        Args:
+            resource_type (str): One of word, sentence or text.
+            resource_id (str): Id of the resource.
+            authorization (Optional[str]): Authorization header forwarded to the
+            resources API.
+
+        Raises:
+            ReferenceNotFoundError: The resource has no complete reference analysis.
+            ReferenceUnavailableError: The resources API could not be reached.
+
+        Returns:
+            Dict[str, Any]: Reference analysis.
+        """
+        if resource_type not in self.RESOURCE_COLLECTIONS:
+            raise ReferenceNotFoundError(f"Unknown resource type: {resource_type}")
+        collection = self.RESOURCE_COLLECTIONS[resource_type]
+        cache_key = (resource_type, resource_id)
+
+        reference_analysis = self.cache.get(cache_key)
+        if reference_analysis is not None:
+            return reference_analysis
+
+        document = self._load_snapshot().get(collection, {}).get(resource_id)
+        if document is None:
+            document = self._request_document(collection, resource_id, authorization)
+
+        reference_analysis = self._extract_analysis(document) if document else None
+        if reference_analysis is None:
+            raise ReferenceNotFoundError(
+                f"No reference analysis found for {resource_type} {resource_id}."
+            )
+
+        self.cache.set(cache_key, reference_analysis)
+        return reference_analysis
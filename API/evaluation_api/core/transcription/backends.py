@@ -0,0 +1,263 @@
+from typing import List, Optional
+import numpy as np
+import warnings
+
+# Sample rate every backend expects, in Hz
+SAMPLE_RATE = 16000
+# Longest clip decoded in a single window, in samples
+WINDOW_SAMPLES = 30 * SAMPLE_RATE
+# Defaults of whisper.transcribe, a greedy decode past them is retried with
+# temperature fallback or treated as silence
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+class TranscriptionBackendError(Exception):
+    """Custom exception for transcription backends that can't be loaded."""
+    pass
+
+class WhisperBackend:
+    """Transcribes with the Open AI Whisper PyTorch model. Clips up to 30
+    seconds long can be decoded together in one batch."""
+    name = "openai-whisper"
+
+    def __init__(self, model_size: str = "small.en", threads: int = 0):
+        import whisper
+        import torch
+
+        self._whisper = whisper
+        self._torch = torch
+        self.model_size = model_size
+        if threads > 0:
+            torch.set_num_threads(threads)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=UserWarning)
+            self.model = whisper.load_model(model_size)
+
+    @property
+    def version(self) -> str:
+        return f"{self.name}/{self.model_size}"
+
+    def transcribe_file(self, path: str) -> str:
+        """Transcribe an audio file.
+
+        Args:
+            path (str): Complete path to the audio file.
+
+        Returns:
+            str: Text returned by the model.
+        """
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=UserWarning)
+            return self.model.transcribe(path)["text"]
+
+    def transcribe(self, samples: np.ndarray) -> str:
+        """Transcribe mono float32 samples at 16000 Hz.
+
+        Args:
+            samples (np.ndarray): Audio samples.
+
+        Returns:
+            str: Text returned by the model.
+        """
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=UserWarning)
+            return self.model.transcribe(samples)["text"]
+
+    def transcribe_batch(self, batch: List[np.ndarray]) -> List[str]:
+        """Transcribe clips up to 30 seconds long at once. Every clip is padded
+        into one batch of mel spectrograms and decoded together with greedy
+        search. As in transcribe, clips that are likely silence return an
+        empty text. Repetitive or unlikely decodes are transcribed again one
+        by one, with temperature fallback.
+
+        Args:
+            batch (List[np.ndarray]): Samples of each clip.
+
+        Returns:
+            List[str]: Text of each clip, in the same order.
+        """
+        mels = [
+            # Pad every clip to the 30 second window Whisper decodes
+            self._whisper.log_mel_spectrogram(
+                self._whisper.pad_or_trim(samples),
+                n_mels=self.model.dims.n_mels
+            )
+            for samples in batch
+        ]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=UserWarning)
+            options = self._whisper.DecodingOptions(
+                language="en",
+                without_timestamps=True,
+                fp16=False
+            )
+            results = self._whisper.decode(
+                self.model,
+                self._torch.stack(mels).to(self.model.device),
+                options
+            )
+
+        texts = []
+        for samples, result in zip(batch, results):
+            if (
+                result.no_speech_prob > NO_SPEECH_THRESHOLD
+                and result.avg_logprob <= LOGPROB_THRESHOLD
+            ):
+                texts.append("")
+            elif (
+                result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+                or result.avg_logprob < LOGPROB_THRESHOLD
+            ):
+                texts.append(self.transcribe(samples))
+            else:
+                texts.append(result.text)
+        return texts
+
+    def transcribe_word(self, samples: np.ndarray, prompt: Optional[str] = None,
+                        max_tokens: int = 12) -> str:
+        """Transcribe a short clip with a single greedy decode, conditioned on 
+        the expected text and stopped after max_tokens tokens.
+
+        Args:
+            samples (np.ndarray): Audio samples, up to 30 seconds.
+            prompt (Optional[str]): Expected text, given as previous context.
+            max_tokens (int): Most tokens decoded.
+
+        Returns:
+            str: Text returned by the model.
+        """
+        mel = self._whisper.log_mel_spectrogram(
+            self._whisper.pad_or_trim(samples),
+            n_mels=self.model.dims.n_mels
+        )
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=UserWarning)
+            options = self._whisper.DecodingOptions(
+                language="en",
+                without_timestamps=True,
+                fp16=False,
+                prompt=prompt or None,
+                sample_len=max_tokens
+            )
+            result = self._whisper.decode(self.model, mel.to(self.model.device), options)
+        return result.text
+
+class FasterWhisperBackend:
+    """Transcribes with the CTranslate2 port of Whisper (faster-whisper),
+    quantized to int8 by default. It is several times faster than the PyTorch
+    model on CPU and uses less memory, for a similar word error rate.
+    Clips are decoded one after the other, each with greedy search."""
+    name = "faster-whisper"
+
+    def __init__(self, model_size: str = "small.en", threads: int = 0,
+                 compute_type: str = "int8"):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise TranscriptionBackendError(
+                f"faster-whisper is not installed, install it with pip install faster-whisper. {e}"
+            )
+
+        self.model_size = model_size
+        self.compute_type = compute_type
+        self.model = WhisperModel(
+            model_size,
+            device="cpu",
+            compute_type=compute_type,
+            cpu_threads=threads
+        )
+
+    @property
+    def version(self) -> str:
+        return f"{self.name}/{self.model_size}/{self.compute_type}"
+
+    def _decode(self, audio, **options) -> str:
+        """Decode a file path or samples and join the text of every segment."""
+        segments, _ = self.model.transcribe(
+            audio,
+            language="en",
+            beam_size=1,
+            condition_on_previous_text=False,
+            without_timestamps=True,
+            **options
+        )
+        # Segments are generated lazily, decoding happens while joining them
+        return "".join(segment.text for segment in segments)
+
+    def transcribe_file(self, path: str) -> str:
+        """Transcribe an audio file.
+
+        Args:
+            path (str): Complete path to the audio file.
+
+        Returns:
+            str: Text returned by the model.
+        """
+        return self._decode(path)
+
+    def transcribe(self, samples: np.ndarray) -> str:
+        """Transcribe mono float32 samples at 16000 Hz.
+
+        Args:
+            samples (np.ndarray): Audio samples.
+
+        Returns:
+            str: Text returned by the model.
+        """
+        return self._decode(samples)
+
+    def transcribe_batch(self, batch: List[np.ndarray]) -> List[str]:
+        """Transcribe several clips, one after the other.
+
+        Args:
+            batch (List[np.ndarray]): Samples of each clip.
+
+        Returns:
+            List[str]: Text of each clip, in the same order.
+        """
+        return [self._decode(samples) for samples in batch]
+
+    def transcribe_word(self, samples: np.ndarray, prompt: Optional[str] = None,
+                        max_tokens: int = 12) -> str:
+        """Transcribe a short clip conditioned on the expected text and 
+        stopped after max_tokens tokens.
+
+        Args:
+            samples (np.ndarray): Audio samples, up to 30 seconds.
+            prompt (Optional[str]): Expected text, given as previous context.
+            max_tokens (int): Most tokens decoded.
+
+        Returns:
+            str: Text returned by the model.
+        """
+        return self._decode(samples, initial_prompt=prompt or None, max_new_tokens=max_tokens)
+
+BACKENDS = {
+    "whisper": WhisperBackend,
+    "faster_whisper": FasterWhisperBackend,
+}
+
+def load_backend(backend: str, model_size: str, threads: int = 0,
+                 compute_type: str = "int8"):
+    """Load a transcription backend by name.
+
+    Args:
+        backend (str): whisper or faster_whisper.
+        model_size (str): Whisper model, such as small.en or base.en.
+        threads (int): CPU threads used by the model, 0 for the library default.
+        compute_type (str): Quantization of faster-whisper, such as int8 or float32.
+
+    Raises:
+        TranscriptionBackendError: Unknown backend or missing dependency.
+
+    Returns:
+        WhisperBackend | FasterWhisperBackend: Loaded backend.
+    """
+    if backend not in BACKENDS:
+        raise TranscriptionBackendError(
+            f"Unknown transcription backend '{backend}', expected one of {', '.join(BACKENDS)}."
+        )
+    if backend == "faster_whisper":
+        return FasterWhisperBackend(model_size, threads, compute_type)
+    return WhisperBackend(model_size, threads)
@@ -0,0 +1,144 @@
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import List, Optional
+import contextvars
+import asyncio
+import time
+import logging
+
+from core.utils.audio_tools import AudioBuffer
+from core.transcription.transcriber import SpeechTranscriber
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class TranscriptionJob:
+    """Audio waiting to be transcribed and the future that receives its text."""
+    audio: AudioBuffer
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+class TranscriptionBatcher:
+    """Micro-batching scheduler for Whisper. Jobs that arrive within a short
+    window are decoded together in a single batch on the inference executor."""
+    def __init__(self, transcriber: SpeechTranscriber, executor: Executor,
+                 max_batch_size: int = 8, max_wait_ms: float = 25):
+        self.transcriber = transcriber
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.jobs_processed = 0
+        self.batches_processed = 0
+        self.max_batch_seen = 0
+        self.last_batch_size = 0
+        self.total_wait_time = 0.0
+        self.last_wait_time = 0.0
+
+    def _ensure_worker(self) -> None:
+        """Start the scheduling task in the running event loop if needed."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            # Fresh context, so the id of the request that started it isn't logged
+            self._worker = asyncio.get_running_loop().create_task(
+                self._run(),
+                context=contextvars.Context()
+            )
+
+    async def transcribe(self, audio: AudioBuffer) -> str:
+        """Queue an audio for transcription and wait for its batch to finish.
+
+        Args:
+            audio (AudioBuffer): Audio to transcribe.
+
+        Returns:
+            str: Clean transcription of the audio.
+        """
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(TranscriptionJob(audio=audio, future=future))
+        return await future
+
+    async def _collect_batch(self) -> List[TranscriptionJob]:
+        """Wait for a job, then keep collecting jobs until the batch is full
+        or the batching window is over."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        """Decode batches of queued jobs until the batcher is stopped."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+
+            started_at = time.perf_counter()
+            wait_times = [started_at - job.enqueued_at for job in batch]
+
+            try:
+                transcriptions = await loop.run_in_executor(
+                    self.executor,
+                    self.transcriber.get_transcriptions_from_buffers,
+                    [job.audio for job in batch]
+                )
+                for job, transcription in zip(batch, transcriptions):
+                    if not job.future.done():
+                        job.future.set_result(transcription)
+            except Exception as e:
+                logger.error(f"Error transcribing batch, check transcription batcher: {e}")
+                for job in batch:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+
+            self.jobs_processed += len(batch)
+            self.batches_processed += 1
+            self.last_batch_size = len(batch)
+            self.max_batch_seen = max(self.max_batch_seen, len(batch))
+            self.total_wait_time += sum(wait_times)
+            self.last_wait_time = max(wait_times)
+
+    async def stop(self) -> None:
+        """Stop the scheduling task, pending jobs are cancelled."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        while self._queue is not None and not self._queue.empty():
+            job = self._queue.get_nowait()
+            job.future.cancel()
+
+    def metrics(self) -> dict:
+        """Get queue depth, batch size and wait time of the batcher.
+
+        Returns:
+            dict: Batcher metrics.
+        """
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_batch_size": self.max_batch_size,
+            "batch_window_ms": round(self.max_wait * 1000, 1),
+            "jobs_processed": self.jobs_processed,
+            "batches_processed": self.batches_processed,
+            "last_batch_size": self.last_batch_size,
+            "largest_batch_size": self.max_batch_seen,
+            "average_batch_size": round(self.jobs_processed / self.batches_processed, 2) if self.batches_processed else 0.0,
+            "last_wait_ms": round(self.last_wait_time * 1000, 2),
+            "average_wait_ms": round(self.total_wait_time / self.jobs_processed * 1000, 2) if self.jobs_processed else 0.0,
+        }
@@ -1,20 +1,57 @@
-import whisper
-import warnings
+from typing import List, Optional
 import string
+import numpy as np
 import os
+import logging
+
+from config import (
+    TRANSCRIPTION_BACKEND,
+    TRANSCRIPTION_MODEL_SIZE,
+    TRANSCRIPTION_THREADS,
+    TRANSCRIPTION_COMPUTE_TYPE,
+    WORD_MODE_MAX_TOKENS
+)
+from core.transcription.backends import load_backend, SAMPLE_RATE, WINDOW_SAMPLES
+from core.utils.audio_tools import AudioBuffer, resample_audio
+from core.utils.telemetry import stage_timer
+
+logger = logging.getLogger(__name__)
 
 class SpeechTranscriber:
     """Class for the transcription of audios."""
-    def __init__(self, model_size: str = "small.en"):
+    def __init__(self, model_size: str = TRANSCRIPTION_MODEL_SIZE,
+                 backend: str = TRANSCRIPTION_BACKEND,
+                 threads: int = TRANSCRIPTION_THREADS,
+                 compute_type: str = TRANSCRIPTION_COMPUTE_TYPE):
         self.model = None
         self.model_size = model_size
+        self.backend = backend
+        self.threads = threads
+        self.compute_type = compute_type
         self._load_model()
         
     def _load_model(self):
-        """Load small Open AI Whisper model for english transcriptions"""
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore", category=UserWarning)
-            self.model = whisper.load_model("small.en")
+        """Load the Whisper model of the configured size with the configured backend."""
+        self.model = load_backend(self.backend, self.model_size, self.threads, self.compute_type)
+
+    @property
+    def version(self) -> str:
+        """Identifier of the transcription model, used to key cached results."""
+        return self.model.version
+
+    def _clean_transcription(self, transcription: str) -> str:
+        """Remove punctuation marks and surrounding whitespace and lowercase text.
+
+        Args:
+            transcription (str): Transcription returned by the model.
+
+        Returns:
+            str: Clean transcription.
+        """
+        clean_transcription = transcription.translate(
+            str.maketrans('', '', string.punctuation)
+        )
+        return clean_transcription.strip().lower()
         
     def get_transcription(self, audio_filename: str, audio_dir: str) -> str:
         """Transcribe the given audio file to text.
@@ -31,19 +68,106 @@ class SpeechTranscriber:
         full_audio_path = os.path.join(audio_dir, audio_filename)
 
         try:
-            with warnings.catch_warnings():
-                # Only to ignore terminal warnings
-                warnings.simplefilter("ignore", category=UserWarning)
-                
-                result = self.model.transcribe(full_audio_path)
-                transcription = result["text"]
-                clean_transcription = transcription.translate(
-                    str.maketrans('', '', string.punctuation)
-                )
-                print("Getting audio transcription success!")
-
-            return clean_transcription.strip().lower()
+            text = self.model.transcribe_file(full_audio_path)
+            clean_transcription = self._clean_transcription(text)
+            logger.debug("Getting audio transcription success!")
+
+            return clean_transcription
+        except Exception as e:
+            logger.error(f"Getting audio transcription failed: {e}")
+            return ""
+
+    def _to_whisper_samples(self, audio: AudioBuffer) -> np.ndarray:
+        """Get mono float32 samples at 16000 Hz, as Whisper expects them."""
+        with stage_timer("convert"):
+            whisper_audio = resample_audio(audio, SAMPLE_RATE)
+            return np.ascontiguousarray(whisper_audio.samples, dtype=np.float32)
+
+    def get_transcription_from_buffer(self, audio: AudioBuffer) -> str:
+        """Transcribe audio held in memory to text, without reading it from disk.
+
+        Args:
+            audio (AudioBuffer): Audio to transcribe.
+
+        Returns:
+            str: Clean transcription of the audio.
+        """
+        try:
+            samples = self._to_whisper_samples(audio)
+            text = self.model.transcribe(samples)
+            clean_transcription = self._clean_transcription(text)
+            logger.debug("Getting audio transcription success!")
+
+            return clean_transcription
         except Exception as e:
-            print(f"Getting audio transcription failed: {e}")
+            logger.error(f"Getting audio transcription failed: {e}")
             return ""
-            
\ No newline at end of file
+
+    def get_word_transcription_from_buffer(self, audio: AudioBuffer,
+                                           expected_text: Optional[str] = None,
+                                           max_tokens: int = WORD_MODE_MAX_TOKENS) -> str:
+        """Transcribe a short clip, such as a single word, held in memory. The 
+        expected text is given to the model as context and decoding stops after
+        a few tokens, so the short clip doesn't pay for a full decode.
+
+        Args:
+            audio (AudioBuffer): Audio to transcribe.
+            expected_text (Optional[str]): Text the user was asked to say.
+            max_tokens (int): Most tokens decoded.
+
+        Returns:
+            str: Clean transcription of the audio.
+        """
+        try:
+            samples = self._to_whisper_samples(audio)
+            text = self.model.transcribe_word(samples, expected_text, max_tokens)
+            clean_transcription = self._clean_transcription(text)
+            logger.debug("Getting word transcription success!")
+
+            return clean_transcription
+        except Exception as e:
+            logger.error(f"Getting word transcription failed: {e}")
+            return ""
+
+    def get_transcriptions_from_buffers(self, audios: List[AudioBuffer]) -> List[str]:
+        """Transcribe several audios held in memory at once. Audios up to 30 
+        seconds long are handed to the backend as one batch, longer audios are
+        transcribed one by one.
+
+        Args:
+            audios (List[AudioBuffer]): Audios to transcribe.
+
+        Returns:
+            List[str]: Clean transcription of each audio, in the same order. 
+            An empty string if that audio could not be transcribed.
+        """
+        transcriptions = [""] * len(audios)
+        batch_indexes = []
+        batch = []
+        
+        for index, audio in enumerate(audios):
+            try:
+                samples = self._to_whisper_samples(audio)
+            except Exception as e:
+                logger.error(f"Getting audio transcription failed: {e}")
+                continue
+            
+            if len(samples) > WINDOW_SAMPLES:
+                transcriptions[index] = self.get_transcription_from_buffer(audio)
+                continue
+            
+            batch.append(samples)
+            batch_indexes.append(index)
+
+        if not batch:
+            return transcriptions
+
+        try:
+            texts = self.model.transcribe_batch(batch)
+            for index, text in zip(batch_indexes, texts):
+                transcriptions[index] = self._clean_transcription(text)
+            logger.debug("Getting batch of %s audio transcriptions success!", len(batch_indexes))
+        except Exception as e:
+            logger.error(f"Getting batch audio transcription failed: {e}")
+        
+        return transcriptions
@@ -1,4 +1,11 @@
 from pydub import AudioSegment
+from dataclasses import dataclass
+from scipy.signal import resample_poly
+from typing import List, Optional, Tuple
+from math import gcd
+import numpy as np
+import hashlib
+import io
 import os
 import tempfile
 
@@ -6,6 +13,389 @@ class AudioNormalizationError(Exception):
     """Custom exception for audio normalization errors."""
     pass
 
+class AudioDecodingError(Exception):
+    """Custom exception for audio decoding errors."""
+    pass
+
+@dataclass
+class AudioBuffer:
+    """Mono PCM audio held in memory as float32 samples between -1 and 1."""
+    samples: np.ndarray
+    sample_rate: int
+
+    @property
+    def duration(self) -> float:
+        """Duration of the audio in seconds."""
+        return len(self.samples) / self.sample_rate if self.sample_rate else 0.0
+
+    def content_hash(self) -> str:
+        """Hash the samples and sample rate of the audio.
+
+        Returns:
+            str: SHA-256 hex digest of the audio content.
+        """
+        digest = hashlib.sha256()
+        digest.update(str(self.sample_rate).encode())
+        digest.update(np.ascontiguousarray(self.samples, dtype=np.float32).tobytes())
+        return digest.hexdigest()
+
+# Extensions passed to ffmpeg as the container format, others are probed
+AUDIO_FORMATS = {"wav", "mp3", "flac", "ogg", "webm", "m4a", "mp4", "aac"}
+
+def _get_audio_format(content: bytes, extension: Optional[str]) -> Optional[str]:
+    """Get the format of an audio file from its content or its extension.
+
+    Args:
+        content (bytes): Content of the audio file.
+        extension (Optional[str]): Extension sent by the client, may be missing or wrong.
+
+    Returns:
+        Optional[str]: wav for RIFF WAVE content, the extension if it is a known
+        format, otherwise None so ffmpeg detects it.
+    """
+    if content[:4] == b"RIFF" and content[8:12] == b"WAVE":
+        return "wav"
+    extension = (extension or "").lower()
+    return extension if extension in AUDIO_FORMATS else None
+
+def decode_audio(content: bytes, extension: Optional[str] = None) -> AudioBuffer:
+    """Decode an audio file held in memory, such as wav, mp3, flac, m4a, etc.
+    into mono float32 PCM samples.
+
+    Args:
+        content (bytes): Content of the audio file.
+        extension (Optional[str]): Extension of the audio file. Only a known
+        format is passed to ffmpeg, files without an extension, with another
+        one or with the wrong one, like browser blobs, are probed instead.
+
+    Raises:
+        AudioDecodingError: The content is empty or could not be decoded.
+
+    Returns:
+        AudioBuffer: Decoded audio at its original frame rate.
+    """
+    if not content:
+        raise AudioDecodingError("From decode audio: Audio content is empty.")
+
+    audio_format = _get_audio_format(content, extension)
+    try:
+        audio = AudioSegment.from_file(io.BytesIO(content), format=audio_format)
+    except Exception as e:
+        if audio_format is None or audio_format == "wav":
+            raise AudioDecodingError(f"From decode audio: Could not decode audio. {e}")
+        # The extension didn't match the content, let ffmpeg detect the format
+        try:
+            audio = AudioSegment.from_file(io.BytesIO(content))
+        except Exception as e:
+            raise AudioDecodingError(f"From decode audio: Could not decode audio. {e}")
+
+    audio = audio.set_channels(1)
+    samples = np.array(audio.get_array_of_samples(), dtype=np.float32)
+    # Scale integer samples of the given resolution to [-1, 1]
+    samples /= float(1 << (8 * audio.sample_width - 1))
+    return AudioBuffer(samples=samples, sample_rate=audio.frame_rate)
+
+def decode_pcm16(content: bytes) -> np.ndarray:
+    """Decode raw 16 bit little-endian mono PCM, such as a chunk of a live
+    recording, into float32 samples.
+
+    Args:
+        content (bytes): PCM bytes, an odd trailing byte is ignored.
+
+    Returns:
+        np.ndarray: Samples between -1 and 1.
+    """
+    pcm = np.frombuffer(content[:len(content) - len(content) % 2], dtype="<i2")
+    return pcm.astype(np.float32) / 32768.0
+
+def resample_audio(audio: AudioBuffer, frame_rate: int) -> AudioBuffer:
+    """Resample audio held in memory to the given frame rate.
+
+    Args:
+        audio (AudioBuffer): Audio to resample.
+        frame_rate (int): Target frame rate in Hz.
+
+    Returns:
+        AudioBuffer: Resampled audio, the same buffer if already at that rate.
+    """
+    if audio.sample_rate == frame_rate:
+        return audio
+
+    divisor = gcd(audio.sample_rate, frame_rate)
+    samples = resample_poly(
+        audio.samples,
+        frame_rate // divisor,
+        audio.sample_rate // divisor
+    ).astype(np.float32)
+    return AudioBuffer(samples=samples, sample_rate=frame_rate)
+
+def _mask_to_spans(mask: np.ndarray, frame_length: int, total_length: int,
+                   min_silence_frames: int, min_speech_frames: int,
+                   padding: int) -> List[Tuple[int, int]]:
+    """Turn a speech mask of equal frames into padded spans of samples.
+
+    Args:
+        mask (np.ndarray): Whether each frame holds speech.
+        frame_length (int): Samples per frame.
+        total_length (int): Samples of the whole audio.
+        min_silence_frames (int): Shorter silences are part of the speech around them.
+        min_speech_frames (int): Shorter speech is dropped as noise.
+        padding (int): Samples kept around each span.
+
+    Returns:
+        List[Tuple[int, int]]: Start and end sample of each span.
+    """
+    # Start and end frame of every run of speech frames
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+    runs = []
+    for start, end in zip(edges[::2], edges[1::2]):
+        if runs and start - runs[-1][1] < min_silence_frames:
+            runs[-1][1] = end
+        else:
+            runs.append([start, end])
+
+    spans = []
+    for start, end in runs:
+        if end - start < min_speech_frames:
+            continue
+        start = max(0, start * frame_length - padding)
+        end = min(total_length, end * frame_length + padding)
+        # Padding may join two spans
+        if spans and start <= spans[-1][1]:
+            spans[-1] = (spans[-1][0], end)
+        else:
+            spans.append((start, end))
+    return spans
+
+def _energy_speech_mask(audio: AudioBuffer, frame_length: int,
+                        margin_db: float) -> np.ndarray:
+    """Mark frames louder than the noise floor of the audio by margin_db as speech.
+    The noise floor is the 10th percentile of the frame energies."""
+    frame_count = len(audio.samples) // frame_length
+    frames = audio.samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+    energy_db = 10 * np.log10(np.mean(np.square(frames, dtype=np.float64), axis=1) + 1e-10)
+    # Never below -60 dBFS, so digital silence doesn't turn hiss into speech
+    threshold = max(np.percentile(energy_db, 10) + margin_db, -60.0)
+    return energy_db > threshold
+
+def _webrtc_speech_mask(audio: AudioBuffer, frame_ms: int,
+                        aggressiveness: int) -> np.ndarray:
+    """Mark frames as speech with the WebRTC voice activity detector."""
+    try:
+        import webrtcvad
+    except ImportError as e:
+        raise AudioDecodingError(
+            f"From detect speech: webrtcvad is not installed, install it with pip install webrtcvad. {e}"
+        )
+
+    vad = webrtcvad.Vad(aggressiveness)
+    # WebRTC only reads 16 bit PCM at a few rates
+    audio_16k = resample_audio(audio, 16000)
+    pcm = (np.clip(audio_16k.samples, -1, 1) * 32767).astype("<i2").tobytes()
+    frame_bytes = 2 * 16000 * frame_ms // 1000
+    return np.array([
+        vad.is_speech(pcm[start:start + frame_bytes], 16000)
+        for start in range(0, len(pcm) - frame_bytes + 1, frame_bytes)
+    ], dtype=bool)
+
+def detect_speech(audio: AudioBuffer, method: str = "energy", frame_ms: int = 30,
+                  min_silence_ms: int = 300, min_speech_ms: int = 90,
+                  padding_ms: int = 200, margin_db: float = 12.0,
+                  aggressiveness: int = 2) -> List[Tuple[int, int]]:
+    """Find the spans of audio that hold speech. Silences shorter than 
+    min_silence_ms are kept inside the speech around them, so pauses between
+    words stay where they are.
+
+    Args:
+        audio (AudioBuffer): Audio to inspect.
+        method (str): energy, compares each frame against the noise floor of 
+        the audio, or webrtc, uses the WebRTC detector (needs webrtcvad).
+        frame_ms (int): Frame length in milliseconds, 10, 20 or 30 for webrtc.
+        min_silence_ms (int): Shortest silence that splits two spans.
+        min_speech_ms (int): Shortest sound kept as speech.
+        padding_ms (int): Audio kept before and after each span.
+        margin_db (float): Decibels above the noise floor counted as speech (energy).
+        aggressiveness (int): From 0 to 3, how strictly noise is rejected (webrtc).
+
+    Raises:
+        AudioDecodingError: Unknown method or webrtcvad is not installed.
+
+    Returns:
+        List[Tuple[int, int]]: Start and end sample of each span, empty if no
+        speech was found.
+    """
+    frame_length = audio.sample_rate * frame_ms // 1000
+    if frame_length == 0 or len(audio.samples) < frame_length:
+        return []
+
+    if method == "energy":
+        mask = _energy_speech_mask(audio, frame_length, margin_db)
+    elif method == "webrtc":
+        mask = _webrtc_speech_mask(audio, frame_ms, aggressiveness)
+    else:
+        raise AudioDecodingError(f"From detect speech: Unknown method '{method}'.")
+
+    return _mask_to_spans(
+        mask,
+        frame_length,
+        len(audio.samples),
+        min_silence_frames=max(1, min_silence_ms // frame_ms),
+        min_speech_frames=max(1, min_speech_ms // frame_ms),
+        padding=audio.sample_rate * padding_ms // 1000
+    )
+
+def trim_silence(audio: AudioBuffer, spans: List[Tuple[int, int]],
+                 margin_ms: int = 0) -> AudioBuffer:
+    """Cut the silence before the first and after the last span of speech.
+
+    Args:
+        audio (AudioBuffer): Audio to trim.
+        spans (List[Tuple[int, int]]): Spans of speech, see detect_speech.
+        margin_ms (int): Extra audio kept before the first and after the last span.
+
+    Returns:
+        AudioBuffer: Trimmed audio, the same buffer if there is nothing to trim.
+    """
+    if not spans:
+        return audio
+    margin = audio.sample_rate * margin_ms // 1000
+    start = max(0, spans[0][0] - margin)
+    end = min(len(audio.samples), spans[-1][1] + margin)
+    if start == 0 and end == len(audio.samples):
+        return audio
+    return AudioBuffer(samples=audio.samples[start:end], sample_rate=audio.sample_rate)
+
+def join_speech(audio: AudioBuffer, spans: List[Tuple[int, int]],
+                gap_ms: int = 100) -> AudioBuffer:
+    """Join the spans of speech, separated by a short silence so words of
+    different spans don't run together.
+
+    Args:
+        audio (AudioBuffer): Audio to cut.
+        spans (List[Tuple[int, int]]): Spans of speech, see detect_speech.
+        gap_ms (int): Silence between spans in milliseconds.
+
+    Returns:
+        AudioBuffer: Speech only, the same buffer if there is no span.
+    """
+    if not spans:
+        return audio
+    if len(spans) == 1:
+        return trim_silence(audio, spans)
+
+    gap = np.zeros(audio.sample_rate * gap_ms // 1000, dtype=np.float32)
+    pieces = []
+    for start, end in spans:
+        if pieces:
+            pieces.append(gap)
+        pieces.append(audio.samples[start:end])
+    return AudioBuffer(samples=np.concatenate(pieces).astype(np.float32), sample_rate=audio.sample_rate)
+
+class SpeechSegmenter:
+    """Split audio that arrives in chunks, such as a live recording, into 
+    spans of speech. A span is complete once min_silence_ms of silence follows
+    it, so it can be transcribed while the rest is still being recorded. 
+    Frames are compared against the noise floor of the audio received so far,
+    like detect_speech does with the whole audio."""
+    def __init__(self, sample_rate: int, frame_ms: int = 30, min_silence_ms: int = 300,
+                 min_speech_ms: int = 90, padding_ms: int = 200, margin_db: float = 12.0,
+                 max_span_seconds: float = 25.0):
+        self.sample_rate = sample_rate
+        self.frame_length = sample_rate * frame_ms // 1000
+        self.min_silence_frames = max(1, min_silence_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.padding = sample_rate * padding_ms // 1000
+        self.margin_db = margin_db
+        # Whisper decodes up to 30 seconds at once, longer speech is split
+        self.max_span_frames = int(max_span_seconds * 1000) // frame_ms
+        
+        self._chunks: List[np.ndarray] = []
+        self._length = 0
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._energies: List[float] = []
+        self._speech_start: Optional[int] = None
+        self._last_speech = 0
+        self._last_end = 0
+
+    @property
+    def duration(self) -> float:
+        """Duration of the audio received so far in seconds."""
+        return self._length / self.sample_rate
+
+    @property
+    def audio(self) -> AudioBuffer:
+        """Every sample received so far."""
+        if len(self._chunks) > 1:
+            self._chunks = [np.concatenate(self._chunks)]
+        samples = self._chunks[0] if self._chunks else np.zeros(0, dtype=np.float32)
+        return AudioBuffer(samples=samples, sample_rate=self.sample_rate)
+
+    def _close_span(self, end_frame: int) -> Optional[Tuple[int, int]]:
+        """Close the current span at end_frame and pad it, None if too short."""
+        start_frame, self._speech_start = self._speech_start, None
+        if end_frame - start_frame < self.min_speech_frames:
+            return None
+        # Padding never reaches back into the previous span
+        start = max(self._last_end, start_frame * self.frame_length - self.padding)
+        end = min(self._length, end_frame * self.frame_length + self.padding)
+        self._last_end = end
+        return (start, end)
+
+    def feed(self, samples: np.ndarray) -> List[Tuple[int, int]]:
+        """Add mono float32 samples and get the spans of speech they complete.
+
+        Args:
+            samples (np.ndarray): Next samples of the audio.
+
+        Returns:
+            List[Tuple[int, int]]: Start and end sample of each completed span,
+            counted from the start of the audio.
+        """
+        samples = np.asarray(samples, dtype=np.float32)
+        self._chunks.append(samples)
+        self._length += len(samples)
+        
+        # Samples that didn't fill a frame wait for the next chunk
+        pending = np.concatenate((self._pending, samples))
+        frame_count = len(pending) // self.frame_length
+        self._pending = pending[frame_count * self.frame_length:]
+        if frame_count == 0:
+            return []
+
+        first_frame = len(self._energies)
+        frames = pending[:frame_count * self.frame_length].reshape(frame_count, self.frame_length)
+        energy_db = 10 * np.log10(np.mean(np.square(frames, dtype=np.float64), axis=1) + 1e-10)
+        self._energies.extend(energy_db.tolist())
+        threshold = max(np.percentile(self._energies, 10) + self.margin_db, -60.0)
+
+        spans = []
+        for frame, is_speech in enumerate(energy_db > threshold, start=first_frame):
+            if is_speech:
+                if self._speech_start is None:
+                    self._speech_start = frame
+                self._last_speech = frame
+                if frame + 1 - self._speech_start >= self.max_span_frames:
+                    span = self._close_span(frame + 1)
+                    if span is not None:
+                        spans.append(span)
+            elif (self._speech_start is not None
+                  and frame - self._last_speech >= self.min_silence_frames):
+                span = self._close_span(self._last_speech + 1)
+                if span is not None:
+                    spans.append(span)
+        return spans
+
+    def flush(self) -> List[Tuple[int, int]]:
+        """Close the span still open when the audio ends.
+
+        Returns:
+            List[Tuple[int, int]]: The last span, if there was speech in it.
+        """
+        if self._speech_start is None:
+            return []
+        span = self._close_span(self._last_speech + 1)
+        return [span] if span is not None else []
+
 def convert_audio_extension(audio_filename: str, audio_dir: str, 
                             extension: str = "wav") -> str:
     """Convert a given audio file to a different extension such as mp3, wav, 
@@ -0,0 +1,222 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Hashable, Iterator, Optional
+import threading
+import sqlite3
+import json
+import time
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+class LRUCache:
+    """Thread safe in-memory cache that evicts the least recently used entry
+    once it holds more than max_size entries. Entries expire after ttl seconds
+    when a ttl is given."""
+    def __init__(self, max_size: int = 128, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get the value stored for a key and mark it as recently used.
+
+        Args:
+            key (Hashable): Cache key.
+
+        Returns:
+            Optional[Any]: Stored value, None if the key is not cached or expired.
+        """
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            value, expires_at = self._entries[key]
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if needed.
+
+        Args:
+            key (Hashable): Cache key.
+            value (Any): Value to store.
+        """
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """On-disk cache of JSON serializable values stored in a SQLite database.
+    Least recently used entries are evicted once the stored values take more
+    than max_bytes. Safe to share between threads and worker processes."""
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    accessed REAL NOT NULL
+                )"""
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection that commits and closes when the block ends."""
+        connection = sqlite3.connect(self.path, timeout=5)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get the value stored for a key and mark it as recently used.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            Optional[Any]: Stored value, None if the key is not cached.
+        """
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT value FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            connection.execute(
+                "UPDATE cache SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value and evict least recently used entries until the cache
+        fits in max_bytes.
+
+        Args:
+            key (str): Cache key.
+            value (Any): JSON serializable value to store.
+        """
+        serialized = json.dumps(value)
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                (key, serialized, len(serialized), time.time())
+            )
+            total_size = connection.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+            while total_size > self.max_bytes:
+                oldest = connection.execute(
+                    "SELECT key, size FROM cache ORDER BY accessed ASC LIMIT 1"
+                ).fetchone()
+                if oldest is None:
+                    break
+                connection.execute("DELETE FROM cache WHERE key = ?", (oldest[0],))
+                total_size -= oldest[1]
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        with self._connect() as connection:
+            connection.execute("DELETE FROM cache")
+
+    def __len__(self) -> int:
+        with self._connect() as connection:
+            return connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class TieredCache:
+    """Cache with an in-memory LRU tier in front of an optional on-disk tier.
+    Values found on disk are promoted to memory."""
+    def __init__(self, memory: LRUCache, disk: Optional[SQLiteCache] = None):
+        self.memory = memory
+        self.disk = disk
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get the value stored for a key from memory, then from disk.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            Optional[Any]: Stored value, None if the key is not cached.
+        """
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            try:
+                value = self.disk.get(key)
+            except sqlite3.Error as e:
+                logger.error(f"Error reading disk cache, check cache: {e}")
+                value = None
+            if value is not None:
+                self.memory.set(key, value)
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value in every tier.
+
+        Args:
+            key (str): Cache key.
+            value (Any): JSON serializable value to store.
+        """
+        self.memory.set(key, value)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value)
+            except sqlite3.Error as e:
+                logger.error(f"Error writing disk cache, check cache: {e}")
+
+    def stats(self) -> dict:
+        """Get hit and miss counters of the cache and each of its tiers.
+
+        Returns:
+            dict: Cache statistics.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_hits": self.memory.hits,
+            "memory_entries": len(self.memory),
+            "disk_enabled": self.disk is not None,
+            "disk_hits": self.disk.hits if self.disk is not None else 0,
+            "disk_entries": len(self.disk) if self.disk is not None else 0,
+        }
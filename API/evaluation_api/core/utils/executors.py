@@ -0,0 +1,67 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import threading
+
+from config import PRAAT_WORKERS, PRAAT_TIMEOUT
+from core.analysis.analyzer import preload_scripts
+from core.utils.praat_pool import PraatWorkerPool
+
+_praat_executor: Optional[PraatWorkerPool] = None
+_inference_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+def get_praat_executor() -> PraatWorkerPool:
+    """Get the worker processes that run Praat analysis outside of the API process.
+    Workers are spawned instead of forked, the parent process holds torch threads.
+
+    Returns:
+        PraatWorkerPool: Shared pool with PRAAT_WORKERS processes, each job 
+        limited to PRAAT_TIMEOUT seconds.
+    """
+    global _praat_executor
+    with _lock:
+        if _praat_executor is None:
+            _praat_executor = PraatWorkerPool(
+                workers=PRAAT_WORKERS,
+                timeout=PRAAT_TIMEOUT,
+                initializer=preload_scripts
+            )
+        return _praat_executor
+
+def get_praat_executor_status() -> dict:
+    """Get the state of the Praat worker pool without starting it.
+
+    Returns:
+        dict: Pool status, only started is set if the pool isn't started.
+    """
+    with _lock:
+        executor = _praat_executor
+    if executor is None:
+        return {"started": False}
+    return {"started": True, **executor.status()}
+
+def get_inference_executor() -> ThreadPoolExecutor:
+    """Get the dedicated thread that runs Whisper inference.
+
+    Returns:
+        ThreadPoolExecutor: Shared executor with a single inference thread.
+    """
+    global _inference_executor
+    with _lock:
+        if _inference_executor is None:
+            _inference_executor = ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix="whisper-inference"
+            )
+        return _inference_executor
+
+def shutdown_executors() -> None:
+    """Shut down every executor, waiting for running jobs to finish."""
+    global _praat_executor, _inference_executor
+    with _lock:
+        if _praat_executor is not None:
+            _praat_executor.shutdown(wait=True, cancel_futures=True)
+            _praat_executor = None
+        if _inference_executor is not None:
+            _inference_executor.shutdown(wait=True, cancel_futures=True)
+            _inference_executor = None
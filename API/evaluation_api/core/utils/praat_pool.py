@@ -0,0 +1,256 @@
+from concurrent.futures import Executor, Future
+from multiprocessing.connection import Connection
+from typing import Callable, Optional
+import multiprocessing
+import threading
+import tempfile
+import logging
+import signal
+import shutil
+import queue
+import time
+import os
+
+from core.utils.telemetry import PRAAT_WORKER_RESTARTS
+
+logger = logging.getLogger(__name__)
+
+# Backoff before restarting a worker that failed shortly after it started
+MIN_RESTART_DELAY = 0.5
+MAX_RESTART_DELAY = 30.0
+STABLE_SECONDS = 60.0
+# Seconds a new worker may take to import its modules and run the initializer
+STARTUP_TIMEOUT = 120.0
+
+class PraatWorkerError(Exception):
+    """Custom exception for a Praat worker that crashed or timed out during a job."""
+    pass
+
+def _worker_main(connection: Connection, scratch_dir: str,
+                 initializer: Optional[Callable[[], None]]) -> None:
+    """Loop of a worker process: run each job received on the connection and
+    send back its result, until the connection closes or None is received."""
+    # The API process stops the workers, Ctrl+C on the server shouldn't
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Anything Praat or tempfile writes stays in the directory of this worker
+    os.environ["TMPDIR"] = scratch_dir
+    tempfile.tempdir = scratch_dir
+    os.chdir(scratch_dir)
+    if initializer is not None:
+        initializer()
+    connection.send("ready")
+
+    while True:
+        try:
+            job = connection.recv()
+        except (EOFError, OSError):
+            break
+        if job is None:
+            break
+
+        function, args, kwargs = job
+        try:
+            reply = (True, function(*args, **kwargs))
+        except Exception as e:
+            reply = (False, e)
+        try:
+            connection.send(reply)
+        except Exception as e:
+            # The result or the error can't be pickled
+            connection.send((False, PraatWorkerError(f"Unable to send the result of the job: {e}")))
+
+class _Worker:
+    """A worker process with its connection and scratch directory."""
+    def __init__(self, index: int, context, initializer: Optional[Callable[[], None]]):
+        self.index = index
+        self.context = context
+        self.initializer = initializer
+        self.process = None
+        self.connection = None
+        self.scratch_dir = None
+        self.started_at = 0.0
+        self.ready = False
+        self.restart_delay = MIN_RESTART_DELAY
+        self.restarts = 0
+
+    def start(self) -> None:
+        self.scratch_dir = tempfile.mkdtemp(prefix=f"praat-worker-{self.index}-")
+        self.connection, child_connection = self.context.Pipe()
+        self.process = self.context.Process(
+            target=_worker_main,
+            args=(child_connection, self.scratch_dir, self.initializer),
+            name=f"praat-worker-{self.index}",
+            daemon=True
+        )
+        self.process.start()
+        child_connection.close()
+        self.started_at = time.monotonic()
+        self.ready = False
+
+    def wait_ready(self) -> None:
+        """Wait until the worker ran its initializer, the time it takes doesn't
+        count in the timeout of the first job.
+
+        Raises:
+            EOFError: The worker exited while starting.
+            PraatWorkerError: The worker didn't start in STARTUP_TIMEOUT seconds.
+        """
+        if self.ready:
+            return
+        if not self.connection.poll(STARTUP_TIMEOUT):
+            raise PraatWorkerError(f"Praat worker didn't start in {STARTUP_TIMEOUT}s")
+        self.connection.recv()
+        self.ready = True
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Ask the worker to exit, kill it if it doesn't, and remove its scratch directory."""
+        if self.process is not None:
+            try:
+                self.connection.send(None)
+            except (OSError, ValueError):
+                pass
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+            self.connection.close()
+            self.process = None
+        if self.scratch_dir is not None:
+            shutil.rmtree(self.scratch_dir, ignore_errors=True)
+            self.scratch_dir = None
+
+    def restart(self, reason: str) -> None:
+        """Replace the worker with a new process. A worker failing again soon
+        after it started waits longer each time before it is restarted."""
+        if time.monotonic() - self.started_at < STABLE_SECONDS:
+            delay = self.restart_delay
+            self.restart_delay = min(self.restart_delay * 2, MAX_RESTART_DELAY)
+        else:
+            delay = 0.0
+            self.restart_delay = MIN_RESTART_DELAY
+        logger.warning(f"Restarting Praat worker {self.index} in {delay:.1f}s, it {reason}")
+        PRAAT_WORKER_RESTARTS.labels(reason).inc()
+
+        self.process.kill()
+        self.stop(timeout=0)
+        time.sleep(delay)
+        self.restarts += 1
+        self.start()
+
+class PraatWorkerPool(Executor):
+    """Pool of Praat worker processes, started when the pool is created. Each
+    worker has its own pipe and scratch directory, and runs the initializer
+    once, for example to preload the Praat scripts. Jobs wait in a queue until
+    a worker is free. A job taking longer than timeout seconds fails with
+    PraatWorkerError and its worker is killed and restarted, like a worker
+    that crashes."""
+    def __init__(self, workers: int, timeout: float = 60.0,
+                 initializer: Optional[Callable[[], None]] = None,
+                 mp_context=None):
+        self.timeout = timeout
+        self.jobs = queue.Queue()
+        self._shutdown = False
+        self._lock = threading.Lock()
+        context = mp_context or multiprocessing.get_context("spawn")
+
+        self.workers = [_Worker(index, context, initializer) for index in range(workers)]
+        for worker in self.workers:
+            worker.start()
+        self.threads = [
+            threading.Thread(target=self._dispatch, args=(worker,), name=f"praat-dispatch-{worker.index}", daemon=True)
+            for worker in self.workers
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        """Queue a job. The function and its arguments must be picklable.
+
+        Raises:
+            RuntimeError: The pool was shut down.
+
+        Returns:
+            Future: Result of the function.
+        """
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("Cannot submit a job after the Praat worker pool was shut down.")
+            future = Future()
+            self.jobs.put((future, fn, args, kwargs))
+            return future
+
+    def _dispatch(self, worker: _Worker) -> None:
+        """Send jobs from the queue to a worker, one at a time."""
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                worker.stop()
+                break
+            future, fn, args, kwargs = job
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                worker.wait_ready()
+                worker.connection.send((fn, args, kwargs))
+                if not worker.connection.poll(self.timeout):
+                    future.set_exception(PraatWorkerError(f"Praat job timed out after {self.timeout}s"))
+                    worker.restart("timed out")
+                    continue
+                succeeded, value = worker.connection.recv()
+            except (EOFError, OSError) as e:
+                future.set_exception(PraatWorkerError(f"Praat worker crashed during the job: {e!r}"))
+                worker.restart("crashed")
+                continue
+            except PraatWorkerError as e:
+                future.set_exception(e)
+                worker.restart("didn't start")
+                continue
+            except Exception as e:
+                # The job couldn't be pickled, the worker is still fine
+                future.set_exception(e)
+                continue
+
+            if succeeded:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def status(self) -> dict:
+        """Get the state of the pool.
+
+        Returns:
+            dict: Number of workers, how many are alive, queued jobs and restarts.
+        """
+        return {
+            "workers": len(self.workers),
+            "alive": sum(1 for worker in self.workers if worker.process is not None and worker.process.is_alive()),
+            "queued": self.jobs.qsize(),
+            "restarts": sum(worker.restarts for worker in self.workers),
+        }
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        """Stop accepting jobs, each worker stops once the queue is empty.
+
+        Args:
+            wait (bool): Wait for the queued jobs and the workers to finish.
+            cancel_futures (bool): Cancel the jobs that haven't started.
+        """
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            if cancel_futures:
+                while True:
+                    try:
+                        job = self.jobs.get_nowait()
+                    except queue.Empty:
+                        break
+                    if job is not None:
+                        job[0].cancel()
+            for _ in self.threads:
+                self.jobs.put(None)
+
+        if wait:
+            for thread in self.threads:
+                thread.join()
@@ -0,0 +1,124 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Iterator, Tuple
+from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+import logging
+import json
+import time
+import sys
+
+# Id of the request being handled, copied to every log line written while handling it
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+# Attributes every log record has, anything else was passed with extra=
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+# Seconds, from a cached lookup to a long local model generation
+_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+STAGE_SECONDS = Histogram(
+    "echo_stage_duration_seconds",
+    "Time spent in each stage of the evaluation pipeline.",
+    ["stage"],
+    buckets=_BUCKETS
+)
+STAGE_ERRORS = Counter(
+    "echo_stage_errors_total",
+    "Stages of the evaluation pipeline that raised an error.",
+    ["stage"]
+)
+PRAAT_WORKER_RESTARTS = Counter(
+    "echo_praat_worker_restarts_total",
+    "Praat worker processes restarted after crashing or timing out.",
+    ["reason"]
+)
+REQUEST_SECONDS = Histogram(
+    "echo_request_duration_seconds",
+    "Time until the response of each request starts.",
+    ["method", "route", "status"],
+    buckets=_BUCKETS
+)
+
+logger = logging.getLogger(__name__)
+
+class RequestIdFilter(logging.Filter):
+    """Add the id of the current request to each log record."""
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """Format each log record as a single line JSON object. Values passed with
+    extra= are added as fields."""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", request_id_var.get()),
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+def configure_logging(level: str = "INFO", log_format: str = "json") -> None:
+    """Send the logs of the API and uvicorn to stdout, as JSON or plain text,
+    with the request id on every line.
+
+    Args:
+        level (str): Minimum level logged.
+        log_format (str): json, or text for local development.
+    """
+    handler = logging.StreamHandler(sys.stdout)
+    handler.addFilter(RequestIdFilter())
+    if log_format == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"
+        ))
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level.upper())
+
+    for name in ("uvicorn", "uvicorn.error"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+    # Requests are logged by the request middleware, with their id and duration
+    logging.getLogger("uvicorn.access").disabled = True
+    # The HTTP clients log every request they send at info level
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """Time a stage of the evaluation pipeline. The duration is added to the
+    stage histogram and logged at debug level, errors are counted.
+
+    Args:
+        stage (str): Name of the stage, such as praat or whisper.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.labels(stage).inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.labels(stage).observe(elapsed)
+        logger.debug("Stage finished", extra={"stage": stage, "duration_ms": round(elapsed * 1000, 2)})
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Get every metric in the Prometheus text format.
+
+    Returns:
+        Tuple[bytes, str]: Metrics and their content type.
+    """
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -1,8 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, Form
+from fastapi import APIRouter, Depends, HTTPException, Form, Header
+from typing import Optional
 import json
+import logging
 
 from schemas.classification_schema import ClassificationResponse
+from schemas.evaluation_schema import ResourceType
 from services.classification_service import ClassificationService, get_classification_service
+from services.reference_service import ReferenceService, get_reference_service
+
+logger = logging.getLogger(__name__)
 
 router_classification = APIRouter(
     prefix="/classification",
@@ -44,7 +50,45 @@ async def classify_audio(
         return classification_response
     
     except Exception as e:
-        print(f"Unexpected error: {str(e)}")
+        logger.error(f"Unexpected error: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="An unexpected error occurred during audio classification."
+        )
+
+@router_classification.post("/classify_audio/by_resource", response_model=ClassificationResponse)
+async def classify_audio_by_resource(
+    resource_type: ResourceType = Form(...),
+    resource_id: str = Form(...),
+    user_analysis: str = Form(...),
+    authorization: Optional[str] = Header(None),
+    reference_service: ReferenceService = Depends(get_reference_service),
+    classification_service: ClassificationService = Depends(get_classification_service),
+): 
+    try:
+        user_dict = json.loads(user_analysis)
+    except json.JSONDecodeError:
+        raise HTTPException(
+            status_code=400, 
+            detail="Invalid user_analysis format. Must be a valid JSON."
+        )
+        
+    reference_dict = await reference_service.get_reference_analysis(
+        resource_type.value,
+        resource_id,
+        authorization
+    )
+        
+    try:
+        # Call the audio classification service
+        classification_response = await classification_service.generate_classification(
+            user_dict,
+            reference_dict,
+        )
+        return classification_response
+    
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail="An unexpected error occurred during audio classification."
@@ -1,17 +1,47 @@
-from fastapi import APIRouter, UploadFile, Depends, HTTPException, Form
+from fastapi import APIRouter, UploadFile, Depends, HTTPException, Form, Header, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Optional
 import json
+import logging
 
-from schemas.evaluation_schema import AnalysisResponse, EvaluationResponse, FeedbackResponse
+from schemas.evaluation_schema import AnalysisResponse, EvaluationResponse, FeedbackResponse, ResourceType, FeedbackMode
+from schemas.evaluation_schema import BatchEvaluationRequest, BatchEvaluationResponse, AnalysisStreamEvent
 from services.analysis_service import AnalysisService, get_analysis_service
 from services.evaluation_service import EvaluationService, get_evaluation_service
+from services.batch_evaluation_service import BatchEvaluationService, get_batch_evaluation_service
 from services.feedback_service import FeedbackService, get_feedback_service
 from services.local_feedback_service import LocalFeedbackService, get_local_feedback_service
+from services.reference_service import ReferenceService, get_reference_service
+from services.full_evaluation_service import FullEvaluationService, get_full_evaluation_service
+
+logger = logging.getLogger(__name__)
 
 router_evaluation = APIRouter(
     prefix="/evaluation",
     tags=["Audio Evaluation"],
 )
 
+def _parse_analysis(analysis: str, field_name: str) -> dict:
+    """Parse an analysis sent as a JSON form field.
+
+    Args:
+        analysis (str): JSON string of the analysis.
+        field_name (str): Name of the form field, used in the error message.
+
+    Raises:
+        HTTPException: The field is not a valid JSON.
+
+    Returns:
+        dict: Parsed analysis.
+    """
+    try:
+        return json.loads(analysis)
+    except json.JSONDecodeError:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Invalid {field_name} format. Must be a valid JSON."
+        )
+
 @router_evaluation.get("/")
 async def root():
     return {"message": "Welcome to the Audio Evaluation API prefix!"}
@@ -19,6 +49,8 @@ async def root():
 @router_evaluation.post("/analyze_audio", response_model=AnalysisResponse)
 async def analyze_audio(
     audio_file: UploadFile,
+    resource_type: Optional[ResourceType] = Form(None),
+    expected_text: Optional[str] = Form(None),
     analysis_service: AnalysisService = Depends(get_analysis_service)
 ): 
     # Make sure an audio file was passed
@@ -30,16 +62,64 @@ async def analyze_audio(
         
     try:
         # Call the audio analysis service
-        analysis_response = await analysis_service.analyze_audio(audio_file)
+        analysis_response = await analysis_service.analyze_audio(
+            audio_file,
+            resource_type.value if resource_type is not None else None,
+            expected_text
+        )
         return analysis_response
     
     except Exception as e:
-        print(f"Unexpected error: {str(e)}")
+        logger.error(f"Unexpected error: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail="An unexpected error occurred during audio analysis."
         )
 
+async def _receive_audio_chunks(websocket: WebSocket) -> AsyncIterator[bytes]:
+    """Read binary PCM chunks from a websocket until the client sends the
+    {"event": "end"} text message.
+
+    Raises:
+        WebSocketDisconnect: The client disconnected before ending the upload.
+    """
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        if message.get("bytes") is not None:
+            yield message["bytes"]
+        elif message.get("text") is not None:
+            try:
+                event = json.loads(message["text"])
+            except json.JSONDecodeError:
+                event = {}
+            if isinstance(event, dict) and event.get("event") == "end":
+                return
+
+@router_evaluation.websocket("/analyze_audio/stream")
+async def analyze_audio_stream(
+    websocket: WebSocket,
+    sample_rate: int = 16000,
+    analysis_service: AnalysisService = Depends(get_analysis_service)
+):
+    await websocket.accept()
+
+    if not 8000 <= sample_rate <= 48000:
+        await websocket.send_text(AnalysisStreamEvent(
+            event="error",
+            error="Invalid sample rate. It must be between 8000 and 48000 Hz."
+        ).model_dump_json(exclude_none=True))
+        await websocket.close(code=1003)
+        return
+
+    try:
+        async for event in analysis_service.analyze_stream(_receive_audio_chunks(websocket), sample_rate):
+            await websocket.send_text(event.model_dump_json(exclude_none=True))
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.debug("Client disconnected during the audio stream")
+
 @router_evaluation.post("/evaluate_audio", response_model=EvaluationResponse)
 async def evaluate_audio(
     reference_analysis: str = Form(...),
@@ -71,16 +151,25 @@ async def evaluate_audio(
         return evaluation_response
     
     except Exception as e:
-        print(f"Unexpected error: {str(e)}")
+        logger.error(f"Unexpected error: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail="An unexpected error occurred during audio evaluation."
         )
 
+@router_evaluation.post("/evaluate_batch", response_model=BatchEvaluationResponse)
+async def evaluate_batch(
+    request: BatchEvaluationRequest,
+    batch_evaluation_service: BatchEvaluationService = Depends(get_batch_evaluation_service),
+):
+    # Call the batch evaluation service
+    return await batch_evaluation_service.evaluate_batch(request)
+
 @router_evaluation.post("/feedback", response_model=FeedbackResponse)
 async def feedback(
     reference_analysis: str = Form(...),
     user_analysis: str = Form(...),
+    use_llm: bool = Form(False),
     feedback_service: FeedbackService = Depends(get_feedback_service),
 ):      
     try:
@@ -103,12 +192,13 @@ async def feedback(
         # Call the audio feedback function
         feedback_response = await feedback_service.generate_feedback(
             user_dict,
-            reference_dict
+            reference_dict,
+            use_llm
         )
         return feedback_response
     
     except Exception as e:
-        print(f"Unexpected error: {str(e)}")
+        logger.error(f"Unexpected error: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"{str(e)}"
@@ -145,9 +235,167 @@ async def feedback_local(
         return feedback_response
     
     except Exception as e:
-        print(f"Unexpected error: {str(e)}")
+        logger.error(f"Unexpected error: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"{str(e)}"
+        )
+
+@router_evaluation.post("/feedback/local/stream")
+async def feedback_local_stream(
+    reference_analysis: str = Form(...),
+    user_analysis: str = Form(...),
+    local_feedback_service: LocalFeedbackService = Depends(get_local_feedback_service),
+):
+    reference_dict = _parse_analysis(reference_analysis, "reference_analysis")
+    user_dict = _parse_analysis(user_analysis, "user_analysis")
+
+    return StreamingResponse(
+        local_feedback_service.stream_feedback(
+            user_dict,
+            reference_dict
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router_evaluation.post("/evaluate_audio/by_resource", response_model=EvaluationResponse)
+async def evaluate_audio_by_resource(
+    resource_type: ResourceType = Form(...),
+    resource_id: str = Form(...),
+    user_analysis: str = Form(...),
+    authorization: Optional[str] = Header(None),
+    reference_service: ReferenceService = Depends(get_reference_service),
+    evaluation_service: EvaluationService = Depends(get_evaluation_service),
+): 
+    user_dict = _parse_analysis(user_analysis, "user_analysis")
+    reference_dict = await reference_service.get_reference_analysis(
+        resource_type.value,
+        resource_id,
+        authorization
+    )
+        
+    try:
+        # Call the audio evaluation service
+        evaluation_response = await evaluation_service.evaluate_audio(
+            user_dict,
+            reference_dict,
+        )
+        return evaluation_response
+    
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="An unexpected error occurred during audio evaluation."
+        )
+
+@router_evaluation.post("/feedback/by_resource", response_model=FeedbackResponse)
+async def feedback_by_resource(
+    resource_type: ResourceType = Form(...),
+    resource_id: str = Form(...),
+    user_analysis: str = Form(...),
+    use_llm: bool = Form(False),
+    authorization: Optional[str] = Header(None),
+    reference_service: ReferenceService = Depends(get_reference_service),
+    feedback_service: FeedbackService = Depends(get_feedback_service),
+):      
+    user_dict = _parse_analysis(user_analysis, "user_analysis")
+    reference_dict = await reference_service.get_reference_analysis(
+        resource_type.value,
+        resource_id,
+        authorization
+    )
+        
+    try:
+        # Call the audio feedback function
+        feedback_response = await feedback_service.generate_feedback(
+            user_dict,
+            reference_dict,
+            use_llm
+        )
+        return feedback_response
+    
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"{str(e)}"
+        )
+
+@router_evaluation.post("/feedback/local/by_resource", response_model=FeedbackResponse)
+async def feedback_local_by_resource(
+    resource_type: ResourceType = Form(...),
+    resource_id: str = Form(...),
+    user_analysis: str = Form(...),
+    authorization: Optional[str] = Header(None),
+    reference_service: ReferenceService = Depends(get_reference_service),
+    local_feedback_service: LocalFeedbackService = Depends(get_local_feedback_service),
+):      
+    user_dict = _parse_analysis(user_analysis, "user_analysis")
+    reference_dict = await reference_service.get_reference_analysis(
+        resource_type.value,
+        resource_id,
+        authorization
+    )
+        
+    try:
+        # Call the audio feedback function
+        feedback_response = await local_feedback_service.generate_feedback(
+            user_dict,
+            reference_dict
+        )
+        return feedback_response
+    
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"{str(e)}"
         )
-        
\ No newline at end of file
+
+@router_evaluation.post("/full")
+async def full_evaluation(
+    audio_file: UploadFile,
+    reference_analysis: Optional[str] = Form(None),
+    resource_type: Optional[ResourceType] = Form(None),
+    resource_id: Optional[str] = Form(None),
+    feedback_mode: FeedbackMode = Form(FeedbackMode.template),
+    authorization: Optional[str] = Header(None),
+    reference_service: ReferenceService = Depends(get_reference_service),
+    full_evaluation_service: FullEvaluationService = Depends(get_full_evaluation_service),
+):
+    # Make sure an audio file was passed
+    if not audio_file.content_type.startswith("audio/"):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid file type. Please upload an audio file."
+        )
+
+    if reference_analysis is not None:
+        reference_dict = _parse_analysis(reference_analysis, "reference_analysis")
+    elif resource_type is not None and resource_id is not None:
+        reference_dict = await reference_service.get_reference_analysis(
+            resource_type.value,
+            resource_id,
+            authorization
+        )
+    else:
+        raise HTTPException(
+            status_code=400,
+            detail="Either reference_analysis or resource_type and resource_id are required."
+        )
+
+    # The upload is closed once the response starts, read it beforehand
+    content = await audio_file.read()
+
+    return StreamingResponse(
+        full_evaluation_service.evaluate(
+            content,
+            audio_file.filename,
+            reference_dict,
+            feedback_mode,
+            resource_type.value if resource_type is not None else None
+        ),
+        media_type="application/x-ndjson"
+    )
@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends
+
+from schemas.health_schema import ModelsHealthResponse, TranscriptionQueueResponse, CacheStatsResponse, ArliClientResponse, LocalLLMResponse, PraatWorkersResponse
+from core.registry.model_registry import ModelRegistry, get_model_registry, get_process_memory
+from core.utils.executors import get_praat_executor_status
+
+router_health = APIRouter(
+    prefix="/health",
+    tags=["Health"],
+)
+
+@router_health.get("/")
+async def root():
+    return {"message": "Welcome to the Health API prefix!"}
+
+@router_health.get("/models", response_model=ModelsHealthResponse)
+async def models_health(
+    registry: ModelRegistry = Depends(get_model_registry),
+):
+    process_memory = get_process_memory()
+    return ModelsHealthResponse(
+        process_memory_mb=round(process_memory / (1024 * 1024), 1) if process_memory is not None else None,
+        models=registry.status()
+    )
+
+@router_health.get("/transcription", response_model=TranscriptionQueueResponse)
+async def transcription_health(
+    registry: ModelRegistry = Depends(get_model_registry),
+):
+    return TranscriptionQueueResponse(**registry.transcription_metrics())
+
+@router_health.get("/analysis_cache", response_model=CacheStatsResponse)
+async def analysis_cache_health(
+    registry: ModelRegistry = Depends(get_model_registry),
+):
+    return CacheStatsResponse(**registry.analysis_cache.stats())
+
+@router_health.get("/feedback_cache", response_model=CacheStatsResponse)
+async def feedback_cache_health(
+    registry: ModelRegistry = Depends(get_model_registry),
+):
+    return CacheStatsResponse(**registry.feedback_cache.stats())
+
+@router_health.get("/arli", response_model=ArliClientResponse)
+async def arli_health(
+    registry: ModelRegistry = Depends(get_model_registry),
+):
+    return ArliClientResponse(**registry.arli_client.metrics())
+
+@router_health.get("/local_llm", response_model=LocalLLMResponse)
+async def local_llm_health(
+    registry: ModelRegistry = Depends(get_model_registry),
+):
+    return LocalLLMResponse(**registry.local_llm_metrics())
+
+@router_health.get("/praat_workers", response_model=PraatWorkersResponse)
+async def praat_workers_health():
+    return PraatWorkersResponse(**get_praat_executor_status())
@@ -1,5 +1,17 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
+from enum import Enum
+
+class ResourceType(str, Enum):
+    word = "word"
+    sentence = "sentence"
+    text = "text"
+
+class FeedbackMode(str, Enum):
+    template = "template"
+    arli = "arli"
+    local = "local"
+    none = "none"
 
 class AnalysisResponse(BaseModel):
     number_of_syllables: Optional[int] = Field(
@@ -42,6 +54,11 @@ class AnalysisResponse(BaseModel):
         description="Transcription generated from speech.",
         example=5
     )
+    trimmed_duration: Optional[float] = Field(
+        None,
+        description="Seconds of leading and trailing silence removed before the analysis.",
+        example=1.2
+    )
 
 class EvaluationResponse(BaseModel):
     total_score: Optional[int] = Field(
@@ -91,4 +108,90 @@ class FeedbackResponse(BaseModel):
         description="Tips to improve articulation during speech.",
         example=["Focus on words with more syllables.", "Don't skip letters."]
     )
-    
\ No newline at end of file
+
+class EvaluationStageEvent(BaseModel):
+    stage: str = Field(
+        ...,
+        description="Stage of the full evaluation: analysis, evaluation, classification, feedback or done.",
+        example="evaluation"
+    )
+    result: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Result of the stage, with the same schema as its standalone endpoint.",
+        example={"total_score": 88, "clarity_score": 10}
+    )
+    error: Optional[str] = Field(
+        None,
+        description="Error of the stage, if it failed.",
+        example="Audio evaluation failed."
+    )
+
+class AnalysisStreamEvent(BaseModel):
+    event: str = Field(
+        ...,
+        description="Kind of event: segment, analysis or error.",
+        example="segment"
+    )
+    index: Optional[int] = Field(
+        None,
+        description="Position of the transcribed span of speech in the recording.",
+        example=0
+    )
+    start: Optional[float] = Field(
+        None,
+        description="Second of the recording where the span of speech starts.",
+        example=0.4
+    )
+    end: Optional[float] = Field(
+        None,
+        description="Second of the recording where the span of speech ends.",
+        example=3.2
+    )
+    transcription: Optional[str] = Field(
+        None,
+        description="Transcription of the span of speech.",
+        example="life is not an exact science"
+    )
+    result: Optional[AnalysisResponse] = Field(
+        None,
+        description="Analysis of the whole recording, sent once the upload ends."
+    )
+    error: Optional[str] = Field(
+        None,
+        description="Error that ended the analysis.",
+        example="Audio analysis failed."
+    )
+
+class BatchEvaluationRequest(BaseModel):
+    user_analyses: List[Dict[str, Any]] = Field(
+        ...,
+        description="Analyses of the user's attempts, with the same schema as /analyze_audio.",
+        example=[{"number_of_syllables": 30, "number_of_pauses": 5, "speech_rate": 5,
+                  "articulation_rate": 5, "speaking_duration": 5, "total_duration": 6,
+                  "ratio": 0.8, "transcription": "hello world"}]
+    )
+    reference_analyses: List[Dict[str, Any]] = Field(
+        ...,
+        description="One reference analysis per attempt, or a single one shared by all attempts.",
+        example=[{"number_of_syllables": 30, "number_of_pauses": 4, "speech_rate": 5,
+                  "articulation_rate": 5, "speaking_duration": 5, "total_duration": 6,
+                  "ratio": 0.8, "transcription": "hello world"}]
+    )
+    include_classification: bool = Field(
+        True,
+        description="Whether to classify each attempt.",
+        example=True
+    )
+
+class BatchEvaluationItem(EvaluationResponse):
+    label: Optional[str] = Field(
+        None,
+        description="Classification of the attempt's speech performance.",
+        example="Advanced"
+    )
+
+class BatchEvaluationResponse(BaseModel):
+    results: List[BatchEvaluationItem] = Field(
+        ...,
+        description="Evaluation of each attempt, in the same order as the request.",
+    )
@@ -0,0 +1,275 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+
+class ModelStatus(BaseModel):
+    name: str = Field(
+        ...,
+        description="Name of the model in the registry.",
+        example="transcriber"
+    )
+    loaded: bool = Field(
+        False,
+        description="Whether the model has been loaded in this worker.",
+        example=True
+    )
+    ready: bool = Field(
+        False,
+        description="Whether the model loaded correctly and can serve requests.",
+        example=True
+    )
+    load_time_seconds: Optional[float] = Field(
+        None,
+        description="Seconds it took to load the model.",
+        example=4.2
+    )
+    memory_mb: Optional[float] = Field(
+        None,
+        description="Resident memory added to the worker by loading the model, in MB.",
+        example=950.3
+    )
+    error: Optional[str] = Field(
+        None,
+        description="Error raised while loading the model, if any.",
+        example=None
+    )
+
+class ModelsHealthResponse(BaseModel):
+    process_memory_mb: Optional[float] = Field(
+        None,
+        description="Resident memory of the worker process in MB.",
+        example=2100.5
+    )
+    models: List[ModelStatus] = Field(
+        default_factory=list,
+        description="Load status of each model in the registry."
+    )
+
+class TranscriptionQueueResponse(BaseModel):
+    loaded: bool = Field(
+        False,
+        description="Whether the transcription model and its batcher have been loaded in this worker.",
+        example=True
+    )
+    queue_depth: int = Field(
+        0,
+        description="Transcription jobs waiting for a batch.",
+        example=3
+    )
+    max_batch_size: int = Field(
+        0,
+        description="Maximum number of clips decoded in one batch.",
+        example=8
+    )
+    batch_window_ms: float = Field(
+        0,
+        description="Milliseconds the scheduler waits to fill a batch.",
+        example=25
+    )
+    jobs_processed: int = Field(
+        0,
+        description="Clips transcribed since the worker started.",
+        example=120
+    )
+    batches_processed: int = Field(
+        0,
+        description="Batches decoded since the worker started.",
+        example=40
+    )
+    last_batch_size: int = Field(
+        0,
+        description="Number of clips in the last batch.",
+        example=4
+    )
+    largest_batch_size: int = Field(
+        0,
+        description="Largest batch decoded since the worker started.",
+        example=8
+    )
+    average_batch_size: float = Field(
+        0,
+        description="Average number of clips per batch.",
+        example=3.0
+    )
+    last_wait_ms: float = Field(
+        0,
+        description="Longest time a clip of the last batch waited in the queue, in milliseconds.",
+        example=24.5
+    )
+    average_wait_ms: float = Field(
+        0,
+        description="Average time a clip waits in the queue, in milliseconds.",
+        example=12.1
+    )
+
+class CacheStatsResponse(BaseModel):
+    hits: int = Field(
+        0,
+        description="Lookups answered by any tier of the cache.",
+        example=42
+    )
+    misses: int = Field(
+        0,
+        description="Lookups not found in any tier of the cache.",
+        example=10
+    )
+    memory_hits: int = Field(
+        0,
+        description="Lookups answered by the in-memory tier.",
+        example=40
+    )
+    memory_entries: int = Field(
+        0,
+        description="Entries held in the in-memory tier.",
+        example=50
+    )
+    disk_enabled: bool = Field(
+        False,
+        description="Whether the on-disk tier is configured.",
+        example=True
+    )
+    disk_hits: int = Field(
+        0,
+        description="Lookups answered by the on-disk tier.",
+        example=2
+    )
+    disk_entries: int = Field(
+        0,
+        description="Entries held in the on-disk tier.",
+        example=300
+    )
+
+class ArliClientResponse(BaseModel):
+    requests: int = Field(
+        0,
+        description="Completion requests made to the ARLI API.",
+        example=120
+    )
+    attempts: int = Field(
+        0,
+        description="HTTP requests sent, including retries and hedged requests.",
+        example=131
+    )
+    retries: int = Field(
+        0,
+        description="Attempts retried after an error or timeout.",
+        example=3
+    )
+    failures: int = Field(
+        0,
+        description="Requests that failed every attempt.",
+        example=0
+    )
+    hedged_requests: int = Field(
+        0,
+        description="Requests slow enough to send a second identical request.",
+        example=8
+    )
+    hedge_wins: int = Field(
+        0,
+        description="Hedged requests answered first by the second request.",
+        example=5
+    )
+    p50_latency_ms: Optional[float] = Field(
+        None,
+        description="Median latency of recent successful attempts, in milliseconds.",
+        example=2400.0
+    )
+    p95_latency_ms: Optional[float] = Field(
+        None,
+        description="95th percentile latency of recent successful attempts, in milliseconds.",
+        example=6100.0
+    )
+    hedge_after_ms: Optional[float] = Field(
+        None,
+        description="Milliseconds after which a second request is sent, null while hedging is off.",
+        example=6100.0
+    )
+
+class LocalLLMResponse(BaseModel):
+    loaded: bool = Field(
+        False,
+        description="Whether the local model has been loaded in this worker.",
+        example=True
+    )
+    backend: Optional[str] = Field(
+        None,
+        description="Where the local model runs: in_process or llama_server.",
+        example="llama_server"
+    )
+    slots: int = Field(
+        0,
+        description="Prompts decoded at the same time.",
+        example=4
+    )
+    queue_depth: int = Field(
+        0,
+        description="Prompts waiting for a free slot.",
+        example=2
+    )
+    active: int = Field(
+        0,
+        description="Prompts being decoded.",
+        example=4
+    )
+    requests_completed: int = Field(
+        0,
+        description="Prompts decoded since the worker started.",
+        example=57
+    )
+    requests_failed: int = Field(
+        0,
+        description="Prompts that failed since the worker started.",
+        example=0
+    )
+    tokens_generated: int = Field(
+        0,
+        description="Tokens generated since the worker started.",
+        example=30210
+    )
+    tokens_per_second: float = Field(
+        0,
+        description="Average tokens generated per second by each prompt.",
+        example=18.4
+    )
+    last_tokens_per_second: float = Field(
+        0,
+        description="Tokens per second of the last prompt.",
+        example=17.9
+    )
+    last_ttft_ms: Optional[float] = Field(
+        None,
+        description="Time to first token of the last prompt, including queue time, in milliseconds.",
+        example=850.0
+    )
+    average_ttft_ms: Optional[float] = Field(
+        None,
+        description="Average time to first token of recent prompts, including queue time, in milliseconds.",
+        example=910.5
+    )
+
+class PraatWorkersResponse(BaseModel):
+    started: bool = Field(
+        False,
+        description="Whether the worker processes have been started in this API worker.",
+        example=True
+    )
+    workers: int = Field(
+        0,
+        description="Praat worker processes in the pool.",
+        example=2
+    )
+    alive: int = Field(
+        0,
+        description="Worker processes currently running, a restarting worker isn't counted.",
+        example=2
+    )
+    queued: int = Field(
+        0,
+        description="Analyses waiting for a free worker.",
+        example=0
+    )
+    restarts: int = Field(
+        0,
+        description="Workers restarted after crashing or timing out since the API started.",
+        example=1
+    )
@@ -1,114 +1,263 @@
-from typing import Dict, Any
-from fastapi import UploadFile, HTTPException
-import tempfile
-import os
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+from fastapi import UploadFile, HTTPException, Depends
+from functools import partial
+import contextvars
+import hashlib
+import asyncio
+import logging
 
-from schemas.evaluation_schema import AnalysisResponse
+from config import VAD_METHOD, VAD_MIN_SILENCE_MS, VAD_PADDING_MS, WORD_MODE_MAX_SECONDS
+from config import STREAM_MAX_SECONDS
+from schemas.evaluation_schema import AnalysisResponse, AnalysisStreamEvent
 from core.utils import audio_tools as atools
+from core.utils.audio_tools import AudioBuffer
 from core.analysis.analyzer import SpeechAnalyzer
 from core.transcription.transcriber import SpeechTranscriber
+from core.transcription.batcher import TranscriptionBatcher
+from core.registry.model_registry import ModelRegistry, get_model_registry
+from core.utils.executors import get_inference_executor
+from core.utils.cache import TieredCache
+from core.utils.telemetry import stage_timer
+
+logger = logging.getLogger(__name__)
+
+# Silence kept before and after the speech given to Praat, longer than the
+# 0.3 seconds the script needs to count a pause
+PRAAT_EDGE_PAUSE_MS = 400
+# Part of the analysis cache key, increase it when detect_speech, trim_silence
+# or join_speech change the audio they return
+TRIM_VERSION = 2
+
 class AnalysisService:
     """Service to analyze an audio based on a reference audio."""
-    def __init__(self):
-        self.analyzer = SpeechAnalyzer()
-        self.transcriber = SpeechTranscriber()
-        self.tmp_audio_filepath = None
-        self.tmp_base_name = None
-        self.base_dir = None
-        self.converted_filepath = None
-        self.converted_base_name = None
-        self.normalized_filepath = None
-        self.normalized_filename = None
-
-    async def _create_temporary_audio(self, audio_file: UploadFile) -> None:
-        """Create a temporary .wav file in disk from the uploaded file.
+    def __init__(self, analyzer: Optional[SpeechAnalyzer] = None,
+                 transcriber: Optional[SpeechTranscriber] = None,
+                 batcher: Optional[TranscriptionBatcher] = None,
+                 cache: Optional[TieredCache] = None,
+                 vad_method: str = VAD_METHOD):
+        self.analyzer = analyzer if analyzer is not None else SpeechAnalyzer()
+        self.transcriber = transcriber if transcriber is not None else SpeechTranscriber()
+        # Transcriptions go through the batcher when given
+        self.batcher = batcher
+        # Analyses of identical audio are reused when given
+        self.cache = cache
+        # Silence detection before analysis, off to analyze the whole audio
+        self.vad_method = vad_method
+
+    async def _decode_audio(self, content: bytes, filename: str) -> AudioBuffer:
+        """Decode the uploaded file into mono PCM samples held in memory.
 
         Args:
-            audio_file (UploadFile): A file uploaded in a request.
+            content (bytes): Content of the uploaded file.
+            filename (str): Name of the uploaded file, with extension.
 
         Raises:
             HTTPException: The audio file is empty.
-            HTTPException: The file could not be created.
+            HTTPException: The file could not be decoded.
+
+        Returns:
+            AudioBuffer: Decoded audio.
         """
+        if not content:
+            raise HTTPException(
+                status_code=400,
+                detail="Audio file is empty."
+            )
+        
         try:
-            content = await audio_file.read()
-            if not content:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Audio file is empty."
-                )
-            
-            # Create temporary audio file in memory with original extension
-            audio_extension = audio_file.filename.split('.')[-1]
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f".{audio_extension}") as tmp_file:
-                tmp_file.write(content)
-                self.tmp_audio_filepath = tmp_file.name
-                self.tmp_base_name = os.path.basename(tmp_file.name)
-                self.base_dir = os.path.dirname(tmp_file.name)
-                print(f"Temporary audio file created in memory: {self.tmp_audio_filepath}")
+            # Uploads such as browser blobs may have no extension
+            audio_extension = filename.rsplit('.', 1)[-1] if filename and '.' in filename else None
+            with stage_timer("decode"):
+                audio = await asyncio.to_thread(atools.decode_audio, content, audio_extension)
+            logger.debug("Audio file decoded in memory: %.2fs at %s Hz", audio.duration, audio.sample_rate)
+            return audio
                 
         except Exception as e:
-            print(f"Error creating temporary audio file in memory: {e}")
-            raise HTTPException(status_code=500, detail="Internal server error while handling audio file.")    
-    
-    async def _remove_temporary_audio(self) -> None:
-        """Remove the temporary audio file from disk.
+            logger.error(f"Error decoding audio file in memory: {e}")
+            raise HTTPException(status_code=500, detail="Internal server error while handling audio file.")
+        
+    def _normalize_audio(self, audio: AudioBuffer, frame_rate: int = 44100) -> AudioBuffer:
+        """Normalize the decoded audio to the given frame rate.
+
+        Args:
+            audio (AudioBuffer): Decoded audio.
+            frame_rate (int): Target frame rate in Hz, 44100 by default.
+
+        Returns:
+            AudioBuffer: Normalized audio.
         """
-        if self.tmp_audio_filepath and os.path.exists(self.tmp_audio_filepath):
-            try:
-                os.remove(self.tmp_audio_filepath)
-                print(f"Temporary audio file removed from memory: {self.tmp_audio_filepath}")
-                
-            except Exception as e:
-                print(f"Error removing temporary audio file from memory: {e}")
-                
-        if self.converted_filepath and os.path.exists(self.converted_filepath):
-            try:
-                os.remove(self.converted_filepath)
-                print(f"Converted WAV file removed from memory: {self.converted_filepath}")
-                
-            except Exception as e:
-                print(f"Error removing converted WAV file from memory: {e}")
-    
-    async def _convert_to_wav(self) -> None:
-        """Convert an audio file to wav.
+        with stage_timer("normalize"):
+            normalized_audio = atools.resample_audio(audio, frame_rate=frame_rate)
+        return normalized_audio
+
+    def _is_word_mode(self, audio: AudioBuffer, resource_type: Optional[str]) -> bool:
+        """Whether to analyze the audio as a single word: always for word
+        resources, never for sentences or texts, and otherwise when the audio
+        is at most WORD_MODE_MAX_SECONDS long, unless it is 0.
+
+        Args:
+            audio (AudioBuffer): Decoded audio.
+            resource_type (Optional[str]): word, sentence, text or None if unknown.
+
+        Returns:
+            bool: True for word mode.
         """
-        try:
-            self.converted_filepath = atools.convert_audio_extension(
-                self.tmp_base_name,
-                self.base_dir,
-                extension="wav"
+        if resource_type is not None:
+            return resource_type == "word"
+        return WORD_MODE_MAX_SECONDS > 0 and audio.duration <= WORD_MODE_MAX_SECONDS
+
+    def _split_speech(self, audio: AudioBuffer) -> Tuple[AudioBuffer, AudioBuffer, float]:
+        """Remove silence before analysis. Praat gets the audio without its
+        leading and trailing silence, so pauses between words are still
+        counted, and Whisper only the spans of speech, so it neither spends
+        time on silence nor makes up words in it.
+
+        Args:
+            audio (AudioBuffer): Normalized audio.
+
+        Returns:
+            Tuple[AudioBuffer, AudioBuffer, float]: Audio for Praat, audio for
+            Whisper and seconds of leading and trailing silence removed. The
+            whole audio for both if silence detection is off or finds no speech.
+        """
+        if self.vad_method == "off":
+            return audio, audio, 0.0
+
+        with stage_timer("vad"):
+            spans = atools.detect_speech(
+                audio,
+                method=self.vad_method,
+                min_silence_ms=VAD_MIN_SILENCE_MS,
+                padding_ms=VAD_PADDING_MS
             )
-            self.converted_base_name = os.path.basename(self.converted_filepath)
-            print(f"Converted WAV file created: {self.converted_filepath}")
+            if not spans:
+                logger.debug("No speech detected, analyzing the whole audio")
+                return audio, audio, 0.0
             
-        except Exception as e:
-            print(f"Error converting audio file to WAV: {e}")
+            # The Praat script rejects audio without any pause, keep one at each edge
+            trimmed_audio = atools.trim_silence(audio, spans, max(0, PRAAT_EDGE_PAUSE_MS - VAD_PADDING_MS))
+            speech_audio = atools.join_speech(audio, spans)
         
-    async def _normalize_audio(self) -> None:
-        """Normalize the temporary audio file to 44100 Hz and 16 bits resolution.
+        trimmed_duration = round(audio.duration - trimmed_audio.duration, 2)
+        logger.debug(
+            "Speech detected in %s spans, %.2fs trimmed and %.2fs left for Whisper",
+            len(spans), trimmed_duration, speech_audio.duration
+        )
+        return trimmed_audio, speech_audio, trimmed_duration
+
+    def _get_trim_settings(self) -> str:
+        """Get every setting that changes the audio given to Praat and Whisper."""
+        if self.vad_method == "off":
+            return "off"
+        return (
+            f"{self.vad_method}:{VAD_MIN_SILENCE_MS}:{VAD_PADDING_MS}:"
+            f"{PRAAT_EDGE_PAUSE_MS}:{TRIM_VERSION}"
+        )
+
+    def _get_cache_key(self, audio: AudioBuffer, word_mode: bool = False,
+                       expected_text: Optional[str] = None) -> str:
+        """Key an analysis by the normalized audio content, the silence
+        detection settings and the versions of the analyzer and transcription
+        model that produced it. Word analyses also depend on the expected text.
+
+        Args:
+            audio (AudioBuffer): Normalized audio.
+            word_mode (bool): Whether the audio is analyzed as a single word.
+            expected_text (Optional[str]): Expected text given to Whisper in word mode.
+
+        Returns:
+            str: Cache key.
         """
-        try:
-            self.normalized_filename = atools.normalize_audio(
-                audio_filename=self.converted_base_name,
-                audio_dir=self.base_dir,
-                frame_rate=44100,
-                resolution=2,
-                overwrite=True
-            )
-            self.normalized_filepath = self.base_dir
-            print(f"Audio file normalized successfully!")
+        analyzer_version = self.analyzer.version
+        if word_mode:
+            analyzer_version = f"{self.analyzer.word_version}:{expected_text or ''}"
+        key = f"{audio.content_hash()}:{self._get_trim_settings()}:{analyzer_version}:{self.transcriber.version}"
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    async def _transcribe(self, audio: AudioBuffer, word_mode: bool = False,
+                          expected_text: Optional[str] = None) -> str:
+        """Transcribe audio on the inference thread, batched with other
+        requests when a batcher is available. Words skip the batcher, they are
+        decoded on their own with the expected text and a few tokens.
+
+        Args:
+            audio (AudioBuffer): Audio to transcribe.
+            word_mode (bool): Whether the audio is a single word.
+            expected_text (Optional[str]): Text the user was asked to say.
+
+        Returns:
+            str: Clean transcription of the audio.
+        """
+        with stage_timer("whisper"):
+            if word_mode:
+                function = partial(self.transcriber.get_word_transcription_from_buffer, audio, expected_text)
+            elif self.batcher is not None:
+                return await self.batcher.transcribe(audio)
+            else:
+                function = partial(self.transcriber.get_transcription_from_buffer, audio)
             
-        except Exception as e:
-            print(f"Error normalizing audio file: {e}")
+            # Run in a copy of the context so its logs keep the request id
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                get_inference_executor(),
+                contextvars.copy_context().run,
+                function
+            )
+
+    async def _run_praat(self, audio: AudioBuffer, word_mode: bool = False) -> dict:
+        """Get the Praat analysis of audio without blocking the event loop.
+
+        Args:
+            audio (AudioBuffer): Audio to analyze.
+            word_mode (bool): Whether to run the reduced script for a single word.
+
+        Returns:
+            dict: Overview of audio properties.
+        """
+        with stage_timer("praat"):
+            if word_mode:
+                return await asyncio.to_thread(self.analyzer.get_word_overview_from_buffer, audio)
+            return await asyncio.to_thread(self.analyzer.get_overview_from_buffer, audio)
+
+    async def analyze_audio(self, audio_file: UploadFile, resource_type: Optional[str] = None,
+                            expected_text: Optional[str] = None) -> AnalysisResponse:
+        """Get the analysis of an uploaded audio file. See analyze_content.
 
-    async def analyze_audio(self, audio_file: UploadFile) -> AnalysisResponse:
+        Args:
+            audio_file (UploadFile): File uploaded from request.
+            resource_type (Optional[str]): word, sentence, text or None if unknown.
+            expected_text (Optional[str]): Text the user was asked to say.
+
+        Returns:
+            AnalysisResponse: Schema for audio analysis.
+        """
+        content = await audio_file.read()
+        return await self.analyze_content(content, audio_file.filename, resource_type, expected_text)
+
+    async def analyze_content(self, content: bytes, filename: str,
+                              resource_type: Optional[str] = None,
+                              expected_text: Optional[str] = None) -> AnalysisResponse:
         """Get the analysis of an audio file, including number of syllables,
-        number of pauses, speech rate, articulation rate, speaking duration, 
+        number of pauses, speech rate, articulation rate, speaking duration,
         total duration, speaking to pause ratio and transcription.
 
+        The upload is decoded once and the same samples are passed to Praat
+        and Whisper, without writing any file to disk. When silence detection
+        is on, leading and trailing silence is removed first and Whisper only
+        gets the spans of speech, see _split_speech. Praat runs in a process
+        pool and Whisper in its inference thread at the same time, so the event
+        loop is never blocked. Audio that was already analyzed is read from the
+        cache and skips both.
+
+        Single words, see _is_word_mode, take a faster path: the audio is
+        normalized to 16000 Hz, Praat runs the reduced word script and Whisper
+        decodes a few tokens with the expected text as context.
+
         Args:
-            audio_file (UploadFile): File uploaded from request.
+            content (bytes): Content of the uploaded file.
+            filename (str): Name of the uploaded file, with extension.
+            resource_type (Optional[str]): word, sentence, text or None if unknown.
+            expected_text (Optional[str]): Text the user was asked to say.
 
         Raises:
             HTTPException: Error normalizing audio.
@@ -117,23 +266,32 @@ class AnalysisService:
             AnalysisResponse: Schema for audio analysis.
         """
         try:
-            await self._create_temporary_audio(audio_file)
-            await self._convert_to_wav()
-            await self._normalize_audio()
+            audio = await self._decode_audio(content, filename)
+            word_mode = self._is_word_mode(audio, resource_type)
+            audio = await asyncio.to_thread(
+                self._normalize_audio, audio, 16000 if word_mode else 44100
+            )
             
-            # Get audio analysis
-            audio_analysis = self.analyzer.get_overview(
-                self.normalized_filename, 
-                self.normalized_filepath
+            cache_key = None
+            if self.cache is not None:
+                cache_key = await asyncio.to_thread(self._get_cache_key, audio, word_mode, expected_text)
+                cached_analysis = await asyncio.to_thread(self.cache.get, cache_key)
+                if cached_analysis is not None:
+                    logger.debug("Getting audio analysis from cache success!")
+                    return AnalysisResponse(**cached_analysis)
+            
+            praat_audio, whisper_audio, trimmed_duration = await asyncio.to_thread(
+                self._split_speech, audio
             )
             
-            # Get audio transcription
-            audio_analysis["transcription"] = self.transcriber.get_transcription(
-                self.normalized_filename,
-                self.normalized_filepath
+            # Get audio analysis and transcription concurrently
+            audio_analysis, transcription = await asyncio.gather(
+                self._run_praat(praat_audio, word_mode),
+                self._transcribe(whisper_audio, word_mode, expected_text)
             )
+            audio_analysis["transcription"] = transcription
             
-            return AnalysisResponse(
+            analysis_response = AnalysisResponse(
                 number_of_syllables=audio_analysis["number_of_syllables"],
                 number_of_pauses=audio_analysis["number_of_pauses"],
                 speech_rate=audio_analysis["speech_rate"],
@@ -141,15 +299,132 @@ class AnalysisService:
                 speaking_duration=audio_analysis["speaking_duration"],
                 total_duration=audio_analysis["total_duration"],
                 ratio=audio_analysis["ratio"],
-                transcription=audio_analysis["transcription"]
+                transcription=audio_analysis["transcription"],
+                trimmed_duration=trimmed_duration
             )
+            
+            # An empty transcription may be a transcription error, don't keep it
+            if cache_key is not None and transcription:
+                await asyncio.to_thread(self.cache.set, cache_key, analysis_response.model_dump())
+            
+            return analysis_response
 
         except Exception as e:
-            print(f"Error analyzing file, check analysis service: {e}")
+            logger.error(f"Error analyzing file, check analysis service: {e}")
             raise HTTPException(status_code=500, detail="Audio analysis failed.")
-        
+
+    async def _transcribe_segment(self, index: int, audio: AudioBuffer, start: float,
+                                  events: asyncio.Queue) -> str:
+        """Transcribe a span of a live recording and report it as an event."""
+        transcription = await self._transcribe(audio)
+        await events.put(AnalysisStreamEvent(
+            event="segment",
+            index=index,
+            start=round(start, 2),
+            end=round(start + audio.duration, 2),
+            transcription=transcription
+        ))
+        return transcription
+
+    async def _receive_stream(self, chunks: AsyncIterator[bytes], sample_rate: int,
+                              events: asyncio.Queue) -> None:
+        """Read a live recording, transcribe each span of speech as soon as it
+        is complete and finally analyze the whole recording. Every result is
+        put in events, None marks the end."""
+        segmenter = atools.SpeechSegmenter(
+            sample_rate,
+            min_silence_ms=VAD_MIN_SILENCE_MS,
+            padding_ms=VAD_PADDING_MS
+        )
+        segments: List[asyncio.Task] = []
+
+        def start_segments(spans: List[Tuple[int, int]]) -> None:
+            samples = segmenter.audio.samples
+            for start, end in spans:
+                segment = AudioBuffer(samples=samples[start:end], sample_rate=sample_rate)
+                logger.debug("Stream segment %s ready: %.2fs to %.2fs", len(segments),
+                             start / sample_rate, end / sample_rate)
+                segments.append(asyncio.create_task(
+                    self._transcribe_segment(len(segments), segment, start / sample_rate, events)
+                ))
+
+        try:
+            async for chunk in chunks:
+                with stage_timer("decode"):
+                    samples = atools.decode_pcm16(chunk)
+                if segmenter.duration + len(samples) / sample_rate > STREAM_MAX_SECONDS:
+                    await events.put(AnalysisStreamEvent(
+                        event="error",
+                        error=f"Recording is longer than {STREAM_MAX_SECONDS:g} seconds."
+                    ))
+                    return
+                with stage_timer("vad"):
+                    spans = segmenter.feed(samples)
+                start_segments(spans)
+            start_segments(segmenter.flush())
+
+            if segmenter.duration == 0:
+                await events.put(AnalysisStreamEvent(event="error", error="Audio stream is empty."))
+                return
+
+            # Praat needs the whole recording, it runs while the last segments finish
+            audio = await asyncio.to_thread(self._normalize_audio, segmenter.audio)
+            praat_audio, whisper_audio, trimmed_duration = await asyncio.to_thread(
+                self._split_speech, audio
+            )
+            praat_task = asyncio.create_task(self._run_praat(praat_audio))
+            transcriptions = await asyncio.gather(*segments)
+            if not segments:
+                # No span found while streaming, transcribe the recording at once
+                transcriptions = [await self._transcribe(whisper_audio)]
+            audio_analysis = await praat_task
+            
+            await events.put(AnalysisStreamEvent(
+                event="analysis",
+                result=AnalysisResponse(
+                    **audio_analysis,
+                    transcription=" ".join(text for text in transcriptions if text),
+                    trimmed_duration=trimmed_duration
+                )
+            ))
+        except Exception as e:
+            logger.error(f"Error analyzing audio stream, check analysis service: {e}")
+            await events.put(AnalysisStreamEvent(event="error", error="Audio analysis failed."))
+        finally:
+            for segment in segments:
+                segment.cancel()
+            await events.put(None)
+
+    async def analyze_stream(self, chunks: AsyncIterator[bytes],
+                             sample_rate: int) -> AsyncIterator[AnalysisStreamEvent]:
+        """Analyze a recording while it is being uploaded. The audio is split
+        into spans of speech as it arrives and each span is transcribed as soon
+        as a pause follows it, so when the upload ends only Praat and the last
+        span are left. The final analysis has the same schema as analyze_content.
+
+        Args:
+            chunks (AsyncIterator[bytes]): Chunks of 16 bit little-endian mono PCM.
+            sample_rate (int): Sample rate of the PCM in Hz.
+
+        Yields:
+            AnalysisStreamEvent: A segment event for each transcribed span, in
+            the order they finish, then an analysis or error event.
+        """
+        events: asyncio.Queue = asyncio.Queue()
+        receiver = asyncio.create_task(self._receive_stream(chunks, sample_rate, events))
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
         finally:
-            await self._remove_temporary_audio()
+            receiver.cancel()
 
-def get_analysis_service():
-    return AnalysisService()
+def get_analysis_service(registry: ModelRegistry = Depends(get_model_registry)):
+    return AnalysisService(
+        analyzer=registry.analyzer,
+        transcriber=registry.transcriber,
+        batcher=registry.transcription_batcher,
+        cache=registry.analysis_cache
+    )
@@ -0,0 +1,49 @@
+from fastapi import HTTPException, Depends
+from typing import Optional
+import asyncio
+import logging
+
+from schemas.evaluation_schema import BatchEvaluationRequest, BatchEvaluationResponse, BatchEvaluationItem
+from core.classification.classifier import SpeechClassifier
+from core.evaluation.batch_evaluator import BatchSpeechEvaluator
+from core.registry.model_registry import ModelRegistry, get_model_registry
+
+logger = logging.getLogger(__name__)
+
+class BatchEvaluationService():
+    """Service to evaluate and classify many attempts in a single request."""
+    def __init__(self, classifier: Optional[SpeechClassifier] = None):
+        self.evaluator = BatchSpeechEvaluator(classifier)
+
+    async def evaluate_batch(self, request: BatchEvaluationRequest) -> BatchEvaluationResponse:
+        """Generate the scores and classification of every attempt.
+
+        Args:
+            request (BatchEvaluationRequest): User analyses and their references.
+
+        Raises:
+            HTTPException: The analyses are invalid or the evaluation failed.
+
+        Returns:
+            BatchEvaluationResponse: Schema for batch evaluation.
+        """
+        try:
+            # The matrices are computed outside of the event loop
+            results = await asyncio.to_thread(
+                self.evaluator.evaluate,
+                request.user_analyses,
+                request.reference_analyses,
+                request.include_classification
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"Error evaluating batch, check batch evaluation service: {e}")
+            raise HTTPException(status_code=500, detail="Batch evaluation failed.")
+
+        return BatchEvaluationResponse(
+            results=[BatchEvaluationItem(**result) for result in results]
+        )
+
+def get_batch_evaluation_service(registry: ModelRegistry = Depends(get_model_registry)):
+    return BatchEvaluationService(classifier=registry.classifier)
@@ -1,13 +1,17 @@
-from fastapi import HTTPException
-from typing import Dict, Any
+from fastapi import HTTPException, Depends
+from typing import Dict, Any, Optional
+import logging
 
 from schemas.classification_schema import ClassificationResponse
 from core.classification.classifier import SpeechClassifier
 from core.evaluation.evaluator import SpeechEvaluator
+from core.registry.model_registry import ModelRegistry, get_model_registry
+
+logger = logging.getLogger(__name__)
 
 class ClassificationService():
-    def __init__(self):
-        self.classifier = SpeechClassifier()
+    def __init__(self, classifier: Optional[SpeechClassifier] = None):
+        self.classifier = classifier if classifier is not None else SpeechClassifier()
         self.evaluator = SpeechEvaluator()
     
     async def generate_classification(self, audio_analysis:Dict[str, Any], 
@@ -39,19 +43,33 @@ class ClassificationService():
                 audio_analysis["transcription"]
             )
             
-            classification = self.classifier.get_classification(
-                difference_analysis,
-                clarity_score
-            )
-            
-            return ClassificationResponse(
-                label=classification
-            )
+            return self.classify_difference(difference_analysis, clarity_score)
 
         except Exception as e:
-            print(f"Error getting classification, check classification service: {e}")
+            logger.error(f"Error getting classification, check classification service: {e}")
             raise HTTPException(status_code=500, detail="Audio ARLI feedback failed.")
+
+    def classify_difference(self, difference_analysis:Dict[str, Any], 
+                            wer:float) -> ClassificationResponse:
+        """Generate speech performance classification from an already computed
+        difference analysis and word error rate.
+
+        Args:
+            difference_analysis (Dict[str, Any]): Difference between user and reference analysis.
+            wer (float): Word error rate between the user and reference transcription.
+
+        Returns:
+            ClassificationResponse: Schema for classification.
+        """
+        classification = self.classifier.get_classification(
+            difference_analysis,
+            wer
+        )
+        
+        return ClassificationResponse(
+            label=classification
+        )
         
 
-def get_classification_service():
-    return ClassificationService()
\ No newline at end of file
+def get_classification_service(registry: ModelRegistry = Depends(get_model_registry)):
+    return ClassificationService(classifier=registry.classifier)
\ No newline at end of file
@@ -1,9 +1,12 @@
 from typing import Dict, Any
 from fastapi import HTTPException
+import logging
 
 from schemas.evaluation_schema import EvaluationResponse
 from core.evaluation.evaluator import SpeechEvaluator
 
+logger = logging.getLogger(__name__)
+
 class EvaluationService():
     """Service to evaluate an audio based on a reference audio."""
     def __init__(self):
@@ -28,22 +31,48 @@ class EvaluationService():
         try:
             # Get final score
             score = self.evaluator.get_score(audio_analysis, reference_analysis)
-            
-            keys = ["total_score", "clarity_score", "speed_score", "articulation_score", "rythm_score"]
-            for key in keys:
-                if key not in score or score[key] is None:
-                    score[key] = -1
-            
-            return EvaluationResponse(
-                total_score=score["total_score"],
-                clarity_score=score["clarity_score"],
-                speed_score=score["speed_score"],
-                articulation_score=score["articulation_score"],
-                rythm_score=score["rythm_score"]
-            )
+            return self._build_response(score)
+
+        except Exception as e:
+            logger.error(f"Error evaluating file, check evaluation service: {e}")
+            raise HTTPException(status_code=500, detail="Audio evaluation failed.")
+
+    def _build_response(self, score: Dict[str, Any]) -> EvaluationResponse:
+        """Build the evaluation schema, missing scores are set to -1."""
+        keys = ["total_score", "clarity_score", "speed_score", "articulation_score", "rythm_score"]
+        for key in keys:
+            if key not in score or score[key] is None:
+                score[key] = -1
+        
+        return EvaluationResponse(
+            total_score=score["total_score"],
+            clarity_score=score["clarity_score"],
+            speed_score=score["speed_score"],
+            articulation_score=score["articulation_score"],
+            rythm_score=score["rythm_score"]
+        )
+
+    def evaluate_difference(self, difference_analysis:Dict[str, Any], 
+                            wer:float) -> EvaluationResponse:
+        """Generate evaluation from an already computed difference analysis 
+        and word error rate.
+
+        Args:
+            difference_analysis (Dict[str, Any]): Difference between user and reference analysis.
+            wer (float): Word error rate between the user and reference transcription.
+
+        Raises:
+            HTTPException: Audio evaluation failed.
+
+        Returns:
+            EvaluationResponse: Schema for evaluation.
+        """
+        try:
+            score = self.evaluator.get_score_from_difference(difference_analysis, wer)
+            return self._build_response(score)
 
         except Exception as e:
-            print(f"Error evaluating file, check evaluation service: {e}")
+            logger.error(f"Error evaluating file, check evaluation service: {e}")
             raise HTTPException(status_code=500, detail="Audio evaluation failed.")
 
 def get_evaluation_service():
@@ -1,22 +1,39 @@
-from fastapi import HTTPException
-from typing import Dict, Any
+from fastapi import HTTPException, Depends
+from typing import Dict, Any, Optional
+import asyncio
+import logging
 
 from schemas.evaluation_schema import FeedbackResponse
 from core.evaluation.evaluator import SpeechEvaluator
+from core.evaluation.wer_engine import TranscriptAlignment
 from core.feedback.advisor import SpeechAdvisor
+from core.feedback.template_advisor import TemplateSpeechAdvisor
+from core.feedback.feedback_cache import FeedbackCache
+from core.feedback.arli_client import ArliClient
+from core.registry.model_registry import ModelRegistry, get_model_registry
+from core.utils.telemetry import stage_timer
+
+logger = logging.getLogger(__name__)
+
 class FeedbackService():
-    def __init__(self):
+    def __init__(self, template_advisor: Optional[TemplateSpeechAdvisor] = None,
+                 feedback_cache: Optional[FeedbackCache] = None,
+                 arli_client: Optional[ArliClient] = None):
         self.evaluator = SpeechEvaluator()
-        self.advisor = SpeechAdvisor()
+        self.advisor = SpeechAdvisor(client=arli_client)
+        self.template_advisor = template_advisor if template_advisor is not None else TemplateSpeechAdvisor()
+        self.feedback_cache = feedback_cache
     
     async def generate_feedback(self, audio_analysis:Dict[str, Any], 
-                             reference_analysis:Dict[str,Any]) -> FeedbackResponse: 
+                             reference_analysis:Dict[str,Any],
+                             use_llm:bool = False) -> FeedbackResponse: 
         """Generate feedback based on an audio file and the id of the reference audio.
         It includes speed_tip, clarity_tip, articulation_tip, rythm_tip.
 
         Args:
             audio_file (UploadFile): File uploaded from request. 
             audio_id (str): Id of reference audio.
+            use_llm (bool): Ask the ARLI model instead of using the phrase bank.
 
         Raises:
             HTTPException: Audio feedback failed.
@@ -31,32 +48,84 @@ class FeedbackService():
                 audio_analysis
             )
             
-            # Get transcript clarity score
-            clarity_score = self.evaluator.compare_transcripts(
+            # Get transcript clarity score and the words that didn't match
+            clarity_score, alignment = self.evaluator.align_transcripts(
                 reference_analysis["transcription"],
                 audio_analysis["transcription"]
             )
             
-            # Get feedback
-            feedback = self.advisor.get_feedback(
-                difference_analysis,
-                clarity_score
-            )
-            
-            if not feedback:
-                raise HTTPException(status_code=500, detail="Could not generate ARLI feeback.")
-            
-            return FeedbackResponse(
-                clarity_tip = feedback["clarity_tip"],
-                speed_tip = feedback["speed_tip"],
-                rythm_tip=feedback["rythm_tip"],
-                articulation_tip=feedback["articulation_tip"]
-            )
+            return await self.feedback_from_difference(difference_analysis, clarity_score, use_llm, alignment)
 
         except Exception as e:
-            print(f"Error getting feedback, check feedback service: {e}")
+            logger.error(f"Error getting feedback, check feedback service: {e}")
             raise HTTPException(status_code=500, detail=f"{e}")
         
 
-def get_feedback_service():
-    return FeedbackService()
\ No newline at end of file
+    async def feedback_from_difference(self, difference_analysis:Dict[str, Any], 
+                                 wer:float, use_llm:bool = False,
+                                 alignment:Optional[TranscriptAlignment] = None) -> FeedbackResponse:
+        """Generate feedback from an already computed difference analysis and 
+        word error rate. Tips come from the phrase bank unless the ARLI model
+        is requested, in which case cached answers are reused when available.
+
+        Args:
+            difference_analysis (Dict[str, Any]): Difference between user and reference analysis.
+            wer (float): Word error rate between the user and reference transcription.
+            use_llm (bool): Ask the ARLI model instead of using the phrase bank.
+            alignment (Optional[TranscriptAlignment]): Word alignment of the 
+            transcriptions, used by the phrase bank to name the words to practice.
+
+        Raises:
+            HTTPException: Feedback could not be generated.
+
+        Returns:
+            FeedbackResponse: Schema for feeback.
+        """
+        if not use_llm:
+            with stage_timer("advisor_template"):
+                feedback = self.template_advisor.get_feedback(
+                    difference_analysis,
+                    wer,
+                    alignment
+                )
+        else:
+            feedback = None
+            if self.feedback_cache is not None:
+                feedback = await asyncio.to_thread(
+                    self.feedback_cache.get,
+                    self.advisor.version,
+                    difference_analysis,
+                    wer
+                )
+            if feedback is None:
+                with stage_timer("advisor_arli"):
+                    feedback = await self.advisor.get_feedback(
+                        difference_analysis,
+                        wer
+                    )
+                if self.feedback_cache is not None:
+                    await asyncio.to_thread(
+                        self.feedback_cache.add,
+                        self.advisor.version,
+                        difference_analysis,
+                        wer,
+                        feedback
+                    )
+        
+        if not feedback:
+            source = "ARLI" if use_llm else "template"
+            raise HTTPException(status_code=500, detail=f"Could not generate {source} feeback.")
+        
+        return FeedbackResponse(
+            clarity_tip = feedback["clarity_tip"],
+            speed_tip = feedback["speed_tip"],
+            rythm_tip=feedback["rythm_tip"],
+            articulation_tip=feedback["articulation_tip"]
+        )
+    
+def get_feedback_service(registry: ModelRegistry = Depends(get_model_registry)):
+    return FeedbackService(
+        template_advisor=registry.template_advisor,
+        feedback_cache=registry.feedback_cache,
+        arli_client=registry.arli_client
+    )
\ No newline at end of file
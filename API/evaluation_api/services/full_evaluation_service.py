@@ -0,0 +1,175 @@
+from fastapi import HTTPException, Depends
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+from functools import partial
+import asyncio
+import logging
+
+from schemas.evaluation_schema import EvaluationStageEvent, FeedbackMode
+from core.evaluation.evaluator import SpeechEvaluator
+from core.evaluation.wer_engine import TranscriptAlignment
+from core.registry.model_registry import ModelRegistry, get_model_registry
+from services.analysis_service import AnalysisService, get_analysis_service
+from services.evaluation_service import EvaluationService, get_evaluation_service
+from services.classification_service import ClassificationService, get_classification_service
+from services.feedback_service import FeedbackService, get_feedback_service
+from services.local_feedback_service import LocalFeedbackService
+
+logger = logging.getLogger(__name__)
+
+class FullEvaluationService:
+    """Service that analyzes an audio once and then scores, classifies and
+    gives feedback on it, streaming the result of each stage as it finishes."""
+    def __init__(self, analysis_service: AnalysisService,
+                 evaluation_service: EvaluationService,
+                 classification_service: ClassificationService,
+                 feedback_service: FeedbackService,
+                 registry: ModelRegistry):
+        self.analysis_service = analysis_service
+        self.evaluation_service = evaluation_service
+        self.classification_service = classification_service
+        self.feedback_service = feedback_service
+        self.registry = registry
+        self.evaluator = SpeechEvaluator()
+
+    def _event(self, stage: str, result: Optional[Dict[str, Any]] = None,
+               error: Optional[str] = None) -> str:
+        """Serialize a stage event as a line of NDJSON."""
+        event = EvaluationStageEvent(stage=stage, result=result, error=error)
+        return event.model_dump_json() + "\n"
+
+    def _get_feedback_function(self, feedback_mode: FeedbackMode,
+                               alignment: Optional[TranscriptAlignment] = None) -> Optional[Callable]:
+        """Get the function that generates feedback for the requested mode.
+        The local model is only loaded when local feedback is requested. The
+        word alignment is only used by the phrase bank."""
+        if feedback_mode == FeedbackMode.template:
+            return partial(self.feedback_service.feedback_from_difference, alignment=alignment)
+        if feedback_mode == FeedbackMode.arli:
+            return partial(self.feedback_service.feedback_from_difference, use_llm=True)
+        if feedback_mode == FeedbackMode.local:
+            local_service = LocalFeedbackService(
+                local_advisor=self.registry.local_advisor,
+                feedback_cache=self.registry.feedback_cache
+            )
+            return local_service.feedback_from_difference
+        return None
+
+    async def _run_stage(self, stage: str, function: Callable,
+                         *args) -> str:
+        """Run a stage and serialize its result or its error. Blocking stages
+        run in a worker thread, coroutine functions run in the event loop.
+
+        Args:
+            stage (str): Name of the stage.
+            function (Callable): Function returning a pydantic schema.
+
+        Returns:
+            str: NDJSON line of the stage event.
+        """
+        try:
+            if asyncio.iscoroutinefunction(function):
+                response = await function(*args)
+            else:
+                response = await asyncio.to_thread(function, *args)
+            return self._event(stage, result=response.model_dump())
+        except HTTPException as e:
+            logger.error(f"Error in {stage} stage, check full evaluation service: {e.detail}")
+            return self._event(stage, error=str(e.detail))
+        except Exception as e:
+            logger.error(f"Error in {stage} stage, check full evaluation service: {e}")
+            return self._event(stage, error=str(e))
+
+    async def evaluate(self, content: bytes, filename: str,
+                       reference_analysis: Dict[str, Any],
+                       feedback_mode: FeedbackMode = FeedbackMode.template,
+                       resource_type: Optional[str] = None) -> AsyncIterator[str]:
+        """Analyze an audio file and stream its analysis, evaluation,
+        classification and feedback as NDJSON lines. The difference analysis
+        and word error rate are computed once and shared by every stage.
+
+        Args:
+            content (bytes): Content of the uploaded audio file.
+            filename (str): Name of the uploaded file, with extension.
+            reference_analysis (Dict[str, Any]): Reference audio analysis.
+            feedback_mode (FeedbackMode): Advisor used for feedback, or none.
+            resource_type (Optional[str]): word, sentence, text or None if 
+            unknown, words are analyzed with the faster word mode.
+
+        Yields:
+            str: NDJSON line for each finished stage, ending with a done stage.
+        """
+        try:
+            # The reference transcription is the text the user was asked to say
+            analysis = await self.analysis_service.analyze_content(
+                content,
+                filename,
+                resource_type,
+                reference_analysis.get("transcription")
+            )
+        except HTTPException as e:
+            yield self._event("analysis", error=str(e.detail))
+            yield self._event("done")
+            return
+        except Exception as e:
+            logger.error(f"Error in analysis stage, check full evaluation service: {e}")
+            yield self._event("analysis", error="Audio analysis failed.")
+            yield self._event("done")
+            return
+
+        audio_analysis = analysis.model_dump()
+        yield self._event("analysis", result=audio_analysis)
+
+        try:
+            # Shared by every stage below
+            difference_analysis = self.evaluator.get_difference_analysis(
+                reference_analysis,
+                audio_analysis
+            )
+            clarity_score, alignment = self.evaluator.align_transcripts(
+                reference_analysis["transcription"],
+                audio_analysis["transcription"]
+            )
+        except Exception as e:
+            logger.error(f"Error comparing analyses, check full evaluation service: {e}")
+            yield self._event("evaluation", error="Could not compare user and reference analysis.")
+            yield self._event("done")
+            return
+
+        stages = [
+            self._run_stage("evaluation", self.evaluation_service.evaluate_difference,
+                            difference_analysis, clarity_score),
+            self._run_stage("classification", self.classification_service.classify_difference,
+                            difference_analysis, clarity_score),
+        ]
+
+        try:
+            feedback_function = self._get_feedback_function(feedback_mode, alignment)
+        except Exception as e:
+            logger.error(f"Error loading feedback model, check full evaluation service: {e}")
+            feedback_function = None
+            yield self._event("feedback", error="Feedback model is not available.")
+
+        if feedback_function is not None:
+            stages.append(
+                self._run_stage("feedback", feedback_function, difference_analysis, clarity_score)
+            )
+
+        for stage in asyncio.as_completed(stages):
+            yield await stage
+
+        yield self._event("done")
+
+def get_full_evaluation_service(
+    registry: ModelRegistry = Depends(get_model_registry),
+    analysis_service: AnalysisService = Depends(get_analysis_service),
+    evaluation_service: EvaluationService = Depends(get_evaluation_service),
+    classification_service: ClassificationService = Depends(get_classification_service),
+    feedback_service: FeedbackService = Depends(get_feedback_service),
+):
+    return FullEvaluationService(
+        analysis_service,
+        evaluation_service,
+        classification_service,
+        feedback_service,
+        registry
+    )
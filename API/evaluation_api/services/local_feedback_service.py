@@ -1,14 +1,25 @@
-from fastapi import HTTPException
-from typing import Dict, Any
+from fastapi import HTTPException, Depends
+from starlette.concurrency import iterate_in_threadpool
+from typing import AsyncIterator, Dict, Any, Optional
+import asyncio
+import json
+import logging
 
 from schemas.evaluation_schema import FeedbackResponse
 from core.evaluation.evaluator import SpeechEvaluator
 from core.feedback.local_advisor import LocalSpeechAdvisor
+from core.feedback.feedback_cache import FeedbackCache
+from core.registry.model_registry import ModelRegistry, get_model_registry
+from core.utils.telemetry import stage_timer
+
+logger = logging.getLogger(__name__)
 
 class LocalFeedbackService:
-    def __init__(self):
+    def __init__(self, local_advisor: Optional[LocalSpeechAdvisor] = None,
+                 feedback_cache: Optional[FeedbackCache] = None):
         self.evaluator = SpeechEvaluator()
-        self.local_advisor = LocalSpeechAdvisor()
+        self.local_advisor = local_advisor if local_advisor is not None else LocalSpeechAdvisor()
+        self.feedback_cache = feedback_cache
     
     async def generate_feedback(self, audio_analysis:Dict[str, Any], 
                              reference_analysis:Dict[str,Any]) -> FeedbackResponse: 
@@ -38,25 +49,134 @@ class LocalFeedbackService:
                 audio_analysis["transcription"]
             )
             
-            # Get feedback
-            feedback = self.local_advisor.get_feedback(
+            # Generation blocks until the model answers, so it runs in a worker
+            # thread and the backend can serve several requests at once
+            return await asyncio.to_thread(
+                self.feedback_from_difference,
                 difference_analysis,
                 clarity_score
             )
-            
-            if not feedback:
-                raise HTTPException(status_code=500, detail="Could not generate local feeback.")
-            
-            return FeedbackResponse(
-                clarity_tip = feedback["clarity_tip"],
-                speed_tip = feedback["speed_tip"],
-                rythm_tip=feedback["rythm_tip"],
-                articulation_tip=feedback["articulation_tip"]
-            )
 
         except Exception as e:
-            print(f"Error getting feedback, check local feedback service: {e}")
+            logger.error(f"Error getting feedback, check local feedback service: {e}")
             raise HTTPException(status_code=500, detail=f"{e}")
     
-def get_local_feedback_service():
-    return LocalFeedbackService()
\ No newline at end of file
+    def _generate_feedback(self, difference_analysis:Dict[str, Any], wer:float) -> dict:
+        """Ask the local model for feedback, timing the generation."""
+        with stage_timer("advisor_local"):
+            return self.local_advisor.get_feedback(difference_analysis, wer)
+
+    def feedback_from_difference(self, difference_analysis:Dict[str, Any], 
+                                 wer:float) -> FeedbackResponse:
+        """Generate feedback from an already computed difference analysis and 
+        word error rate. Cached answers are reused when available. It blocks
+        on the cache, which may read SQLite, and on the model, so async callers
+        run it in a worker thread.
+
+        Args:
+            difference_analysis (Dict[str, Any]): Difference between user and reference analysis.
+            wer (float): Word error rate between the user and reference transcription.
+
+        Raises:
+            HTTPException: Feedback could not be generated.
+
+        Returns:
+            FeedbackResponse: Schema for feeback.
+        """
+        if self.feedback_cache is not None:
+            feedback = self.feedback_cache.get_or_generate(
+                self.local_advisor.version,
+                difference_analysis,
+                wer,
+                self._generate_feedback
+            )
+        else:
+            feedback = self._generate_feedback(
+                difference_analysis,
+                wer
+            )
+        
+        if not feedback:
+            raise HTTPException(status_code=500, detail="Could not generate local feeback.")
+        
+        return FeedbackResponse(
+            clarity_tip = feedback["clarity_tip"],
+            speed_tip = feedback["speed_tip"],
+            rythm_tip=feedback["rythm_tip"],
+            articulation_tip=feedback["articulation_tip"]
+        )
+    
+    def _sse_event(self, event: str, data: Any) -> str:
+        """Format an event for a text/event-stream response."""
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    async def stream_feedback(self, audio_analysis:Dict[str, Any], 
+                              reference_analysis:Dict[str,Any]) -> AsyncIterator[str]:
+        """Generate feedback as Server-Sent Events. Each tip list is sent as an
+        event named after its key (speed_tip, clarity_tip, articulation_tip,
+        rythm_tip) as soon as the model writes it, followed by a done event.
+        Failures are sent as an error event.
+
+        Args:
+            audio_analysis (Dict[str, Any]): User audio analysis.
+            reference_analysis (Dict[str,Any]): Reference audio analysis.
+
+        Yields:
+            str: Server-Sent Event.
+        """
+        try:
+            difference_analysis = self.evaluator.get_difference_analysis(
+                reference_analysis,
+                audio_analysis
+            )
+            clarity_score = self.evaluator.compare_transcripts(
+                reference_analysis["transcription"],
+                audio_analysis["transcription"]
+            )
+        except Exception as e:
+            logger.error(f"Error getting feedback, check local feedback service: {e}")
+            yield self._sse_event("error", {"detail": "Could not compare user and reference analysis."})
+            return
+
+        if self.feedback_cache is not None:
+            cached_feedback = await asyncio.to_thread(
+                self.feedback_cache.get,
+                self.local_advisor.version,
+                difference_analysis,
+                clarity_score
+            )
+            if cached_feedback is not None:
+                for key, tip_list in cached_feedback.items():
+                    yield self._sse_event(key, tip_list)
+                yield self._sse_event("done", {})
+                return
+
+        tips = self.local_advisor.stream_feedback(difference_analysis, clarity_score)
+        feedback = {}
+        try:
+            # Generation runs in a worker thread, one token at a time
+            with stage_timer("advisor_local"):
+                async for key, tip_list in iterate_in_threadpool(tips):
+                    feedback[key] = tip_list
+                    yield self._sse_event(key, tip_list)
+            yield self._sse_event("done", {})
+            if self.feedback_cache is not None:
+                await asyncio.to_thread(
+                    self.feedback_cache.add,
+                    self.local_advisor.version,
+                    difference_analysis,
+                    clarity_score,
+                    feedback
+                )
+        except Exception as e:
+            logger.error(f"Error streaming feedback, check local feedback service: {e}")
+            yield self._sse_event("error", {"detail": "Could not generate local feeback."})
+        finally:
+            # Releases the model if the client disconnected mid generation
+            tips.close()
+    
+def get_local_feedback_service(registry: ModelRegistry = Depends(get_model_registry)):
+    return LocalFeedbackService(
+        local_advisor=registry.local_advisor,
+        feedback_cache=registry.feedback_cache
+    )
\ No newline at end of file
@@ -0,0 +1,60 @@
+from fastapi import HTTPException
+from typing import Dict, Any, Optional
+import asyncio
+import logging
+
+from core.resources.reference_store import (
+    ReferenceStore, ReferenceNotFoundError, ReferenceUnavailableError
+)
+from config import (
+    RESOURCES_API_URL, REFERENCE_SNAPSHOT_PATH, REFERENCE_CACHE_SIZE,
+    REFERENCE_CACHE_TTL, RESOURCES_API_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+reference_store = ReferenceStore(
+    RESOURCES_API_URL,
+    snapshot_path=REFERENCE_SNAPSHOT_PATH,
+    cache_size=REFERENCE_CACHE_SIZE,
+    ttl_seconds=REFERENCE_CACHE_TTL,
+    timeout=RESOURCES_API_TIMEOUT
+)
+
+class ReferenceService:
+    """Service to resolve the reference analysis of a resource by its id."""
+    def __init__(self, store: ReferenceStore):
+        self.store = store
+
+    async def get_reference_analysis(self, resource_type: str, resource_id: str,
+                                     authorization: Optional[str] = None) -> Dict[str, Any]:
+        """Get the stored analysis of the reference audio of a word, sentence or text.
+
+        Args:
+            resource_type (str): One of word, sentence or text.
+            resource_id (str): Id of the resource in the resources API.
+            authorization (Optional[str]): Authorization header of the request.
+
+        Raises:
+            HTTPException: The resource has no reference analysis.
+            HTTPException: The resources API could not be reached.
+
+        Returns:
+            Dict[str, Any]: Reference analysis.
+        """
+        try:
+            return await asyncio.to_thread(
+                self.store.get_reference_analysis,
+                resource_type,
+                resource_id,
+                authorization
+            )
+        except ReferenceNotFoundError as e:
+            logger.error(f"Error getting reference analysis, check reference service: {e}")
+            raise HTTPException(status_code=404, detail=str(e))
+        except ReferenceUnavailableError as e:
+            logger.error(f"Error getting reference analysis, check reference service: {e}")
+            raise HTTPException(status_code=502, detail="Could not get reference analysis from resources API.")
+
+def get_reference_service():
+    return ReferenceService(reference_store)